@@ -1,11 +1,26 @@
 from flask import Flask, render_template, request, jsonify, session, redirect, url_for
 import os, random, sqlite3
-from recognition_module import single_classification  # your ML model
+from recognition_module import classify_with_features, classify_paths, PROB_WIDTH  # your ML model
 from weather_service import WeatherService  # NEW: Import weather service
+from user_stats import install_stats_schema, refresh_worn_lists, get_user_stats, get_wardrobe_version
+from db_setup import create_indexes
+from reclassify import install_reclassify_schema, model_fingerprint
+from wardrobe_queries import get_outfit_history_page, get_wardrobe_page, get_wardrobe_counts, thumbnail_url, upload_url
+from image_pipeline import schedule_derivatives, remove_derivatives
+from feature_store import get_feature_store
+import metrics
+import profiler
+import upload_stream
+import image_serving
+from response_cache import make_cache
+from weather_cache import install_weather_cache_schema, cached_provider
+from singleflight import SingleFlight
 
 
 app = Flask(__name__)
 app.secret_key = "your_secret_key_here_change_in_production"
+metrics.init_app(app)  # request timings + GET /metrics (WARDROBE_METRICS=0 disables)
+profiler.init_app(app)  # only active with WARDROBE_PROFILE=<fraction of requests>
 
 
 # ==========================================
@@ -24,21 +39,80 @@ except Exception as e:
 # ==========================================
 BASE_UPLOAD_FOLDER = os.path.join("static", "uploads")
 os.makedirs(BASE_UPLOAD_FOLDER, exist_ok=True)
+# Read per request by /upload, the upload spool and /images, so it can be pointed elsewhere after import
+app.config["UPLOAD_FOLDER"] = BASE_UPLOAD_FOLDER
+# /upload streams files to disk while hashing; limits via WARDROBE_MAX_UPLOAD_MB / WARDROBE_MAX_REQUEST_MB
+upload_stream.init_app(app, BASE_UPLOAD_FOLDER)
+# Images are served from /images/<user_id>/... to their owner only (WARDROBE_IMAGE_OFFLOAD=nginx|sendfile)
+image_serving.init_app(app, BASE_UPLOAD_FOLDER)
 
 
 # ==========================================
 # Database Configuration
 # ==========================================
-DB_PATH = os.path.join(os.path.dirname(__file__), "wardrobe.db")
+DB_PATH = os.environ.get("WARDROBE_DB", os.path.join(os.path.dirname(__file__), "wardrobe.db"))
 
 
 def get_db_connection():
     """Get database connection with row factory"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, factory=metrics.TimedConnection)
     conn.row_factory = sqlite3.Row
     return conn
 
 
+# Keep user_stats maintained incrementally (triggers + worn-list snapshots)
+# and make sure the indexes behind the paginated views exist
+try:
+    _conn = get_db_connection()
+    install_stats_schema(_conn)
+    install_reclassify_schema(_conn)
+    install_weather_cache_schema(_conn)
+    create_indexes(_conn)
+    _conn.close()
+except sqlite3.Error as e:
+    print(f"⚠️ Warning: schema extensions install failed: {e}")
+
+# Nearby users share current weather through a grid cache in SQLite
+# (WARDROBE_WEATHER_CACHE=off disables; cell size, radius and TTL in weather_cache.py)
+if weather_service is not None and getattr(weather_service, "provider", None) is not None:
+    weather_service.provider = cached_provider(weather_service.provider, get_db_connection)
+
+# New uploads are stamped with the model version that labelled them,
+# so reclassify.py only revisits rows labelled by older models
+MODEL_VERSION = model_fingerprint()
+
+
+# Recommendation answers, keyed on user_stats.wardrobe_version (WARDROBE_CACHE=memory|redis|off)
+recommendation_cache = make_cache()
+
+# Identical recommendation requests in flight at the same time (reloads, several
+# tabs) wait for the first one and share its answer instead of each calling the
+# weather API and SQLite. Per process; keyed on user + request parameters.
+request_flight = SingleFlight()
+
+
+def wardrobe_version(user_id):
+    conn = get_db_connection()
+    try:
+        return get_wardrobe_version(conn, user_id)
+    finally:
+        conn.close()
+
+
+# ==========================================
+# Pagination Helpers
+# ==========================================
+
+
+def parse_page_limit(default=20, maximum=100):
+    """Read ?limit= from the request, clamped to 1..maximum"""
+    try:
+        limit = int(request.args.get("limit", default))
+    except ValueError:
+        limit = default
+    return max(1, min(limit, maximum))
+
+
 # ==========================================
 # Smart Recommendation Function (Balanced by Wear Count)
 # ==========================================
@@ -188,42 +262,94 @@ def logout():
 # ==========================================
 
 
-@app.route("/upload", methods=["POST"])
-def upload():
-    """Upload and classify clothing item"""
-    user_id = session.get("user_id", "guest")
-    user_folder = os.path.join(BASE_UPLOAD_FOLDER, str(user_id))
-    os.makedirs(user_folder, exist_ok=True)
+def store_features(item_id, features):
+    """Append an item's model input/outputs to the feature store (never fails the request)"""
+    try:
+        get_feature_store(PROB_WIDTH).append(
+            item_id, features["input"], features["probs"], features["color_rgb"])
+    except Exception as e:
+        print(f"⚠️ Feature store append failed for item {item_id}: {type(e).__name__}: {e}")
 
-    file = request.files["file"]
-    filepath = os.path.join(user_folder, file.filename)
-    file.save(filepath)
 
-    # Use ML model to classify clothing
-    subtype, info_str, details = single_classification(filepath)
+def drop_features(item_id):
+    try:
+        get_feature_store(PROB_WIDTH).delete(item_id)
+    except Exception as e:
+        print(f"⚠️ Feature store delete failed for item {item_id}: {type(e).__name__}: {e}")
 
-    # FIXED: Convert season and occasion to lowercase for consistency
-    season = details[3].lower()  # "Spring" -> "spring"
-    occasion = details[4].lower()  # "Casual" -> "casual"
 
-    print(f"📥 Upload: season={season}, occasion={occasion}")
+def classify_uploads(paths):
+    """(path, outcome) per upload; several files go through the models as one batch"""
+    if len(paths) == 1:
+        try:
+            return [(paths[0], classify_with_features(paths[0]))]
+        except Exception as e:
+            return [(paths[0], e)]
+    return list(classify_paths(paths, with_features=True))
 
-    # Save to database with wear_count=0 by default
-    conn = get_db_connection()
-    conn.execute("""
-        INSERT INTO clothes (user_id, file_path, subtype, color, season, occasion, wear_count) 
-        VALUES (?, ?, ?, ?, ?, ?, 0)
-    """, (user_id, filepath, subtype, details[2], season, occasion))
-    conn.commit()
-    conn.close()
 
-    return jsonify({
-        "file_url": f"/static/uploads/{user_id}/{file.filename}",
-        "subtype": subtype,
-        "season": season,
-        "occasion": occasion,
-        "info": info_str
-    })
+@app.route("/upload", methods=["POST"])
+def upload():
+    """Upload and classify one or more clothing items (form field "file", repeatable)"""
+    user_id = session.get("user_id", "guest")
+    user_folder = os.path.join(app.config["UPLOAD_FOLDER"], str(user_id))
+
+    # Parsing the form streams every file to disk; non-images and oversized files are rejected there
+    sinks = upload_stream.uploaded_files("file")
+    rejected = upload_stream.rejected_files("file")
+    if not sinks and len(rejected) == 1:
+        raise rejected[0].rejected
+    if not sinks and not rejected:
+        return jsonify({"error": "No file uploaded"}), 400
+    paths = [sink.save_to(user_folder) for sink in sinks]
+
+    items, rows = [], []
+    errors = [{"file": sink.filename, "error": sink.rejected.description} for sink in rejected]
+    for filepath, outcome in classify_uploads(paths):
+        if isinstance(outcome, Exception):
+            print(f"❌ Upload {filepath}: {type(outcome).__name__}: {outcome}")
+            errors.append({"file": os.path.basename(filepath), "error": "Could not read this image"})
+            os.remove(filepath)
+            continue
+        subtype, info_str, details, features = outcome
+        # FIXED: Convert season and occasion to lowercase for consistency
+        season = details[3].lower()  # "Spring" -> "spring"
+        occasion = details[4].lower()  # "Casual" -> "casual"
+        print(f"📥 Upload: season={season}, occasion={occasion}")
+        rows.append((filepath, subtype, details[2], season, occasion, features))
+        items.append({
+            "file_url": upload_url(user_id, filepath),
+            "subtype": subtype,
+            "season": season,
+            "occasion": occasion,
+            "info": info_str
+        })
+
+    # Save to database with wear_count=0 by default, one transaction for the batch
+    item_ids = []
+    if rows:
+        conn = get_db_connection()
+        for filepath, subtype, color, season, occasion, _ in rows:
+            cursor = conn.execute("""
+                INSERT INTO clothes (user_id, file_path, subtype, color, season, occasion, wear_count, model_version) 
+                VALUES (?, ?, ?, ?, ?, ?, 0, ?)
+            """, (user_id, filepath, subtype, color, season, occasion, MODEL_VERSION))
+            item_ids.append(cursor.lastrowid)
+        refresh_worn_lists(conn, user_id)
+        conn.commit()
+        conn.close()
+
+    for item_id, (filepath, *_, features) in zip(item_ids, rows):
+        # Keep the decoded input and model outputs so batch jobs never re-decode the image
+        store_features(item_id, features)
+        # Thumbnails + cached model input are built off the request thread
+        schedule_derivatives(filepath)
+
+    if len(sinks) + len(rejected) == 1:
+        if errors:
+            return jsonify({"error": errors[0]["error"]}), 422
+        return jsonify(items[0])
+    return jsonify({"items": items, "errors": errors})
 
 
 # ==========================================
@@ -258,19 +384,30 @@ def generate_outfit():
     season = request.form.get('season', 'Summer')
     occasion = request.form.get('occasion', 'Casual')
     
+    def compute():
+        # Same wardrobe version + filters -> same answer, so it is cached
+        key = recommendation_cache.make_key("generate_outfit", user_id, wardrobe_version(user_id), season, occasion)
+        return recommendation_cache.get_or_compute(key, lambda: outfit_payload(user_id, season, occasion))
+    
+    payload = request_flight.do(("generate_outfit", user_id, season, occasion), compute)
+    if 'error' in payload:
+        return jsonify(payload), 404
+    return jsonify(payload)
+
+
+def outfit_payload(user_id, season, occasion):
+    """The /generate_outfit answer (or {'error': ...} when a category is missing)"""
     # Get balanced recommendations (prioritizes less-worn items)
     result = get_smart_recommendations_balanced(user_id, season, occasion)
     
     if result['success']:
         outfit = result['outfit']
-        top_filename = os.path.basename(outfit['top']['file_path'])
-        bottom_filename = os.path.basename(outfit['bottom']['file_path'])
-        shoe_filename = os.path.basename(outfit['shoe']['file_path'])
         
-        return jsonify({
-            'top_image': f'static/uploads/{user_id}/{top_filename}',
-            'bottom_image': f'static/uploads/{user_id}/{bottom_filename}',
-            'shoe_image': f'static/uploads/{user_id}/{shoe_filename}',
+        # Card-sized thumbnails (relative URLs, the page prefixes "/")
+        return {
+            'top_image': thumbnail_url(user_id, outfit['top']['file_path']).lstrip('/'),
+            'bottom_image': thumbnail_url(user_id, outfit['bottom']['file_path']).lstrip('/'),
+            'shoe_image': thumbnail_url(user_id, outfit['shoe']['file_path']).lstrip('/'),
             'season': season,
             'occasion': occasion,
             'top_id': outfit['top']['id'],
@@ -279,9 +416,9 @@ def generate_outfit():
             'top_wear_count': outfit['top']['wear_count'],
             'bottom_wear_count': outfit['bottom']['wear_count'],
             'shoe_wear_count': outfit['shoe']['wear_count']
-        })
+        }
     else:
-        return jsonify({'error': result['message']}), 404
+        return {'error': result['message']}
 
 
 # ==========================================
@@ -299,11 +436,19 @@ def auto_recommend():
     if "user_id" not in session:
         return jsonify({'error': 'Please login first'}), 401
     
+    user_id = session["user_id"]
+    lat = request.args.get('lat')
+    lon = request.args.get('lon')
+    city = None if lat and lon else request.args.get('city', 'New York')
+    
+    payload, status = request_flight.do(("auto_recommend", user_id, lat, lon, city),
+                                        lambda: auto_recommend_payload(user_id, lat, lon, city))
+    return jsonify(payload), status
+
+
+def auto_recommend_payload(user_id, lat, lon, city):
+    """The /api/auto-recommend answer as (payload, status)"""
     try:
-        user_id = session["user_id"]
-        lat = request.args.get('lat')
-        lon = request.args.get('lon')
-        
         print(f"\n🔍 AUTO-RECOMMEND REQUEST")
         print(f"User ID: {user_id}")
         print(f"Latitude: {lat}, Longitude: {lon}")
@@ -311,7 +456,7 @@ def auto_recommend():
         # Check if weather service is available
         if weather_service is None:
             print("⚠️ Weather service not available")
-            return jsonify({"error": "Weather service not available"}), 500
+            return {"error": "Weather service not available"}, 500
         
         # Method 1: Use coordinates from browser geolocation
         if lat and lon:
@@ -320,26 +465,25 @@ def auto_recommend():
                 print(f"✅ Got weather data from coordinates")
             except Exception as e:
                 print(f"❌ Error fetching weather by coordinates: {e}")
-                return jsonify({"error": f"Failed to fetch weather: {str(e)}"}), 400
+                return {"error": f"Failed to fetch weather: {str(e)}"}, 400
         else:
             # Method 2: Fall back to city name
-            city = request.args.get('city', 'New York')
             print(f"📍 Using city fallback: {city}")
             try:
                 weather_data = weather_service.get_weather_by_city(city)
                 print(f"✅ Got weather data from city")
             except Exception as e:
                 print(f"❌ Error fetching weather by city: {e}")
-                return jsonify({"error": f"Failed to fetch weather for {city}: {str(e)}"}), 400
+                return {"error": f"Failed to fetch weather for {city}: {str(e)}"}, 400
         
         # Validate weather data
         if not weather_data:
             print("❌ Weather data is None")
-            return jsonify({"error": "Could not fetch weather data"}), 400
+            return {"error": "Could not fetch weather data"}, 400
         
         if 'current' not in weather_data:
             print(f"❌ Missing 'current' key in weather_data: {weather_data.keys()}")
-            return jsonify({"error": "Invalid weather data format"}), 400
+            return {"error": "Invalid weather data format"}, 400
         
         current = weather_data['current']
         print(f"📊 Weather Data: temp={current.get('temperature_2m')}, code={current.get('weather_code')}")
@@ -354,11 +498,11 @@ def auto_recommend():
             print(f"🌡️ Detected Season: {season}")
         except Exception as e:
             print(f"❌ Error detecting season: {e}")
-            return jsonify({"error": f"Failed to detect season: {str(e)}"}), 400
+            return {"error": f"Failed to detect season: {str(e)}"}, 400
         
         if not season:
             print("❌ Season is None or empty")
-            return jsonify({"error": "Could not determine season"}), 400
+            return {"error": "Could not determine season"}, 400
         
         # Convert season to match your database format (capitalize first letter)
         season_formatted = season.capitalize()
@@ -366,59 +510,25 @@ def auto_recommend():
         # NOW USE YOUR ORIGINAL MODEL FOR RECOMMENDATIONS
         print(f"\n🎯 Using your ML model for recommendations...")
         
-        # Get 3 different outfit recommendations for different occasions
+        # Get 3 different outfit recommendations for different occasions;
+        # the season is the weather bucket, so any weather in it reuses the answer
         occasions = ['casual', 'sports', 'party']
-        outfit_recommendations = []
-        
-        for occasion in occasions:
-            print(f"\n📦 Getting {season_formatted} + {occasion.capitalize()} outfit...")
-            
-            # USE YOUR EXISTING FUNCTION that handles ML model and wear balancing
-            result = get_smart_recommendations_balanced(user_id, season_formatted, occasion.capitalize())
-            
-            if result['success']:
-                outfit = result['outfit']
-                
-                # Extract filenames for frontend
-                top_filename = os.path.basename(outfit['top']['file_path'])
-                bottom_filename = os.path.basename(outfit['bottom']['file_path'])
-                shoe_filename = os.path.basename(outfit['shoe']['file_path'])
-                
-                outfit_recommendations.append({
-                    'occasion': occasion.capitalize(),
-                    'season': season_formatted,
-                    'name': f"{season_formatted} {occasion.capitalize()} Outfit",
-                    'description': f"Perfect {season_formatted.lower()} outfit for {occasion} occasions",
-                    'top_image': f"/static/uploads/{user_id}/{top_filename}",
-                    'bottom_image': f"/static/uploads/{user_id}/{bottom_filename}",
-                    'shoe_image': f"/static/uploads/{user_id}/{shoe_filename}",
-                    'top_id': outfit['top']['id'],
-                    'bottom_id': outfit['bottom']['id'],
-                    'shoe_id': outfit['shoe']['id'],
-                    'top_wear_count': outfit['top']['wear_count'],
-                    'bottom_wear_count': outfit['bottom']['wear_count'],
-                    'shoe_wear_count': outfit['shoe']['wear_count']
-                })
-                
-                print(f"   ✅ Found outfit: {occasion}")
-                print(f"      Top: {top_filename} (worn {outfit['top']['wear_count']} times)")
-                print(f"      Bottom: {bottom_filename} (worn {outfit['bottom']['wear_count']} times)")
-                print(f"      Shoe: {shoe_filename} (worn {outfit['shoe']['wear_count']} times)")
-            else:
-                print(f"   ⚠️ No {season_formatted} {occasion} outfit available")
-                print(f"      Reason: {result['message']}")
+        key = recommendation_cache.make_key("auto_recommend", user_id, wardrobe_version(user_id),
+                                            season_formatted, ",".join(occasions))
+        outfit_recommendations = recommendation_cache.get_or_compute(
+            key, lambda: auto_outfits(user_id, season_formatted, occasions))
         
         # Check if we got any recommendations
         if not outfit_recommendations:
             print(f"\n❌ No outfits found for {season_formatted} season")
-            return jsonify({
+            return {
                 "error": f"No {season_formatted} outfits in your wardrobe. Please upload more {season_formatted.lower()} clothes!",
                 "season": season_formatted,
                 "temperature": temp,
                 "humidity": current.get('humidity_2m', 'N/A'),
                 "wind_speed": current.get('wind_speed_10m', 'N/A'),
                 "outfits": []
-            }), 200
+            }, 200
         
         print(f"\n✅ Successfully generated {len(outfit_recommendations)} outfit recommendations using your ML model!")
         
@@ -432,13 +542,58 @@ def auto_recommend():
             "total_outfits": len(outfit_recommendations)
         }
         
-        return jsonify(response)
+        return response, 200
     
     except Exception as e:
         print(f"\n❌ UNEXPECTED ERROR in auto_recommend: {str(e)}")
         import traceback
         traceback.print_exc()
-        return jsonify({"error": f"Server error: {str(e)}"}), 500
+        return {"error": f"Server error: {str(e)}"}, 500
+
+
+def auto_outfits(user_id, season_formatted, occasions):
+    """One outfit per occasion for the season (occasions without enough items are skipped)"""
+    outfit_recommendations = []
+    
+    for occasion in occasions:
+        print(f"\n📦 Getting {season_formatted} + {occasion.capitalize()} outfit...")
+        
+        # USE YOUR EXISTING FUNCTION that handles ML model and wear balancing
+        result = get_smart_recommendations_balanced(user_id, season_formatted, occasion.capitalize())
+        
+        if result['success']:
+            outfit = result['outfit']
+            
+            # Extract filenames for frontend
+            top_filename = os.path.basename(outfit['top']['file_path'])
+            bottom_filename = os.path.basename(outfit['bottom']['file_path'])
+            shoe_filename = os.path.basename(outfit['shoe']['file_path'])
+            
+            outfit_recommendations.append({
+                'occasion': occasion.capitalize(),
+                'season': season_formatted,
+                'name': f"{season_formatted} {occasion.capitalize()} Outfit",
+                'description': f"Perfect {season_formatted.lower()} outfit for {occasion} occasions",
+                'top_image': thumbnail_url(user_id, outfit['top']['file_path']),
+                'bottom_image': thumbnail_url(user_id, outfit['bottom']['file_path']),
+                'shoe_image': thumbnail_url(user_id, outfit['shoe']['file_path']),
+                'top_id': outfit['top']['id'],
+                'bottom_id': outfit['bottom']['id'],
+                'shoe_id': outfit['shoe']['id'],
+                'top_wear_count': outfit['top']['wear_count'],
+                'bottom_wear_count': outfit['bottom']['wear_count'],
+                'shoe_wear_count': outfit['shoe']['wear_count']
+            })
+            
+            print(f"   ✅ Found outfit: {occasion}")
+            print(f"      Top: {top_filename} (worn {outfit['top']['wear_count']} times)")
+            print(f"      Bottom: {bottom_filename} (worn {outfit['bottom']['wear_count']} times)")
+            print(f"      Shoe: {shoe_filename} (worn {outfit['shoe']['wear_count']} times)")
+        else:
+            print(f"   ⚠️ No {season_formatted} {occasion} outfit available")
+            print(f"      Reason: {result['message']}")
+    
+    return outfit_recommendations
 
 
 # ==========================================
@@ -479,6 +634,7 @@ def mark_outfit_worn():
             VALUES (?, ?, ?, ?)
         """, (user_id, top_id, bottom_id, shoe_id))
         
+        refresh_worn_lists(conn, user_id)
         conn.commit()
         conn.close()
         
@@ -495,29 +651,48 @@ def mark_outfit_worn():
 
 @app.route("/wardrobe")
 def wardrobe():
-    """Display user's wardrobe with wear counts"""
+    """
+    Display user's wardrobe with wear counts
+    Only the per-subtype counts are rendered here; the cards are loaded
+    page by page from /api/wardrobe as the user scrolls
+    """
     if "user_id" not in session:
         return redirect(url_for("login"))
 
     user_id = session["user_id"]
     conn = get_db_connection()
-    clothes = conn.execute("SELECT * FROM clothes WHERE user_id=?", (user_id,)).fetchall()
+    counts = get_wardrobe_counts(conn, user_id)
     conn.close()
 
-    # Organize clothes by subtype with all metadata
-    wardrobe = {"top": [], "bottom": [], "foot": []}
-    for c in clothes:
-        wardrobe[c["subtype"]].append({
-            "id": c["id"],
-            "file_name": os.path.basename(c["file_path"]),
-            "url": f"/static/uploads/{user_id}/{os.path.basename(c['file_path'])}",
-            "subtype": c["subtype"],
-            "season": c["season"],
-            "occasion": c["occasion"],
-            "wear_count": c["wear_count"]
-        })
+    return render_template("wardrobe.html", counts=counts, user=user_id)
 
-    return render_template("wardrobe.html", wardrobe=wardrobe, user=user_id)
+
+@app.route("/api/wardrobe")
+def wardrobe_api():
+    """
+    One page of the user's wardrobe as JSON
+    Query params: subtype, season, occasion (filters), limit (max 100), cursor
+    """
+    if "user_id" not in session:
+        return jsonify({'error': 'Please login first'}), 401
+
+    user_id = session["user_id"]
+    conn = get_db_connection()
+    try:
+        items, next_cursor = get_wardrobe_page(
+            conn, user_id,
+            subtype=request.args.get("subtype"),
+            season=request.args.get("season"),
+            occasion=request.args.get("occasion"),
+            cursor=request.args.get("cursor"),
+            limit=parse_page_limit(default=24),
+        )
+    except ValueError as e:
+        conn.close()
+        return jsonify({'error': str(e)}), 400
+    conn.close()
+
+    return jsonify({'items': items, 'next_cursor': next_cursor})
 
 
 # ==========================================
@@ -538,14 +713,15 @@ def update_item():
     new_occasion = data.get("occasion").lower()  # FIXED: Convert to lowercase
     
     # Construct full file path
-    file_path = os.path.join(BASE_UPLOAD_FOLDER, str(user_id), file_name)
+    file_path = os.path.join(app.config["UPLOAD_FOLDER"], str(user_id), file_name)
     
     # Update database
     conn = get_db_connection()
     try:
+        # Mark both values as user-set so reclassify.py never overwrites them
         conn.execute("""
             UPDATE clothes 
-            SET season = ?, occasion = ? 
+            SET season = ?, occasion = ?, season_edited = 1, occasion_edited = 1 
             WHERE user_id = ? AND file_path = ?
         """, (new_season, new_occasion, user_id, file_path))
         conn.commit()
@@ -570,15 +746,21 @@ def delete_item():
     user_id = session["user_id"]
     data = request.get_json()
     file_name = data.get("file")
-    file_path = os.path.join(BASE_UPLOAD_FOLDER, str(user_id), file_name)
+    file_path = os.path.join(app.config["UPLOAD_FOLDER"], str(user_id), file_name)
 
     if os.path.exists(file_path):
         os.remove(file_path)
+        remove_derivatives(file_path)
         # Remove from DB
         conn = get_db_connection()
+        item_ids = [row["id"] for row in conn.execute(
+            "SELECT id FROM clothes WHERE user_id=? AND file_path=?", (user_id, file_path))]
         conn.execute("DELETE FROM clothes WHERE user_id=? AND file_path=?", (user_id, file_path))
+        refresh_worn_lists(conn, user_id)
         conn.commit()
         conn.close()
+        for item_id in item_ids:
+            drop_features(item_id)
         return jsonify({"success": True})
     else:
         return jsonify({"success": False, "error": "File not found"})
@@ -591,51 +773,19 @@ def delete_item():
 
 @app.route("/wardrobe_stats")
 def wardrobe_stats():
-    """Get statistics about wardrobe usage"""
+    """
+    Get statistics about wardrobe usage
+    Reads the incrementally maintained user_stats row instead of aggregating clothes
+    """
     if "user_id" not in session:
         return jsonify({'error': 'Not logged in'}), 401
     
     user_id = session["user_id"]
     conn = get_db_connection()
-    
-    stats = conn.execute("""
-        SELECT 
-            COUNT(*) as total_items,
-            SUM(wear_count) as total_wears,
-            AVG(wear_count) as avg_wears,
-            MIN(wear_count) as min_wears,
-            MAX(wear_count) as max_wears
-        FROM clothes
-        WHERE user_id = ?
-    """, (user_id,)).fetchone()
-    
-    # Get most worn items
-    most_worn = conn.execute("""
-        SELECT id, file_path, subtype, wear_count 
-        FROM clothes 
-        WHERE user_id = ? 
-        ORDER BY wear_count DESC 
-        LIMIT 3
-    """, (user_id,)).fetchall()
-    
-    # Get least worn items
-    least_worn = conn.execute("""
-        SELECT id, file_path, subtype, wear_count 
-        FROM clothes 
-        WHERE user_id = ? 
-        ORDER BY wear_count ASC 
-        LIMIT 3
-    """, (user_id,)).fetchall()
-    
+    stats = get_user_stats(conn, user_id)
     conn.close()
     
-    return jsonify({
-        'total_items': stats['total_items'] or 0,
-        'total_wears': stats['total_wears'] or 0,
-        'avg_wears': round(stats['avg_wears'], 2) if stats['avg_wears'] else 0,
-        'most_worn': [{'id': m['id'], 'path': m['file_path'], 'type': m['subtype'], 'count': m['wear_count']} for m in most_worn],
-        'least_worn': [{'id': l['id'], 'path': l['file_path'], 'type': l['subtype'], 'count': l['wear_count']} for l in least_worn]
-    })
+    return jsonify(stats)
 
 
 # ==========================================
@@ -645,30 +795,39 @@ def wardrobe_stats():
 
 @app.route("/outfit_history")
 def outfit_history():
-    """Display outfit wear history"""
+    """Display outfit wear history (20 per page, ?cursor= for older outfits)"""
     if "user_id" not in session:
         return redirect(url_for("login"))
     
     user_id = session["user_id"]
     conn = get_db_connection()
+    try:
+        history, next_cursor = get_outfit_history_page(conn, user_id, request.args.get("cursor"))
+    except ValueError:
+        history, next_cursor = get_outfit_history_page(conn, user_id)
+    conn.close()
     
-    history = conn.execute("""
-        SELECT oh.*, 
-               c1.file_path as top_path,
-               c2.file_path as bottom_path,
-               c3.file_path as shoe_path
-        FROM outfit_history oh
-        LEFT JOIN clothes c1 ON oh.top_id = c1.id
-        LEFT JOIN clothes c2 ON oh.bottom_id = c2.id
-        LEFT JOIN clothes c3 ON oh.shoe_id = c3.id
-        WHERE oh.user_id = ?
-        ORDER BY oh.date_worn DESC
-        LIMIT 20
-    """, (user_id,)).fetchall()
+    return render_template("outfit_history.html", history=history, next_cursor=next_cursor, user=user_id)
+
+
+@app.route("/api/outfit_history")
+def outfit_history_api():
+    """Outfit wear history as JSON: ?limit= (max 100) and ?cursor= from the previous page"""
+    if "user_id" not in session:
+        return jsonify({'error': 'Please login first'}), 401
     
+    user_id = session["user_id"]
+    conn = get_db_connection()
+    try:
+        history, next_cursor = get_outfit_history_page(
+            conn, user_id, request.args.get("cursor"), parse_page_limit()
+        )
+    except ValueError as e:
+        conn.close()
+        return jsonify({'error': str(e)}), 400
     conn.close()
     
-    return render_template("outfit_history.html", history=history, user=user_id)
+    return jsonify({'items': history, 'next_cursor': next_cursor})
 
 
 # ==========================================
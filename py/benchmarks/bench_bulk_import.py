@@ -0,0 +1,110 @@
+"""
+Benchmark onboarding a folder of photos: the /upload path one file at a time
+(decode, color, predict, INSERT + commit per photo) vs bulk_import with a
+process pool and batched inference / executemany.
+
+    python -m benchmarks.bench_bulk_import --images 200 --size 1200x1600 --workers 4
+    python -m benchmarks.bench_bulk_import --zip      # import from a .zip archive
+
+Uses the NumPy stand-in classifier unless --keras is given (needs TensorFlow).
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+
+import numpy as np
+import PIL.Image as Image
+
+from benchmarks.bench_thumbnails import make_photo
+from benchmarks.common import make_database, print_table, quiet, write_json
+from benchmarks.stubs import standin_classify_input
+from bulk_import import import_wardrobe
+from color_module import get_dominant_color
+from image_pipeline import decode_model_input
+
+
+def one_at_a_time(conn, user_id, paths, user_folder, classify_input):
+    """What onboarding costs today: the /upload work, serially, for every photo"""
+    start = time.perf_counter()
+    for path in paths:
+        dest = os.path.join(user_folder, os.path.basename(path))
+        shutil.copyfile(path, dest)
+        subtypes, results, _ = classify_input(decode_model_input(dest)[np.newaxis])
+        with Image.open(dest) as img:
+            get_dominant_color(img.convert("RGB"))
+        labels = results[0]
+        conn.execute("""
+            INSERT INTO clothes (user_id, file_path, subtype, color, season, occasion, wear_count)
+            VALUES (?, ?, ?, ?, ?, ?, 0)
+        """, (user_id, dest, subtypes[0], labels[2], labels[3].lower(), labels[4].lower()))
+        conn.commit()
+    return time.perf_counter() - start
+
+
+def run(n_images, width, height, workers, batch_size, use_zip, use_keras):
+    if use_keras:
+        from recognition_module import classify_input
+    else:
+        classify_input, _ = standin_classify_input()
+
+    workers = workers or os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        photos = os.path.join(tmp, "photos")
+        os.makedirs(os.path.join(photos, "summer"))
+        paths = []
+        for i in range(n_images):
+            path = os.path.join(photos, "summer" if i % 2 else "", f"IMG_{i:04d}.jpg")
+            make_photo(path, width, height, i)
+            paths.append(path)
+        source = photos
+        if use_zip:
+            source = os.path.join(tmp, "photos.zip")
+            with zipfile.ZipFile(source, "w") as archive:
+                for path in paths:
+                    archive.write(path, os.path.relpath(path, photos))
+
+        conn = make_database(os.path.join(tmp, "wardrobe.db"))
+        uploads = os.path.join(tmp, "uploads")
+        os.makedirs(os.path.join(uploads, "1"))
+        serial_seconds = one_at_a_time(conn, 1, paths, os.path.join(uploads, "1"), classify_input)
+
+        with quiet():
+            bulk = import_wardrobe(source, 2, conn, classify_input, workers=workers,
+                                   batch_size=batch_size, upload_root=uploads, derivatives=False)
+            rerun = import_wardrobe(source, 2, conn, classify_input, workers=workers,
+                                    batch_size=batch_size, upload_root=uploads, derivatives=False)
+        assert bulk["imported"] == n_images and rerun["skipped"] == n_images
+        conn.close()
+
+    rows = [
+        {'path': '/upload, one photo at a time', 'seconds': round(serial_seconds, 2),
+         'images_per_sec': round(n_images / serial_seconds, 1), 'speedup': '1x'},
+        {'path': f'bulk_import, {workers} workers', 'seconds': bulk['seconds'],
+         'images_per_sec': bulk['images_per_sec'],
+         'speedup': f"{serial_seconds / bulk['seconds']:.1f}x"},
+        {'path': 'bulk_import re-run (resume)', 'seconds': rerun['seconds'],
+         'images_per_sec': '-', 'speedup': '-'},
+    ]
+    return rows, {'images': n_images, 'size': f"{width}x{height}", 'source': 'zip' if use_zip else 'folder',
+                  'batch_size': batch_size, 'model': 'keras' if use_keras else 'numpy stand-in'}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=120)
+    parser.add_argument("--size", default="1200x1600", help="WIDTHxHEIGHT of the synthetic photos")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--zip", action="store_true", help="import from a .zip instead of a folder")
+    parser.add_argument("--keras", action="store_true", help="use the real models from recognition_module")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split("x"))
+    rows, info = run(args.images, width, height, args.workers, args.batch_size, args.zip, args.keras)
+    print_table("📊 Wardrobe onboarding", rows, ['path', 'seconds', 'images_per_sec', 'speedup'])
+    print_table("📊 Setup", [info], list(info))
+    write_json(args.json, {'benchmark': 'bulk_import', 'import': rows, 'setup': info})
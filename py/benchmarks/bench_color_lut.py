@@ -0,0 +1,136 @@
+"""
+CSS3 color naming: precomputed lookup table vs KDTree.
+
+    python -m benchmarks.bench_color_lut
+    python -m benchmarks.bench_color_lut --colors 20000 --skip-check
+
+Reports
+  table     size of data/css3_color_lut.bin and how many 4x4x4 cells need a block
+  startup   fresh interpreter -> first color named, for the table (memory-mapped)
+            and for the KDTree (import scipy + webcolors, build the tree)
+  lookup    per color: KDTree built per call (old convert_rgb_to_names),
+            a cached KDTree, the table one color at a time and vectorized
+  accuracy  every 24-bit color against a KDTree query (color_lut.check), and what
+            a single-level 6-bit table (one name per cell) would get wrong
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.common import PY_DIR, summarize, print_table, write_json
+
+START = time.perf_counter()
+
+
+def first_name(method):
+    """Runs in a child process: seconds from interpreter start to the first name"""
+    if method == "table":
+        import color_lut
+        color_lut.get_lut().name((200, 30, 40))
+    else:
+        from scipy.spatial import KDTree
+        from webcolors import CSS3_HEX_TO_NAMES, hex_to_rgb
+        KDTree([hex_to_rgb(h) for h in CSS3_HEX_TO_NAMES]).query((200, 30, 40))
+    return time.perf_counter() - START
+
+
+def startup(method, runs):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-m", "benchmarks.bench_color_lut", "--child", method],
+                             cwd=PY_DIR, capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(out.strip().splitlines()[-1]) * 1000.0)
+    return summarize(samples)
+
+
+def kdtree_per_call(rgb_tuple):
+    """convert_rgb_to_names as it was: a new KDTree every call"""
+    from scipy.spatial import KDTree
+    from webcolors import CSS3_HEX_TO_NAMES, hex_to_rgb
+    names = []
+    rgb_values = []
+    for color_hex, color_name in CSS3_HEX_TO_NAMES.items():
+        names.append(color_name)
+        rgb_values.append(hex_to_rgb(color_hex))
+    return names[KDTree(rgb_values).query(rgb_tuple)[1]]
+
+
+def per_color_us(fn, colors):
+    start = time.perf_counter()
+    for c in colors:
+        fn(c)
+    return (time.perf_counter() - start) * 1e6 / len(colors)
+
+
+def run(n_colors, startup_runs, check):
+    import color_lut
+    import color_module
+
+    lut = color_lut.get_lut()
+    if lut is None:
+        raise SystemExit(f"❌ No table at {color_lut.DEFAULT_PATH}; run `python color_lut.py build`")
+    n_blocks = 0 if lut.blocks is None else lut.blocks.shape[0]
+    table = {'file_KB': round(os.path.getsize(lut.path) / 1024.0, 1), 'top_KB': round(lut.top.nbytes / 1024.0, 1),
+             'blocks_KB': round(0 if lut.blocks is None else lut.blocks.nbytes / 1024.0, 1),
+             'mixed_cells': n_blocks, 'cells': lut.top.size}
+
+    startup_rows = []
+    for method in ("table", "kdtree"):
+        summary = startup(method, startup_runs)
+        startup_rows.append({'method': method, 'p50_ms': round(summary['p50_ms'], 1),
+                             'p95_ms': round(summary['p95_ms'], 1)})
+
+    rng = random.Random(7)
+    colors = [tuple(rng.randrange(256) for _ in range(3)) for _ in range(n_colors)]
+    cached = color_module._kdtree_name
+    cached(colors[0])
+    lookup_rows = [
+        {'method': "KDTree per call (old)", 'us_per_color': round(per_color_us(kdtree_per_call, colors[:500]), 2)},
+        {'method': "cached KDTree", 'us_per_color': round(per_color_us(cached, colors), 2)},
+        {'method': "table, one color", 'us_per_color': round(per_color_us(lut.name, colors), 2)},
+    ]
+    array = np.array(colors, dtype=np.uint8)
+    start = time.perf_counter()
+    names = [lut.names[i] for i in lut.indices(array)]
+    lookup_rows.append({'method': "table, vectorized",
+                        'us_per_color': round((time.perf_counter() - start) * 1e6 / n_colors, 3)})
+    assert names == [cached(c) for c in colors]
+
+    accuracy = {}
+    if n_blocks:
+        # A single-level table would give each mixed cell its most common name
+        blocks = np.asarray(lut.blocks).reshape(n_blocks, -1)
+        wrong = sum(blocks.shape[1] - np.bincount(row).max() for row in blocks)
+        accuracy['single_level_6bit_wrong'] = int(wrong)
+        accuracy['single_level_6bit_accuracy'] = round(1 - int(wrong) / 2 ** 24, 4)
+    if check:
+        accuracy['table_vs_kdtree_mismatches'] = color_lut.check(lut.path)
+    return table, startup_rows, lookup_rows, accuracy
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--colors", type=int, default=50000, help="random colors per lookup method")
+    parser.add_argument("--startup-runs", type=int, default=5)
+    parser.add_argument("--skip-check", action="store_true", help="skip the full 16.7M-color comparison")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(first_name(args.child)))
+        raise SystemExit(0)
+
+    table, startup_rows, lookup_rows, accuracy = run(args.colors, args.startup_runs, not args.skip_check)
+    print_table("📊 Lookup table", [table], list(table))
+    print_table("📊 Fresh process to first color name", startup_rows, ['method', 'p50_ms', 'p95_ms'])
+    print_table(f"📊 Naming {args.colors} random colors", lookup_rows, ['method', 'us_per_color'])
+    print(f"\nAccuracy: {accuracy}")
+    write_json(args.json, {'benchmark': 'color_lut', 'table': table, 'startup': startup_rows,
+                           'lookup': lookup_rows, 'accuracy': accuracy})
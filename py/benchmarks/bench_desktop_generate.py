@@ -0,0 +1,104 @@
+"""
+Outfit generation and deletes in the desktop app: the old list scans
+(Ui_MainWindow.Generate / *_LIST_DEL before desktop_wardrobe) vs WardrobeIndex.
+
+    python -m benchmarks.bench_desktop_generate
+    python -m benchmarks.bench_desktop_generate --sizes 1000,10000,100000 --iterations 2000
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from benchmarks.common import summarize, print_table, write_json
+from desktop_wardrobe import WardrobeIndex
+
+SEASONS = ["Spring", "Summer", "Fall", "Winter"]
+OCCASIONS = ["Casual", "Ethnic", "Formal", "Party", "Smart Casual", "Sports", "Travel"]
+
+
+def make_results(n, rng):
+    """n (subtype, info, res) tuples shaped like single_classification output"""
+    rows = []
+    for i in range(n):
+        sub = rng.choice(["top", "bottom", "foot"])
+        res = ["Tshirts", "Men", "Blue", rng.choice(SEASONS), rng.choice(OCCASIONS), f"/photos/{i}.jpg"]
+        rows.append((sub, ", ".join(res), res))
+    return rows
+
+
+def legacy_generate(top, bottom, shoes, toseason):
+    """The list-scanning Generate this replaces (minus the pixmap loading)"""
+    top_right_season = [i for i in top if i[3] == toseason]
+    if top_right_season != []:
+        ad_top = top_right_season[np.random.randint(len(top_right_season))]
+    else:
+        ad_top = top[np.random.randint(len(top))]
+    picks = [ad_top]
+    for items in (bottom, shoes):
+        helper = [i for i in items if i[4] == ad_top[4]]
+        if helper == []:
+            picks.append(items[np.random.randint(len(items))])
+        else:
+            right_season = [i for i in helper if i[3] == toseason]
+            pool = right_season if right_season != [] else helper
+            picks.append(pool[np.random.randint(len(pool))])
+    return picks
+
+
+def time_each(fn, args_list):
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return summarize(samples)
+
+
+def run(sizes, iterations, seed=7):
+    rows = []
+    for n in sizes:
+        rng = random.Random(seed)
+        results = make_results(n, rng)
+        lists = {"top": [], "bottom": [], "foot": []}
+        index = WardrobeIndex(random.Random(seed))
+        for sub, info, res in results:
+            lists[sub].append(res)
+            index.add(sub, info, res)
+
+        seasons = [(rng.choice(SEASONS),) for _ in range(iterations)]
+        old = time_each(lambda s: legacy_generate(lists["top"], lists["bottom"], lists["foot"], s), seasons)
+        new = time_each(index.generate, seasons)
+        rows.append({'items': n, 'op': 'generate', 'old_p50_ms': round(old['p50_ms'], 4),
+                     'new_p50_ms': round(new['p50_ms'], 4),
+                     'speedup': round(old['p50_ms'] / new['p50_ms'], 1) if new['p50_ms'] else 0.0})
+
+        # delete the same random items both ways (old: linear scan + list.remove by path)
+        victims = rng.sample(range(n), min(iterations, n // 2))
+        paths = [(results[i][0], results[i][2][-1]) for i in victims]
+
+        def legacy_delete(sub, path):
+            for i in lists[sub]:
+                if i[-1] == path:
+                    lists[sub].remove(i)
+
+        old = time_each(legacy_delete, paths)
+        new = time_each(lambda sub, path: index.remove(index.by_path[path]), paths)
+        rows.append({'items': n, 'op': 'delete', 'old_p50_ms': round(old['p50_ms'], 4),
+                     'new_p50_ms': round(new['p50_ms'], 4),
+                     'speedup': round(old['p50_ms'] / new['p50_ms'], 1) if new['p50_ms'] else 0.0})
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,10000")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    rows = run([int(n) for n in args.sizes.split(",")], args.iterations)
+    print_table("📊 Desktop wardrobe: list scans vs WardrobeIndex", rows,
+                ['items', 'op', 'old_p50_ms', 'new_p50_ms', 'speedup'])
+    write_json(args.json, {'benchmark': 'desktop_generate', 'rows': rows})
@@ -0,0 +1,134 @@
+"""
+Launch-to-ready time of the desktop app (ui_module) for a saved wardrobe,
+run headless with QT_QPA_PLATFORM=offscreen.
+
+    python -m benchmarks.bench_desktop_startup
+    python -m benchmarks.bench_desktop_startup --items 1000 --changed 10 --touched 50
+
+Scenarios (each launch is a fresh interpreter):
+  re-classify all   what every launch used to cost: classify every photo again
+  saved, unchanged  DesktopStore.load(): one bulk read + a stat() per photo
+  saved, some edits --changed photos rewritten (re-classified) and --touched photos
+                    with a new mtime but the same bytes (hash check only)
+"Ready" = every item is in the lists and nothing is left to classify.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import PY_DIR, print_table, write_json
+
+START = time.perf_counter()
+
+
+def launch(db_path, paths, reclassify_all):
+    """Runs in a child process: seconds from interpreter start until the wardrobe is ready"""
+    from PyQt5 import QtCore, QtWidgets
+
+    import ui_module
+    from desktop_store import DesktopStore
+
+    app = QtWidgets.QApplication(sys.argv)
+    window = QtWidgets.QMainWindow()
+    ui = ui_module.Ui_MainWindow(None if reclassify_all else DesktopStore(db_path))
+    ui.setupUi(window)
+    window.show()
+    ready = {}
+
+    def finish():
+        ready['at'] = time.perf_counter()
+        app.quit()
+
+    def start():
+        if reclassify_all:
+            worker = ui.classify(paths)
+        else:
+            if ui.load_wardrobe() == 0:
+                finish()
+                return
+            worker = ui.workers[-1]
+        worker.signals.finished.connect(finish)
+
+    QtCore.QTimer.singleShot(0, start)
+    app.exec_()
+    items = ui.TOP_LIST.count() + ui.BOTTOM_LIST.count() + ui.SHOE_LIST.count()
+    return ready['at'] - START, items
+
+
+def run_child(args, env):
+    out = subprocess.run([sys.executable, "-m", "benchmarks.bench_desktop_startup"] + args, cwd=PY_DIR, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def run(n_items, size, changed, touched, env):
+    from benchmarks.bench_thumbnails import make_photo
+    from desktop_store import DesktopStore
+    from recognition_module import classify_paths
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        photos = os.path.join(tmp, "photos")
+        os.makedirs(photos)
+        paths = []
+        for i in range(n_items):
+            path = os.path.join(photos, f"IMG_{i:05d}.jpg")
+            make_photo(path, size[0], size[1], i)
+            paths.append(path)
+        paths_file = os.path.join(tmp, "paths.json")
+        with open(paths_file, "w") as f:
+            json.dump(paths, f)
+
+        # Save the wardrobe once, as a first launch would
+        db_path = os.path.join(tmp, "desktop.db")
+        store = DesktopStore(db_path)
+        for path, outcome in classify_paths(paths):
+            store.save(*outcome)
+        store.close()
+
+        scenarios = [("re-classify all (old)", ["--reclassify-all"]), ("saved, unchanged", [])]
+        for label, flag in scenarios:
+            result = run_child(["--child", "--db", db_path, "--paths", paths_file] + flag, env)
+            rows.append({'launch': label, 'ready_s': round(result['seconds'], 2), 'items': result['items']})
+
+        for i in range(changed):
+            make_photo(paths[i], size[0], size[1], 10 ** 6 + i)
+        for path in paths[changed:changed + touched]:
+            os.utime(path)
+        result = run_child(["--child", "--db", db_path, "--paths", paths_file], env)
+        rows.append({'launch': f"saved, {changed} changed + {touched} touched",
+                     'ready_s': round(result['seconds'], 2), 'items': result['items']})
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--size", default="120x160", help="WIDTHxHEIGHT of the test photos")
+    parser.add_argument("--changed", type=int, default=10)
+    parser.add_argument("--touched", type=int, default=50)
+    parser.add_argument("--backend", default="numpy-random")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--paths", help=argparse.SUPPRESS)
+    parser.add_argument("--reclassify-all", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        with open(args.paths) as f:
+            seconds, items = launch(args.db, json.load(f), args.reclassify_all)
+        print(json.dumps({'seconds': seconds, 'items': items}))
+        raise SystemExit(0)
+
+    os.environ["WARDROBE_MODEL_BACKEND"] = args.backend
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    width, height = (int(v) for v in args.size.split("x"))
+    rows = run(args.items, (width, height), args.changed, args.touched, env)
+    print_table(f"📊 Desktop launch-to-ready, {args.items} items ({args.size} photos)", rows,
+                ['launch', 'ready_s', 'items'])
+    write_json(args.json, {'benchmark': 'desktop_startup', 'backend': args.backend, 'launches': rows})
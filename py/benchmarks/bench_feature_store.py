@@ -0,0 +1,93 @@
+"""
+Benchmark full-wardrobe reclassification: decoding every upload and running the
+models one image at a time vs streaming model inputs out of the feature store
+in batches.
+
+    python -m benchmarks.bench_feature_store --images 500 --size 1200x1600
+    python -m benchmarks.bench_feature_store --keras    # real models (needs TensorFlow)
+
+Without --keras a NumPy stand-in (one dense layer + softmax per head) replaces
+the models, so the numbers isolate decode/IO cost from inference cost.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_thumbnails import make_photo
+from benchmarks.common import print_table, write_json
+from benchmarks.stubs import standin_classify_input
+from feature_store import FeatureStore, rescore
+from image_pipeline import decode_model_input
+
+
+def run(n_images, width, height, batch_size, use_keras):
+    if use_keras:
+        from recognition_module import classify_input, PROB_WIDTH as prob_width
+    else:
+        classify_input, prob_width = standin_classify_input()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(n_images):
+            path = os.path.join(tmp, f"IMG_{i:04d}.jpg")
+            make_photo(path, width, height, i)
+            paths.append(path)
+
+        # Build the store the way uploads do: one append per item
+        store = FeatureStore(os.path.join(tmp, "store"), prob_width=prob_width)
+        start = time.perf_counter()
+        for item_id, path in enumerate(paths, 1):
+            model_input = decode_model_input(path)
+            _, _, probs = classify_input(model_input[np.newaxis])
+            store.append(item_id, model_input, probs[0], (0, 0, 0))
+        store.flush()
+        append_seconds = time.perf_counter() - start
+
+        # Before: decode every upload, predict one image at a time
+        start = time.perf_counter()
+        legacy = []
+        for path in paths:
+            legacy.append(classify_input(decode_model_input(path)[np.newaxis])[2][0])
+        legacy_seconds = time.perf_counter() - start
+
+        # After: zero-copy batches straight from the memory-mapped store
+        reader = FeatureStore(os.path.join(tmp, "store"), readonly=False)
+        start = time.perf_counter()
+        results = rescore(reader, classify_input, batch_size)
+        store_seconds = time.perf_counter() - start
+
+        assert len(results) == n_images
+        assert np.allclose(np.stack(legacy), reader.probs[:n_images], atol=1e-4)
+        store_mb = sum(os.path.getsize(os.path.join(tmp, "store", f))
+                       for f in os.listdir(os.path.join(tmp, "store"))) / 1e6
+
+    rows = [
+        {'path': 'decode + predict per image', 'seconds': round(legacy_seconds, 2),
+         'items_per_sec': round(n_images / legacy_seconds, 1), 'speedup': '1x'},
+        {'path': f'feature store, batch {batch_size}', 'seconds': round(store_seconds, 2),
+         'items_per_sec': round(n_images / store_seconds, 1),
+         'speedup': f"{legacy_seconds / store_seconds:.0f}x"},
+    ]
+    info = {'images': n_images, 'model': 'keras' if use_keras else 'numpy stand-in',
+            'append_ms_per_item': round(append_seconds * 1000 / n_images, 2),
+            'store_mb': round(store_mb, 1)}
+    return rows, info
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=300)
+    parser.add_argument("--size", default="1200x1600", help="WIDTHxHEIGHT of the synthetic photos")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--keras", action="store_true", help="use the real models from recognition_module")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split("x"))
+    rows, info = run(args.images, width, height, args.batch_size, args.keras)
+    print_table("📊 Full-wardrobe reclassification", rows, ['path', 'seconds', 'items_per_sec', 'speedup'])
+    print_table("📊 Store", [info], list(info))
+    write_json(args.json, {'benchmark': 'feature_store', 'reclassify': rows, 'store': info})
@@ -0,0 +1,148 @@
+"""
+Repeat page loads of the wardrobe against the image route, with a browser-like cache.
+
+    python -m benchmarks.bench_images
+    python -m benchmarks.bench_images --items 72 --loads 5 --size 1200x1600
+
+A "page load" is GET /wardrobe, GET /api/wardrobe?limit=<items> and every card
+thumbnail it lists. The simulated browser keeps each response: while it is fresh
+(max-age/immutable) it makes no request, otherwise it revalidates with
+If-None-Match / If-Modified-Since. The same uploads are served two ways:
+  static handler (old)  Flask's static view under /static/uploads/, reached by anyone
+  /images               image_serving: owner only, immutable for hashed/versioned URLs
+Also times one full-size image through the app with send_file vs
+X-Accel-Redirect offload (the app only checks access and sends headers).
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+
+from benchmarks.common import make_database, load_app, login, quiet, summarize, print_table, write_json
+
+
+class BrowserCache:
+    """Just enough of an HTTP cache: freshness from Cache-Control, validators for the rest"""
+
+    def __init__(self, client):
+        self.client = client
+        self.entries = {}
+        self.requests = 0
+        self.bytes = 0
+
+    def get(self, url):
+        entry = self.entries.get(url)
+        now = time.time()
+        if entry and entry['fresh_until'] > now:
+            return entry['status']
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        response = self.client.get(url, headers=headers)
+        self.requests += 1
+        self.bytes += len(response.data) + sum(len(k) + len(v) + 4 for k, v in response.headers.items())
+        if response.status_code == 304 and entry:
+            entry['fresh_until'] = now + (response.cache_control.max_age or 0)
+            return entry['status']
+        cc = response.cache_control
+        self.entries[url] = {
+            'status': response.status_code,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fresh_until': 0 if cc.no_cache else now + (cc.max_age or 0),
+        }
+        return response.status_code
+
+
+def page_load(browser, items, legacy):
+    browser.get("/wardrobe")
+    listing = browser.client.get(f"/api/wardrobe?limit={items}").get_json()
+    browser.requests += 1
+    for item in listing['items']:
+        url = item['thumb_url']
+        if legacy:
+            # How the page used to link it: the static folder, no version
+            url = "/legacy_static/" + url.split("?")[0][len("/images/"):]
+        assert browser.get(url) == 200
+
+
+def run(n_items, size, loads, iterations):
+    from flask import send_from_directory
+
+    from benchmarks.bench_thumbnails import make_photo
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "wardrobe.db")
+        make_database(db_path).close()
+        m = load_app(db_path)
+        import image_pipeline
+        import image_serving
+
+        upload_root = os.path.join(tmp, "uploads")
+        m.app.config["UPLOAD_FOLDER"] = upload_root
+        m.schedule_derivatives = image_pipeline.generate_derivatives
+
+        @m.app.route("/legacy_static/<path:filename>")
+        def legacy_static(filename):
+            # What Flask's static view did for /static/uploads/<filename>
+            return send_from_directory(upload_root, filename)
+
+        client = m.app.test_client()
+        login(client, 1)
+        photo = os.path.join(tmp, "photo.jpg")
+        with quiet():
+            for i in range(n_items):
+                make_photo(photo, size[0], size[1], i)
+                with open(photo, "rb") as f:
+                    client.post("/upload", data={'file': (io.BytesIO(f.read()), f"IMG_{i:04d}.jpg")})
+
+        page_rows = []
+        for label, legacy in (("static handler (old)", True), ("/images", False)):
+            browser = BrowserCache(client)
+            for load in range(1, loads + 1):
+                before_requests, before_bytes = browser.requests, browser.bytes
+                page_load(browser, n_items, legacy)
+                page_rows.append({'serving': label, 'load': load, 'requests': browser.requests - before_requests,
+                                  'KB': round((browser.bytes - before_bytes) / 1024.0, 1)})
+
+        listing = client.get(f"/api/wardrobe?limit=1").get_json()['items'][0]
+        offload_rows = []
+        for mode in ("", "nginx"):
+            image_serving.OFFLOAD = mode
+            samples = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                response = client.get(listing['url'])
+                response.data
+                samples.append((time.perf_counter() - start) * 1000.0)
+            summary = summarize(samples)
+            offload_rows.append({'send': mode or "send_file", 'p50_ms': round(summary['p50_ms'], 3),
+                                 'p95_ms': round(summary['p95_ms'], 3), 'body_KB': round(len(response.data) / 1024.0, 1)})
+        image_serving.OFFLOAD = ""
+
+        other = m.app.test_client()
+        login(other, 2)
+        leaked = {'static handler (old)': other.get("/legacy_static/" + listing['url'][len("/images/"):]).status_code,
+                  '/images': other.get(listing['url']).status_code}
+    return page_rows, offload_rows, leaked
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=48, help="cards on the page")
+    parser.add_argument("--size", default="1200x1600", help="WIDTHxHEIGHT of the uploads")
+    parser.add_argument("--loads", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=300, help="full-size GETs per send mode")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split("x"))
+    page_rows, offload_rows, leaked = run(args.items, (width, height), args.loads, args.iterations)
+    print_table(f"📊 Wardrobe page loads, {args.items} cards", page_rows, ['serving', 'load', 'requests', 'KB'])
+    print_table("📊 One full-size upload through the app", offload_rows, ['send', 'p50_ms', 'p95_ms', 'body_KB'])
+    print(f"\nAnother user's request for the same file: {leaked}")
+    write_json(args.json, {'benchmark': 'images', 'page_loads': page_rows, 'offload': offload_rows,
+                           'other_user_status': leaked})
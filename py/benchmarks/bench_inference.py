@@ -0,0 +1,127 @@
+"""
+Inference microbenchmark: per-stage cost of single_classification across
+image sizes and batch sizes, for any registered model backend.
+
+    python -m benchmarks.bench_inference                               # numpy-random stand-in
+    python -m benchmarks.bench_inference --backend keras               # bundled models
+    python -m benchmarks.bench_inference --backend keras-random        # same architecture, random weights
+    python -m benchmarks.bench_inference --sizes 600x800,3024x4032 --batch-sizes 1,8,32,128
+
+Stages:
+  decode                full JPEG decode to RGB
+  resize                RGB -> 80x60 model input (nearest, as the classifier does)
+  sub_forward           sub_model forward pass            (per batch size)
+  head_forward          top head model forward pass       (per batch size)
+  get_cloth_color       dominant-color scan + CSS3 naming
+  convert_rgb_to_names  CSS3 naming alone (memory-mapped LUT, KDTree if the LUT is missing)
+Each stage reports p50/p95/p99, items/sec and the process peak RSS after it ran.
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+import PIL.Image as Image
+
+from benchmarks.bench_thumbnails import make_photo
+from benchmarks.common import summarize, print_table, write_json
+
+DEFAULT_SIZES = "600x800,1200x1600,3024x4032"
+DEFAULT_BATCH_SIZES = "1,8,32"
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def time_stage(fn, iterations, max_seconds, warmup=1):
+    """Like common.time_calls, but stops early once max_seconds is spent (min 3 samples)"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    deadline = time.perf_counter() + max_seconds
+    while len(samples) < iterations and (len(samples) < 3 or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return samples
+
+
+def stage_row(stage, size, batch, samples):
+    summary = summarize(samples)
+    return {
+        'stage': stage, 'size': size, 'batch': batch, 'n': summary['n'],
+        'p50_ms': round(summary['p50_ms'], 3), 'p95_ms': round(summary['p95_ms'], 3),
+        'p99_ms': round(summary['p99_ms'], 3),
+        'items_per_sec': round(batch * 1000.0 / summary['mean_ms'], 1) if summary['mean_ms'] else 0.0,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def run(backend_name, sizes, batch_sizes, iterations, max_seconds):
+    import recognition_module
+    from color_module import get_cloth_color, convert_rgb_to_names
+
+    backend = recognition_module.get_models(backend_name)
+    start = time.perf_counter()
+    backend.warm_up()
+    warm_up_ms = round((time.perf_counter() - start) * 1000.0, 1)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for width, height in sizes:
+            size = f"{width}x{height}"
+            path = os.path.join(tmp, f"photo_{size}.jpg")
+            make_photo(path, width, height, width)
+
+            def decode():
+                with Image.open(path) as img:
+                    return img.convert("RGB")
+
+            rgb = decode()
+            rows.append(stage_row('decode', size, 1, time_stage(decode, iterations, max_seconds)))
+            rows.append(stage_row('resize', size, 1, time_stage(
+                lambda: np.asarray(rgb.resize((60, 80), Image.NEAREST), dtype=np.uint8), iterations, max_seconds)))
+            rows.append(stage_row('get_cloth_color', size, 1, time_stage(
+                lambda: get_cloth_color(rgb), iterations, max_seconds)))
+
+        model_input = np.asarray(rgb.resize((60, 80), Image.NEAREST), dtype=np.float32)
+        rows.append(stage_row('convert_rgb_to_names', '-', 1, time_stage(
+            lambda: convert_rgb_to_names((200, 30, 40)), iterations, max_seconds)))
+        for batch_size in batch_sizes:
+            batch = np.repeat(model_input[np.newaxis], batch_size, axis=0)
+            rows.append(stage_row('sub_forward', '80x60', batch_size, time_stage(
+                lambda: backend.predict_sub(batch), iterations, max_seconds)))
+            rows.append(stage_row('head_forward', '80x60', batch_size, time_stage(
+                lambda: backend.predict_heads("top", batch), iterations, max_seconds)))
+
+    return rows, {'backend': backend.name, 'warm_up_ms': warm_up_ms, 'peak_rss_mb': peak_rss_mb()}
+
+
+def parse_sizes(text):
+    return [tuple(int(v) for v in size.split("x")) for size in text.split(",")]
+
+
+if __name__ == "__main__":
+    from model_backends import BACKENDS
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default="numpy-random", choices=sorted(BACKENDS))
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma-separated WIDTHxHEIGHT photo sizes")
+    parser.add_argument("--batch-sizes", default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="time budget per stage")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    rows, info = run(args.backend, parse_sizes(args.sizes),
+                     [int(b) for b in args.batch_sizes.split(",")], args.iterations, args.max_seconds)
+    print_table("📊 single_classification stages", rows,
+                ['stage', 'size', 'batch', 'n', 'p50_ms', 'p95_ms', 'p99_ms', 'items_per_sec', 'peak_rss_mb'])
+    print_table("📊 Backend", [info], list(info))
+    write_json(args.json, {'benchmark': 'inference', 'stages': rows, 'backend': info})
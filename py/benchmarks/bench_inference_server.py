@@ -0,0 +1,136 @@
+"""
+Classification throughput with 1/4/16 concurrent uploader processes, each
+either running the models itself (what every web worker does today) or
+sending its images to one shared inference_server.py that batches them.
+
+    python -m benchmarks.bench_inference_server
+    python -m benchmarks.bench_inference_server --backend keras-random --concurrency 1,4,16 --duration 10
+    python -m benchmarks.bench_inference_server --window-ms 2,5,10
+
+Each uploader classifies one 80x60 image per request, back to back, for
+--duration seconds. Reports images/sec, per-request latency and (server mode)
+the mean batch size the server achieved. Only the model stage is measured:
+image decoding and the color scan stay in the web workers either way.
+"""
+import argparse
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.common import PY_DIR, summarize, print_table, write_json
+
+
+def uploader(mode, backend_name, socket_path, duration, barrier, results, seed):
+    """One simulated web worker; puts its latency samples (ms) on results"""
+    rng = np.random.default_rng(seed)
+    image = rng.integers(0, 256, (1, 80, 60, 3), dtype=np.uint8)
+    if mode == "server":
+        from inference_server import InferenceClient
+        client = InferenceClient(socket_path)
+
+        def classify():
+            if client.classify(image) is None:
+                raise RuntimeError("inference server unreachable")
+    else:
+        import recognition_module
+        backend = recognition_module.get_models(backend_name)
+        backend.warm_up()
+
+        def classify():
+            recognition_module.classify_input(image, backend)
+
+    classify()
+    barrier.wait()
+    samples = []
+    stop_at = time.perf_counter() + duration
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        classify()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    results.put(samples)
+
+
+def run_uploaders(mode, backend_name, socket_path, concurrency, duration):
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(concurrency + 1)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=uploader, args=(mode, backend_name, socket_path, duration, barrier, results, i))
+             for i in range(concurrency)]
+    for p in procs:
+        p.start()
+    barrier.wait(timeout=600)
+    begin = time.perf_counter()
+    samples = [s for _ in procs for s in results.get(timeout=duration + 600)]
+    elapsed = time.perf_counter() - begin
+    for p in procs:
+        p.join()
+    result = summarize(samples)
+    result['images_per_sec'] = round(len(samples) / elapsed, 1)
+    return result
+
+
+def start_server(socket_path, backend_name, window_ms, max_batch):
+    proc = subprocess.Popen(
+        [sys.executable, "inference_server.py", "serve", "--socket", socket_path, "--backend", backend_name,
+         "--window-ms", str(window_ms), "--max-batch", str(max_batch)],
+        cwd=PY_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 600
+    while not os.path.exists(socket_path):
+        if proc.poll() is not None or time.time() > deadline:
+            raise RuntimeError("inference server did not start")
+        time.sleep(0.1)
+    return proc
+
+
+def run(backend_name, concurrency_levels, windows, duration, max_batch):
+    from inference_server import InferenceClient
+
+    rows = []
+    for concurrency in concurrency_levels:
+        result = run_uploaders("local", backend_name, None, concurrency, duration)
+        rows.append({'mode': 'in-process', 'window_ms': '-', 'uploaders': concurrency,
+                     'images_per_sec': result['images_per_sec'], 'p50_ms': result['p50_ms'],
+                     'p95_ms': result['p95_ms'], 'mean_batch': 1.0})
+    for window_ms in windows:
+        with tempfile.TemporaryDirectory() as tmp:
+            socket_path = os.path.join(tmp, "inference.sock")
+            server = start_server(socket_path, backend_name, window_ms, max_batch)
+            try:
+                client = InferenceClient(socket_path)
+                for concurrency in concurrency_levels:
+                    before = client.server_stats()
+                    result = run_uploaders("server", backend_name, socket_path, concurrency, duration)
+                    after = client.server_stats()
+                    batches = (after['batches'] - before['batches']) or 1
+                    rows.append({'mode': 'server', 'window_ms': window_ms, 'uploaders': concurrency,
+                                 'images_per_sec': result['images_per_sec'], 'p50_ms': result['p50_ms'],
+                                 'p95_ms': result['p95_ms'],
+                                 'mean_batch': round((after['items'] - before['items']) / batches, 1)})
+            finally:
+                server.terminate()
+                server.wait()
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default="numpy-random")
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--window-ms", default="5", help="comma-separated server batching windows to try")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per run")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    rows = run(args.backend, [int(c) for c in args.concurrency.split(",")],
+               [float(w) for w in args.window_ms.split(",")], args.duration, args.max_batch)
+    print(f"CPU cores: {os.cpu_count()}, backend: {args.backend}")
+    print_table("📊 Classification throughput: in-process vs shared inference server", rows,
+                ['mode', 'window_ms', 'uploaders', 'images_per_sec', 'p50_ms', 'p95_ms', 'mean_batch'])
+    write_json(args.json, {'benchmark': 'inference_server', 'backend': args.backend,
+                           'cpu_count': os.cpu_count(), 'runs': rows})
@@ -0,0 +1,92 @@
+"""
+Overhead of the /metrics instrumentation: runs app suite scenarios as pairs of
+consecutive requests, one with metrics.ENABLED on and one off (which goes
+first alternates), so drift and noise hit both sides equally. The overhead
+is the median of the per-pair differences over the p50 with metrics off.
+The target is under 2%.
+
+    python -m benchmarks.bench_metrics
+    python -m benchmarks.bench_metrics --iterations 2000 --only wardrobe_stats
+"""
+import argparse
+import gc
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from benchmarks.common import load_app, login, quiet, summarize, print_table, write_json
+from benchmarks.run_suite import build_scenarios
+from benchmarks.synthetic import generate
+
+DEFAULT_SCENARIOS = "wardrobe_stats,generate_outfit,auto_recommend,api_wardrobe"
+TARGET_OVERHEAD_PCT = 2.0
+
+
+def time_interleaved(client, request, iterations, warmup=20):
+    """Per-request latencies (ms) with metrics off and on, as iterations back-to-back pairs"""
+    import metrics
+
+    for _ in range(warmup):
+        request(client)
+    samples = {False: [], True: []}
+    # Like timeit: a collection landing on one side of a pair is noise, not overhead
+    gc.collect()
+    gc.disable()
+    try:
+        for i in range(iterations):
+            for enabled in ((False, True) if i % 2 else (True, False)):
+                metrics.ENABLED = enabled
+                start = time.perf_counter()
+                request(client)
+                samples[enabled].append((time.perf_counter() - start) * 1000.0)
+    finally:
+        gc.enable()
+        metrics.ENABLED = True
+    return samples[False], samples[True]
+
+
+def run(scenarios, iterations, users=3, items=300, outfits=1000, seed=7):
+    import metrics
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "wardrobe.db")
+        conn, user_ids = generate(db_path, users, items, outfits, seed)
+        module = load_app(db_path)
+        client = module.app.test_client()
+        login(client, user_ids[0])
+        requests = dict(build_scenarios(conn, user_ids[0], random.Random(seed)))
+
+        rows = []
+        for name in scenarios:
+            with quiet():
+                off_samples, on_samples = time_interleaved(client, requests[name], iterations)
+            off, on = summarize(off_samples)['p50_ms'], summarize(on_samples)['p50_ms']
+            delta = statistics.median(b - a for a, b in zip(off_samples, on_samples))
+            rows.append({'scenario': name, 'off_p50_ms': round(off, 3), 'on_p50_ms': round(on, 3),
+                         'delta_us': round(delta * 1000.0, 1),
+                         'overhead_pct': round(delta / off * 100.0, 2) if off else 0.0})
+        sample = client.get("/metrics").get_data(as_text=True)
+        conn.close()
+    return rows, sample
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", default=DEFAULT_SCENARIOS, help="comma-separated scenario names")
+    parser.add_argument("--iterations", type=int, default=1000, help="on/off request pairs per scenario")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    rows, sample = run(args.only.split(","), args.iterations)
+    print_table("📊 Metrics overhead (median of paired on/off differences)", rows,
+                ['scenario', 'off_p50_ms', 'on_p50_ms', 'delta_us', 'overhead_pct'])
+    lines = [l for l in sample.splitlines() if l and not l.startswith("#")]
+    print(f"\n/metrics sample ({len(lines)} series):")
+    for line in lines[:15]:
+        print(f"  {line}")
+    worst = max(r['overhead_pct'] for r in rows)
+    print(f"\n{'✅' if worst < TARGET_OVERHEAD_PCT else '⚠️'} worst overhead {worst}% "
+          f"(target < {TARGET_OVERHEAD_PCT}%)")
+    write_json(args.json, {'benchmark': 'metrics_overhead', 'scenarios': rows})
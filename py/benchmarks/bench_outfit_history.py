@@ -0,0 +1,105 @@
+"""
+Benchmark /outfit_history: unindexed ORDER BY date_worn + OFFSET paging vs
+keyset pagination on idx_outfit_history_user_date.
+
+    python -m benchmarks.bench_outfit_history --rows 100000 --users 3
+"""
+import argparse
+import os
+import random
+import tempfile
+
+from benchmarks.common import make_database, fill_clothes, time_calls, summarize, print_table, write_json
+from benchmarks.synthetic import fill_history
+from db_setup import create_indexes
+from wardrobe_queries import get_outfit_history_page, encode_cursor
+
+PAGE = 20
+
+
+def legacy_page(conn, user_id, offset=0):
+    """The original /outfit_history query, with OFFSET for deeper pages"""
+    return conn.execute("""
+        SELECT oh.*, 
+               c1.file_path as top_path,
+               c2.file_path as bottom_path,
+               c3.file_path as shoe_path
+        FROM outfit_history oh
+        LEFT JOIN clothes c1 ON oh.top_id = c1.id
+        LEFT JOIN clothes c2 ON oh.bottom_id = c2.id
+        LEFT JOIN clothes c3 ON oh.shoe_id = c3.id
+        WHERE oh.user_id = ?
+        ORDER BY oh.date_worn DESC
+        LIMIT ? OFFSET ?
+    """, (user_id, PAGE, offset)).fetchall()
+
+
+def cursor_at(conn, user_id, offset):
+    """Cursor pointing just after the row at offset (what a client would hold)"""
+    row = conn.execute("""
+        SELECT date_worn, id FROM outfit_history WHERE user_id = ?
+        ORDER BY date_worn DESC, id DESC LIMIT 1 OFFSET ?
+    """, (user_id, offset - 1)).fetchone()
+    return encode_cursor(row["date_worn"], row["id"])
+
+
+def run(rows_per_user, users, iterations):
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = make_database(os.path.join(tmp, "history.db"))
+        conn.execute("DROP INDEX IF EXISTS idx_outfit_history_user_date")
+        for user_id in range(1, users + 1):
+            fill_clothes(conn, user_id, 300, rng)
+            fill_history(conn, user_id, rows_per_user, rng)
+
+        user_id = 1
+        deep = (rows_per_user // 2 // PAGE) * PAGE
+        legacy_first = summarize(time_calls(lambda: legacy_page(conn, user_id), iterations))
+        legacy_deep = summarize(time_calls(lambda: legacy_page(conn, user_id, deep), iterations))
+
+        create_indexes(conn)
+        conn.execute("ANALYZE")
+        deep_cursor = cursor_at(conn, user_id, deep)
+        keyset_first = summarize(time_calls(lambda: get_outfit_history_page(conn, user_id), iterations))
+        keyset_deep = summarize(time_calls(lambda: get_outfit_history_page(conn, user_id, deep_cursor), iterations))
+
+        # Walking every page must visit each row exactly once
+        seen, cursor = 0, None
+        while True:
+            page, cursor = get_outfit_history_page(conn, user_id, cursor, 500)
+            seen += len(page)
+            if not cursor:
+                break
+
+        plan = [r[3] for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM outfit_history WHERE user_id = ? AND date_worn <= ? "
+            "AND (date_worn < ? OR id < ?) ORDER BY date_worn DESC, id DESC LIMIT 21",
+            (user_id, "2020-02-01 00:00:00", "2020-02-01 00:00:00", 10))]
+        conn.close()
+
+    results = [
+        {'query': 'legacy first page', **legacy_first},
+        {'query': f'legacy OFFSET {deep}', **legacy_deep},
+        {'query': 'keyset first page', **keyset_first},
+        {'query': f'keyset page @ {deep}', **keyset_deep},
+    ]
+    return results, plan, seen
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000, help="history rows per user")
+    parser.add_argument("--users", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results, plan, seen = run(args.rows, args.users, args.iterations)
+    print_table(f"📊 /outfit_history with {args.rows} rows per user", results,
+                ['query', 'p50_ms', 'p95_ms', 'mean_ms'])
+    print("\nQuery plan (keyset):")
+    for line in plan:
+        print(f"  {line}")
+    print(f"\nFull keyset walk returned {seen} of {args.rows} rows")
+    write_json(args.json, {'benchmark': 'outfit_history', 'rows_per_user': args.rows,
+                           'results': results, 'plan': plan})
@@ -0,0 +1,124 @@
+"""
+Benchmark the reclassification job on a synthetic wardrobe database:
+unthrottled rows/sec, resume after an interruption, and the latency a
+concurrent reader sees with and without the rate limit.
+
+    python -m benchmarks.bench_reclassify --items 100000
+    python -m benchmarks.bench_reclassify --keras       # real models (needs TensorFlow)
+
+Rows point at a small pool of real images whose model inputs are cached,
+so the numbers cover DB streaming, input loading, inference and writes.
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from benchmarks.bench_thumbnails import make_photo
+from benchmarks.common import fill_clothes, make_database, print_table, summarize, write_json
+from benchmarks.stubs import standin_classify_input
+from image_pipeline import generate_derivatives
+from reclassify import reclassify
+from wardrobe_queries import get_wardrobe_page
+
+N_USERS = 50
+N_IMAGES = 32
+
+
+def build(tmp, n_items):
+    conn = make_database(os.path.join(tmp, "wardrobe.db"))
+    paths = []
+    for i in range(N_IMAGES):
+        path = os.path.join(tmp, f"IMG_{i:04d}.jpg")
+        make_photo(path, 600, 800, i)
+        generate_derivatives(path)
+        paths.append(path)
+    for user_id in range(1, N_USERS + 1):
+        fill_clothes(conn, user_id, n_items // N_USERS)
+    ids = [row[0] for row in conn.execute("SELECT id FROM clothes")]
+    with conn:
+        conn.executemany("UPDATE clothes SET file_path = ? WHERE id = ?",
+                         [(paths[item_id % N_IMAGES], item_id) for item_id in ids])
+        # 10% of the items were edited by hand through /update_item
+        conn.execute("UPDATE clothes SET season = 'edited', occasion = 'edited', "
+                     "season_edited = 1, occasion_edited = 1 WHERE id % 10 = 0")
+    return conn
+
+
+def reader_latency(db_path, stop):
+    """Run wardrobe page reads in a loop (like live traffic) and collect their latency"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    samples = []
+    user_id = 0
+    while not stop.is_set():
+        user_id = user_id % N_USERS + 1
+        start = time.perf_counter()
+        get_wardrobe_page(conn, user_id, None, None, None, None, 24)
+        samples.append((time.perf_counter() - start) * 1000.0)
+        time.sleep(0.002)
+    conn.close()
+    return samples
+
+
+def timed_run(conn, db_path, classify_input, version, rate, limit=None):
+    stop = threading.Event()
+    samples = []
+    reader = threading.Thread(target=lambda: samples.extend(reader_latency(db_path, stop)))
+    reader.start()
+    try:
+        summary = reclassify(conn, classify_input, version, max_rows_per_sec=rate, limit=limit, progress=False)
+    finally:
+        stop.set()
+        reader.join()
+    return summary, summarize(samples)
+
+
+def run(n_items, chunk_rate, use_keras):
+    if use_keras:
+        from recognition_module import classify_input
+    else:
+        classify_input, _ = standin_classify_input()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "wardrobe.db")
+        conn = build(tmp, n_items)
+        total = conn.execute("SELECT COUNT(*) FROM clothes").fetchone()[0]
+
+        # Interrupted after ~20% of the rows, then resumed
+        first, _ = timed_run(conn, db_path, classify_input, "v2", None, limit=total // 5)
+        rest, unthrottled = timed_run(conn, db_path, classify_input, "v2", None)
+        assert first['rows'] + rest['rows'] == total and rest['finished']
+        edited = conn.execute("SELECT COUNT(*) FROM clothes WHERE season_edited = 1 AND season != 'edited'").fetchone()[0]
+        assert edited == 0, "manually edited values were overwritten"
+
+        # Throttled pass over a slice of the rows with the next model version
+        throttled, throttled_reads = timed_run(conn, db_path, classify_input, "v3", chunk_rate,
+                                               limit=min(total, chunk_rate * 5))
+        conn.close()
+
+    rows = [
+        {'run': 'first 20% (interrupted)', 'rows': first['rows'], 'seconds': first['seconds'],
+         'rows_per_sec': first['rows_per_sec']},
+        {'run': 'resume to the end', 'rows': rest['rows'], 'seconds': rest['seconds'],
+         'rows_per_sec': rest['rows_per_sec'], 'reader_p95_ms': unthrottled['p95_ms']},
+        {'run': f'throttled to {chunk_rate}/s', 'rows': throttled['rows'], 'seconds': throttled['seconds'],
+         'rows_per_sec': throttled['rows_per_sec'], 'reader_p95_ms': throttled_reads['p95_ms']},
+    ]
+    return rows, {'items': total, 'model': 'keras' if use_keras else 'numpy stand-in'}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--rate", type=int, default=1000, help="rows/sec for the throttled run")
+    parser.add_argument("--keras", action="store_true", help="use the real models from recognition_module")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    rows, info = run(args.items, args.rate, args.keras)
+    print_table("📊 Reclassification job", rows, ['run', 'rows', 'seconds', 'rows_per_sec', 'reader_p95_ms'])
+    print_table("📊 Database", [info], list(info))
+    write_json(args.json, {'benchmark': 'reclassify', 'runs': rows, 'database': info})
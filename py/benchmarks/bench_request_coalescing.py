@@ -0,0 +1,136 @@
+"""
+Concurrent duplicate recommendation requests, with and without single-flight.
+
+    python -m benchmarks.bench_request_coalescing
+    python -m benchmarks.bench_request_coalescing --duplicates 32 --weather-latency 0.2
+
+One user fires --duplicates identical requests at the same moment (a
+barrier releases --duplicates threads, each with its own test client), as
+a dashboard reload with several tabs open does:
+  /api/auto-recommend?lat=..&lon=..   counts upstream weather calls
+  /generate_outfit                    counts wardrobe queries
+                                      (get_smart_recommendations_balanced)
+The weather stub sleeps --weather-latency seconds per call. Response and
+weather caches are off, so only the coalescing differs between the runs.
+Exits non-zero if coalesced duplicates make more than one upstream call.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.common import load_app, login, quiet, print_table, write_json
+from benchmarks.synthetic import generate
+
+
+class PassThrough:
+    """request_flight stand-in without coalescing"""
+    shared = 0
+
+    def do(self, key, fn, timeout=None):
+        return fn()
+
+
+def fire(m, user_id, duplicates, send):
+    """duplicates threads call send(client) together; returns ([status], seconds)"""
+    clients = []
+    for _ in range(duplicates):
+        client = m.app.test_client()
+        login(client, user_id)
+        clients.append(client)
+    barrier = threading.Barrier(duplicates)
+    statuses = [None] * duplicates
+
+    def worker(i):
+        barrier.wait()
+        statuses[i] = send(clients[i]).status_code
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(duplicates)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return statuses, time.perf_counter() - start
+
+
+def run(duplicates, weather_latency, rounds, seed=7):
+    import response_cache
+    import singleflight
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "wardrobe.db")
+        conn, user_ids = generate(db_path, 1, 300, outfits_per_user=50, seed=seed)
+        season, occasion = conn.execute("""
+            SELECT season, occasion FROM clothes GROUP BY season, occasion
+            HAVING COUNT(DISTINCT subtype) = 3 LIMIT 1
+        """).fetchone()
+        conn.close()
+        with quiet():
+            m = load_app(db_path)
+        m.recommendation_cache = response_cache.make_cache("off")
+
+        counts = {'weather': 0, 'wardrobe': 0}
+        lock = threading.Lock()
+        fetch_weather = m.weather_service.get_weather_by_coordinates
+        recommend = m.get_smart_recommendations_balanced
+
+        def slow_weather(lat, lon):
+            with lock:
+                counts['weather'] += 1
+            time.sleep(weather_latency)
+            return fetch_weather(lat, lon)
+
+        def counted_recommend(*args, **kwargs):
+            with lock:
+                counts['wardrobe'] += 1
+            return recommend(*args, **kwargs)
+
+        m.weather_service.get_weather_by_coordinates = slow_weather
+        m.get_smart_recommendations_balanced = counted_recommend
+
+        requests_ = {
+            "/api/auto-recommend": ('weather', lambda c: c.get("/api/auto-recommend?lat=40.71&lon=-74.01")),
+            "/generate_outfit": ('wardrobe', lambda c: c.post("/generate_outfit", data={
+                'season': season.capitalize(), 'occasion': occasion.capitalize()})),
+        }
+        rows = []
+        for label, flight in (("off", PassThrough()), ("on", singleflight.SingleFlight())):
+            m.request_flight = flight
+            for endpoint, (counter, send) in requests_.items():
+                before = counts[counter]
+                shared_before = flight.shared
+                seconds = []
+                statuses = set()
+                for _ in range(rounds):
+                    with quiet():
+                        got, elapsed = fire(m, user_ids[0], duplicates, send)
+                    statuses.update(got)
+                    seconds.append(elapsed)
+                rows.append({'single_flight': label, 'endpoint': endpoint, 'duplicates': duplicates,
+                             'upstream': counter, 'calls_per_burst': (counts[counter] - before) / rounds,
+                             'shared_per_burst': (flight.shared - shared_before) / rounds,
+                             'burst_ms': round(1000.0 * sum(seconds) / rounds, 1),
+                             'statuses': sorted(statuses)})
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duplicates", type=int, default=16, help="identical requests fired at once")
+    parser.add_argument("--weather-latency", type=float, default=0.1, help="seconds per upstream weather call")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    rows = run(args.duplicates, args.weather_latency, args.rounds)
+    print_table(f"📊 {args.duplicates} identical requests at once", rows,
+                ['single_flight', 'endpoint', 'duplicates', 'upstream', 'calls_per_burst', 'shared_per_burst',
+                 'burst_ms', 'statuses'])
+    write_json(args.json, {'benchmark': 'request_coalescing', 'results': rows})
+
+    weather = [r for r in rows if r['single_flight'] == "on" and r['upstream'] == 'weather']
+    if any(r['calls_per_burst'] != 1 for r in weather):
+        raise SystemExit("❌ coalesced duplicates made more than one upstream weather call")
+    print(f"\n✅ {args.duplicates} concurrent duplicates -> 1 upstream weather call per burst")
@@ -0,0 +1,152 @@
+"""
+Recommendation response cache on a replayed dashboard workload.
+
+    python -m benchmarks.bench_response_cache
+    python -m benchmarks.bench_response_cache --users 20 --visits 2000 --backends off,memory,redis
+
+A visit is one user opening the dashboard: /api/auto-recommend from one of a few
+cities (different temperatures -> different weather buckets), then 1-3
+/generate_outfit calls, and with some probability a write that bumps the
+wardrobe version (/mark_outfit_worn or /update_item). The same recorded trace
+is replayed once per backend against the same synthetic wardrobe (model and
+weather stubbed out); "off" is the app without caching.
+The redis backend needs the redis package and a server at WARDROBE_CACHE_URL.
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from benchmarks.common import load_app, login, quiet, summarize, print_table, write_json
+from benchmarks.synthetic import generate
+
+# (lat, lon, temperature) - spread over the season buckets
+CITIES = [(40.71, -74.01, 22.0), (51.51, -0.13, 12.0), (25.20, 55.27, 36.0), (59.33, 18.07, -3.0)]
+
+
+def record_trace(conn, user_ids, visits, write_rate, rng):
+    """The list of requests to replay: (user_id, kind, params)"""
+    combos, ids, files = {}, {}, {}
+    for user_id in user_ids:
+        combos[user_id] = [tuple(r) for r in conn.execute("""
+            SELECT season, occasion FROM clothes WHERE user_id = ?
+            GROUP BY season, occasion HAVING COUNT(DISTINCT subtype) = 3
+        """, (user_id,))]
+        ids[user_id] = {subtype: [r[0] for r in conn.execute(
+            "SELECT id FROM clothes WHERE user_id = ? AND subtype = ?", (user_id, subtype))]
+            for subtype in ("top", "bottom", "foot")}
+        files[user_id] = [os.path.basename(r[0]) for r in conn.execute(
+            "SELECT file_path FROM clothes WHERE user_id = ?", (user_id,))]
+
+    trace = []
+    for _ in range(visits):
+        # A few users visit far more often than the rest
+        user_id = user_ids[min(int(rng.expovariate(0.5)), len(user_ids) - 1)]
+        lat, lon, _ = rng.choice(CITIES)
+        trace.append((user_id, "auto_recommend", {'lat': lat, 'lon': lon}))
+        for _ in range(rng.randint(1, 3)):
+            season, occasion = rng.choice(combos[user_id])
+            trace.append((user_id, "generate_outfit", {'season': season.capitalize(),
+                                                       'occasion': occasion.capitalize()}))
+        if rng.random() < write_rate:
+            trace.append((user_id, "mark_outfit_worn", {'top_id': rng.choice(ids[user_id]["top"]),
+                                                        'bottom_id': rng.choice(ids[user_id]["bottom"]),
+                                                        'shoe_id': rng.choice(ids[user_id]["foot"])}))
+        elif rng.random() < write_rate / 5:
+            season, occasion = rng.choice(combos[user_id])
+            trace.append((user_id, "update_item", {'file_name': rng.choice(files[user_id]),
+                                                   'season': season, 'occasion': occasion}))
+    return trace
+
+
+def replay(m, trace):
+    """Run the trace through one test client; returns {kind: [ms, ...]}"""
+    client = m.app.test_client()
+    samples = {}
+    current_user = None
+    for user_id, kind, params in trace:
+        if user_id != current_user:
+            login(client, user_id)
+            current_user = user_id
+        start = time.perf_counter()
+        if kind == "auto_recommend":
+            response = client.get(f"/api/auto-recommend?lat={params['lat']}&lon={params['lon']}")
+        elif kind == "generate_outfit":
+            response = client.post("/generate_outfit", data=params)
+        else:
+            response = client.post(f"/{kind}", json=params)
+        samples.setdefault(kind, []).append((time.perf_counter() - start) * 1000.0)
+        # 404 = an update_item emptied that season/occasion; fine, and cached like the rest
+        if response.status_code >= 500:
+            raise RuntimeError(f"{kind} returned {response.status_code}")
+    return samples
+
+
+def make_backend_cache(name):
+    import response_cache
+
+    cache = response_cache.make_cache(name)
+    if name == "redis":
+        cache.backend.client.ping()
+        cache.backend.clear()
+    return cache
+
+
+def run(users, items, visits, write_rate, backends, seed=7):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.db")
+        conn, user_ids = generate(source, users, items, outfits_per_user=200, seed=seed)
+        trace = record_trace(conn, user_ids, visits, write_rate, random.Random(seed))
+        conn.close()
+
+        db_path = os.path.join(tmp, "wardrobe.db")
+        m = load_app(db_path)
+        temperatures = {(lat, lon): temp for lat, lon, temp in CITIES}
+        m.weather_service.get_weather_by_coordinates = lambda lat, lon: {
+            'current': {'temperature_2m': temperatures[(lat, lon)], 'weather_code': 1,
+                        'humidity_2m': 60, 'wind_speed_10m': 0}}
+
+        for backend in backends:
+            try:
+                m.recommendation_cache = make_backend_cache(backend)
+            except Exception as e:
+                print(f"⏭️  {backend}: {type(e).__name__}: {e}")
+                continue
+            # Every backend starts from the same wardrobe
+            shutil.copyfile(source, db_path)
+            m.DB_PATH = db_path
+            with quiet():
+                samples = replay(m, trace)
+            stats = m.recommendation_cache.stats()
+            for kind in ("auto_recommend", "generate_outfit", "mark_outfit_worn", "update_item"):
+                if kind not in samples:
+                    continue
+                summary = summarize(samples[kind])
+                rows.append({'backend': backend, 'endpoint': kind, 'requests': len(samples[kind]),
+                             'p50_ms': round(summary['p50_ms'], 3), 'p95_ms': round(summary['p95_ms'], 3),
+                             'mean_ms': round(summary['mean_ms'], 3)})
+            reads = samples["auto_recommend"] + samples["generate_outfit"]
+            rows.append({'backend': backend, 'endpoint': "all recommendations", 'requests': len(reads),
+                         'mean_ms': round(summarize(reads)['mean_ms'], 3),
+                         'hit_rate': stats['hit_rate'] if backend != "off" else ""})
+    return rows, len(trace)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--items", type=int, default=300, help="clothes per user")
+    parser.add_argument("--visits", type=int, default=1500)
+    parser.add_argument("--write-rate", type=float, default=0.15, help="share of visits that mark an outfit worn")
+    parser.add_argument("--backends", default="off,memory,redis")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    rows, n_requests = run(args.users, args.items, args.visits, args.write_rate, args.backends.split(","))
+    print_table(f"📊 Dashboard replay: {args.visits} visits, {n_requests} requests", rows,
+                ['backend', 'endpoint', 'requests', 'p50_ms', 'p95_ms', 'mean_ms', 'hit_rate'])
+    write_json(args.json, {'benchmark': 'response_cache', 'visits': args.visits, 'requests': n_requests,
+                           'results': rows})
@@ -0,0 +1,124 @@
+"""
+Weather-to-season classification of hourly forecasts: scalar vs vectorized.
+
+    python -m benchmarks.bench_season_classifier
+    python -m benchmarks.bench_season_classifier --locations 500 --days 7
+
+Each location gets a synthetic week of hourly temperature_2m / weather_code
+(a daily temperature cycle around a per-location mean, weather that persists
+for a few hours). Times
+  scalar       WeatherService.get_season_category per hour (debug logging off)
+  vectorized   weather_service.season_categories over one location's series
+               (with names) and over every location at once
+  daily        plus the dominant category per day (dominant_categories, window=24)
+Before timing, checks that both agree on every code -1..100 (plus missing,
+fractional and string codes) across a temperature grid that hits each
+threshold exactly.
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.common import print_table, write_json, time_calls, summarize
+
+# Rough share of each WMO code in mid-latitude hourly forecasts
+CODE_WEIGHTS = {0: 20, 1: 15, 2: 15, 3: 20, 45: 3, 48: 1, 51: 4, 53: 3, 55: 1, 61: 5, 63: 3, 65: 1,
+                71: 2, 73: 1, 75: 1, 77: 0.5, 80: 2, 81: 1, 82: 0.5, 85: 0.5, 86: 0.5, 95: 1}
+
+
+def synthetic_series(locations, hours, seed):
+    """(locations, hours) arrays of temperatures and weather codes"""
+    rng = np.random.default_rng(seed)
+    means = rng.uniform(-10, 35, size=(locations, 1))
+    hour_of_day = np.arange(hours) % 24
+    temperatures = means + 6 * np.sin((hour_of_day - 9) / 24 * 2 * np.pi) + rng.normal(0, 1.5, (locations, hours))
+    codes = np.array(list(CODE_WEIGHTS))
+    weights = np.array(list(CODE_WEIGHTS.values()), dtype=float)
+    # Weather changes every 3-6 hours
+    blocks = rng.choice(codes, p=weights / weights.sum(), size=(locations, hours // 3 + 1))
+    weather_codes = np.repeat(blocks, 3, axis=1)[:, :hours]
+    return np.round(temperatures, 1), weather_codes
+
+
+def check_agreement(service):
+    import weather_service
+
+    codes = list(range(-1, 101)) + [None, 2.5, 71.0, float("nan"), "1", "61", " 71", "1.5", "x", b"1"]
+    temperatures = [None, float("nan"), "20", "-3.5", "nan", "abc", b"20"]
+    for t in np.arange(-30, 45, 0.5):
+        temperatures.append(float(t))
+    for edge in (10, 15, 20, 25):
+        temperatures += [edge - 1e-9, float(edge), edge + 1e-9]
+    t_grid = np.array([[t for _ in codes] for t in temperatures], dtype=object)
+    c_grid = np.array([codes for _ in temperatures], dtype=object)
+
+    # Missing or unparsable values make the scalar method log a warning and return "casual"
+    weather_service.logger.disabled = True
+    try:
+        expected = [service.get_season_category(t, c) for t, c in zip(t_grid.ravel(), c_grid.ravel())]
+    finally:
+        weather_service.logger.disabled = False
+    got = weather_service.category_names(weather_service.season_categories(t_grid, c_grid))
+    mismatches = [(t, c, e, g) for t, c, e, g in zip(t_grid.ravel(), c_grid.ravel(), expected, got) if e != g]
+    if mismatches:
+        raise AssertionError(f"{len(mismatches)} disagreements, e.g. {mismatches[:5]}")
+    return len(expected)
+
+
+def run(locations, days, iterations, seed=7):
+    import weather_service
+
+    service = weather_service.WeatherService.__new__(weather_service.WeatherService)
+    checked = check_agreement(service)
+
+    hours = days * 24
+    temperatures, codes = synthetic_series(locations, hours, seed)
+    one_t, one_c = temperatures[0], codes[0]
+
+    def scalar_one():
+        return [service.get_season_category(float(t), int(c)) for t, c in zip(one_t, one_c)]
+
+    def vector_one():
+        return weather_service.category_names(weather_service.season_categories(one_t, one_c))
+
+    assert scalar_one() == vector_one()
+    all_categories = weather_service.season_categories(temperatures, codes)
+    per_row = [weather_service.dominant_categories(row)[0] for row in all_categories]
+    assert (np.array(per_row) == weather_service.dominant_categories(all_categories)[0]).all()
+
+    def vector_all():
+        return weather_service.season_categories(temperatures, codes)
+
+    def daily_all():
+        return weather_service.dominant_categories(weather_service.season_categories(temperatures, codes))
+
+    rows = []
+    for label, fn, series in (("scalar, per hour", scalar_one, 1),
+                              ("vectorized + names, one series", vector_one, 1),
+                              (f"vectorized, {locations} series", vector_all, locations),
+                              (f"vectorized + daily, {locations} series", daily_all, locations)):
+        summary = summarize(time_calls(fn, max(1, iterations // series)))
+        rows.append({'method': label, 'series': series, 'ms_per_call': round(summary['p50_ms'], 4),
+                     'us_per_series': round(summary['p50_ms'] * 1000.0 / series, 2),
+                     'ns_per_hour': round(summary['p50_ms'] * 1e6 / (series * hours), 1)})
+
+    week = weather_service.category_names(weather_service.dominant_categories(
+        weather_service.season_categories(one_t, one_c), window=24)[0])
+    return rows, checked, week
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--locations", type=int, default=200)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    rows, checked, week = run(args.locations, args.days, args.iterations)
+    print(f"✅ Scalar and vectorized agree on {checked} (temperature, code) pairs")
+    print_table(f"📊 Classifying {args.days * 24}-hour series", rows,
+                ['method', 'series', 'ms_per_call', 'us_per_series', 'ns_per_hour'])
+    print(f"\nFirst location, dominant category per day: {week}")
+    write_json(args.json, {'benchmark': 'season_classifier', 'hours': args.days * 24,
+                           'pairs_checked': checked, 'results': rows})
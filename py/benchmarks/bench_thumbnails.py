@@ -0,0 +1,90 @@
+"""
+Benchmark the derivative pipeline: bytes served per page view with original
+uploads vs thumbnails, backfill throughput, and decode vs cached model input.
+
+    python -m benchmarks.bench_thumbnails --images 60 --size 3024x4032
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import PIL.Image as Image
+
+from benchmarks.common import time_calls, summarize, print_table, write_json
+from image_pipeline import backfill, derived_paths, decode_model_input, load_model_input
+
+# Images shown per page view
+PAGE_VIEWS = {
+    '/wardrobe first screen': 3 * 24,
+    '/recommend outfit': 3,
+    'dashboard auto-recommend': 9,
+}
+
+
+def make_photo(path, width, height, seed):
+    """A phone-sized JPEG: upscaled random shapes + mild sensor noise (compresses like a real photo)"""
+    rng = np.random.default_rng(seed)
+    coarse = Image.fromarray(rng.integers(0, 255, size=(48, 36, 3), dtype=np.uint8))
+    base = np.asarray(coarse.resize((width, height), Image.BICUBIC), dtype=np.int16)
+    noise = rng.integers(-8, 8, size=(height, width, 3), dtype=np.int16)
+    Image.fromarray(np.clip(base + noise, 0, 255).astype(np.uint8)).save(path, "JPEG", quality=92)
+
+
+def run(n_images, width, height, workers, iterations):
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = os.path.join(tmp, "uploads", "1")
+        os.makedirs(folder)
+        paths = []
+        for i in range(n_images):
+            path = os.path.join(folder, f"IMG_{i:04d}.jpg")
+            make_photo(path, width, height, i)
+            paths.append(path)
+
+        summary = backfill(os.path.join(tmp, "uploads"), workers=workers)
+        serial_start = time.perf_counter()
+        backfill(os.path.join(tmp, "uploads"), workers=1, force=True)
+        serial_rate = n_images / (time.perf_counter() - serial_start)
+
+        original = sum(os.path.getsize(p) for p in paths) / n_images
+        webp = sum(os.path.getsize(derived_paths(p)["webp"]) for p in paths) / n_images
+        jpeg = sum(os.path.getsize(derived_paths(p)["jpeg"]) for p in paths) / n_images
+
+        decode = summarize(time_calls(lambda: decode_model_input(paths[0]), iterations))
+        cached = summarize(time_calls(lambda: load_model_input(paths[0]), iterations))
+        assert (decode_model_input(paths[0]) == load_model_input(paths[0])).all()
+
+    pages = [{
+        'page': page,
+        'images': count,
+        'original_kb': round(original * count / 1024),
+        'webp_kb': round(webp * count / 1024),
+        'jpeg_kb': round(jpeg * count / 1024),
+        'reduction': f"{original / webp:.0f}x",
+    } for page, count in PAGE_VIEWS.items()]
+    throughput = {
+        'images': n_images,
+        'backfill_images_per_sec': summary['images_per_sec'],
+        'serial_images_per_sec': round(serial_rate, 1),
+        'decode_model_input_p50_ms': decode['p50_ms'],
+        'cached_model_input_p50_ms': cached['p50_ms'],
+    }
+    return pages, throughput
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=60)
+    parser.add_argument("--size", default="3024x4032", help="WIDTHxHEIGHT of the synthetic photos")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split("x"))
+    pages, throughput = run(args.images, width, height, args.workers, args.iterations)
+    print_table("📊 Bytes per page view", pages,
+                ['page', 'images', 'original_kb', 'webp_kb', 'jpeg_kb', 'reduction'])
+    print_table("📊 Reprocessing throughput", [throughput], list(throughput))
+    write_json(args.json, {'benchmark': 'thumbnails', 'pages': pages, 'throughput': throughput})
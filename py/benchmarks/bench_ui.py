@@ -0,0 +1,171 @@
+"""
+Desktop UI (ui_module) responsiveness, run headless with QT_QPA_PLATFORM=offscreen.
+
+    python -m benchmarks.bench_ui
+    python -m benchmarks.bench_ui --images 50 --size 600x800 --backend keras
+
+Measures:
+  first paint   benchmark start -> first paint of the main window, with the models
+                warmed up before show() (how the app used to start) vs after it
+                (WarmUpWorker once the window is up). Each run is a fresh interpreter.
+  50-image add  a 10 ms QTimer on the GUI thread records how late each tick fires
+                while 50 photos are classified, either on the GUI thread
+                (single_classification per photo, as ALL_PREDICT used to) or via
+                ClassifyWorker. Long gaps = frozen window.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import PY_DIR, summarize, print_table, write_json
+
+TICK_MS = 10
+
+
+def first_paint(eager):
+    """Runs in a child process: seconds from loading this module to the window's first paint"""
+    from PyQt5 import QtCore, QtWidgets
+
+    import ui_module
+
+    app = QtWidgets.QApplication(sys.argv)
+    window = QtWidgets.QMainWindow()
+    ui = ui_module.Ui_MainWindow()
+    ui.setupUi(window)
+    painted = {}
+
+    class PaintFilter(QtCore.QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QtCore.QEvent.Paint and 'at' not in painted:
+                painted['at'] = time.perf_counter()
+                QtCore.QTimer.singleShot(0, app.quit)
+            return False
+
+    paint_filter = PaintFilter()
+    ui.centralwidget.installEventFilter(paint_filter)
+    if eager:
+        ui_module.get_models().warm_up()
+        window.show()
+    else:
+        window.show()
+        QtCore.QTimer.singleShot(0, ui.start_warm_up)
+    app.exec_()
+    ui.pool.waitForDone()
+    return painted['at'] - START
+
+
+def responsiveness(paths, mode):
+    """Tick lateness (ms) and wall time while classifying paths on the GUI thread or in a worker"""
+    from PyQt5 import QtCore, QtWidgets
+
+    import ui_module
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+    window = QtWidgets.QMainWindow()
+    ui = ui_module.Ui_MainWindow()
+    ui.setupUi(window)
+    window.show()
+    ui_module.get_models().warm_up()
+
+    gaps = []
+    last = [time.perf_counter()]
+
+    def tick():
+        now = time.perf_counter()
+        gaps.append((now - last[0]) * 1000.0 - TICK_MS)
+        last[0] = now
+
+    timer = QtCore.QTimer()
+    timer.timeout.connect(tick)
+    timer.start(TICK_MS)
+    start = time.perf_counter()
+
+    if mode == "gui-thread":
+        def classify_all():
+            for path in paths:
+                ui.show_result(*ui_module.single_classification(path))
+            app.quit()
+        QtCore.QTimer.singleShot(0, classify_all)
+    else:
+        worker = ui.classify(paths)
+        worker.signals.finished.connect(app.quit)
+    app.exec_()
+    elapsed = time.perf_counter() - start
+    timer.stop()
+    added = ui.TOP_LIST.count() + ui.BOTTOM_LIST.count() + ui.SHOE_LIST.count()
+    return gaps, elapsed, added
+
+
+def child(args):
+    """Entry point for one measurement in a fresh process; prints JSON"""
+    if args.child == "first-paint":
+        print(json.dumps({'seconds': first_paint(args.eager)}))
+    else:
+        gaps, elapsed, added = responsiveness(json.loads(args.paths), args.child)
+        print(json.dumps({'gaps': gaps, 'seconds': elapsed, 'added': added}))
+
+
+def run_child(extra, env):
+    out = subprocess.run([sys.executable, "-m", "benchmarks.bench_ui"] + extra, cwd=PY_DIR, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def run(n_images, size, repeats, env):
+    from benchmarks.bench_thumbnails import make_photo
+
+    paint_rows = []
+    for label, flag in (("models before show (old)", ["--eager"]), ("WarmUpWorker after show", [])):
+        samples = [run_child(["--child", "first-paint"] + flag, env)['seconds'] * 1000.0 for _ in range(repeats)]
+        summary = summarize(samples)
+        paint_rows.append({'startup': label, 'first_paint_ms': round(summary['p50_ms'], 1),
+                           'min_ms': round(min(samples), 1)})
+
+    add_rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(n_images):
+            path = os.path.join(tmp, f"IMG_{i:04d}.jpg")
+            make_photo(path, size[0], size[1], i)
+            paths.append(path)
+        for mode in ("gui-thread", "worker"):
+            result = run_child(["--child", mode, "--paths", json.dumps(paths)], env)
+            gaps = result['gaps'] or [0.0]
+            summary = summarize(gaps)
+            add_rows.append({'classify_on': mode, 'images': result['added'], 'total_s': round(result['seconds'], 2),
+                             'ticks': len(result['gaps']), 'p95_late_ms': round(summary['p95_ms'], 1),
+                             'max_late_ms': round(max(gaps), 1)})
+    return paint_rows, add_rows
+
+
+START = time.perf_counter()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=50)
+    parser.add_argument("--size", default="600x800", help="WIDTHxHEIGHT of the test photos")
+    parser.add_argument("--repeats", type=int, default=3, help="first-paint runs per startup mode")
+    parser.add_argument("--backend", default="numpy-random")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--eager", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--paths", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        raise SystemExit(0)
+
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"),
+               WARDROBE_MODEL_BACKEND=args.backend)
+    width, height = (int(v) for v in args.size.split("x"))
+    paint_rows, add_rows = run(args.images, (width, height), args.repeats, env)
+    print_table("📊 Time to first paint", paint_rows, ['startup', 'first_paint_ms', 'min_ms'])
+    print_table(f"📊 GUI timer lateness while adding {args.images} photos ({args.size})", add_rows,
+                ['classify_on', 'images', 'total_s', 'ticks', 'p95_late_ms', 'max_late_ms'])
+    write_json(args.json, {'benchmark': 'ui', 'backend': args.backend,
+                           'first_paint': paint_rows, 'add_photos': add_rows})
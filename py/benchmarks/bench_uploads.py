@@ -0,0 +1,199 @@
+"""
+/upload under concurrent large uploads, over real HTTP (werkzeug threaded server).
+
+    python -m benchmarks.bench_uploads
+    python -m benchmarks.bench_uploads --clients 100 --size-mb 10 --files-per-post 1
+
+Each scenario runs in a fresh server process (the model and the derivative
+thumbnails are stubbed out, so only the upload path is measured) and reports:
+  throughput   MB of request bodies accepted per second over the whole burst
+  peak RSS     VmHWM of the server process, minus its RSS before the burst
+  sent/client  bytes a client had sent when the response arrived
+Scenarios: the old handler (werkzeug spools the part, then file.save copies it)
+vs the streaming /upload, with JPEG payloads and with non-image payloads
+(the streaming handler reads a rejected part to its end without writing it).
+The last scenario posts a JPEG and a non-image together: /upload accepts the
+JPEG and lists the other file under "errors".
+"""
+import argparse
+import os
+import select
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import PY_DIR, summarize, print_table, write_json
+
+BOUNDARY = "benchboundary7MA4YWxkTrZu0gW"
+CHUNK = 64 * 1024
+
+
+def serve(port, db_path, upload_root):
+    """Runs in the server process: app.py with stubs plus the old handler at /upload_legacy"""
+    from flask import jsonify, request, session
+    from werkzeug.serving import make_server
+
+    from benchmarks.common import load_app, make_database, quiet
+
+    make_database(db_path).close()
+    m = load_app(db_path)
+    m.app.config["UPLOAD_FOLDER"] = upload_root
+    m.schedule_derivatives = lambda file_path: None
+
+    @m.app.route("/upload_legacy", methods=["POST"])
+    def upload_legacy():
+        # /upload as it was: werkzeug's spooled temp file, then file.save into the folder
+        user_id = session.get("user_id", "guest")
+        user_folder = os.path.join(upload_root, str(user_id))
+        os.makedirs(user_folder, exist_ok=True)
+        items = []
+        for file in request.files.getlist("file"):
+            filepath = os.path.join(user_folder, file.filename)
+            file.save(filepath)
+            subtype, info_str, details, features = m.classify_with_features(filepath)
+            conn = m.get_db_connection()
+            conn.execute("""
+                INSERT INTO clothes (user_id, file_path, subtype, color, season, occasion, wear_count, model_version)
+                VALUES (?, ?, ?, ?, ?, ?, 0, ?)
+            """, (user_id, filepath, subtype, details[2], details[3].lower(), details[4].lower(), m.MODEL_VERSION))
+            m.refresh_worn_lists(conn, user_id)
+            conn.commit()
+            conn.close()
+            items.append({"subtype": subtype})
+        return jsonify({"items": items})
+
+    server = make_server("127.0.0.1", port, m.app, threaded=True)
+    print("ready", flush=True)
+    with quiet():
+        server.serve_forever()
+
+
+def multipart(files):
+    """Encode [(filename, payload)] as one multipart/form-data body under field "file" """
+    parts = []
+    for filename, payload in files:
+        parts.append(f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+                     f'Content-Type: image/jpeg\r\n\r\n'.encode() + payload + b"\r\n")
+    return b"".join(parts) + f"--{BOUNDARY}--\r\n".encode()
+
+
+def post(port, path, body):
+    """
+    POST body in 64 KB chunks, stopping as soon as the server answers.
+    Returns (status, seconds, bytes of body sent)
+    """
+    start = time.perf_counter()
+    sock = socket.create_connection(("127.0.0.1", port))
+    sent = 0
+    try:
+        sock.sendall(f"POST {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(body)}\r\n"
+                     f"Content-Type: multipart/form-data; boundary={BOUNDARY}\r\nConnection: close\r\n\r\n".encode())
+        view = memoryview(body)
+        while sent < len(body):
+            readable, _, _ = select.select([sock], [], [], 0)
+            if readable:
+                break
+            try:
+                sent += sock.send(view[sent:sent + CHUNK])
+            except (BrokenPipeError, ConnectionResetError):
+                break
+        response = b""
+        while b"\r\n" not in response:
+            try:
+                data = sock.recv(4096)
+            except ConnectionResetError:
+                break
+            if not data:
+                break
+            response += data
+    finally:
+        sock.close()
+    status = int(response.split(b" ", 2)[1]) if response.startswith(b"HTTP/") else 0
+    return status, time.perf_counter() - start, sent
+
+
+def rss_kb(pid, field):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def burst(path, body, clients, env, tmp):
+    """Start a fresh server, fire clients concurrent POSTs, return one result row"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    run_dir = tempfile.mkdtemp(dir=tmp)
+    proc = subprocess.Popen([sys.executable, "-m", "benchmarks.bench_uploads", "--serve", str(port),
+                             "--db", os.path.join(run_dir, "wardrobe.db"), "--uploads", os.path.join(run_dir, "uploads")],
+                            cwd=PY_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        proc.stdout.readline()
+        time.sleep(0.2)
+        base_kb = rss_kb(proc.pid, "VmRSS")
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            results = list(pool.map(lambda _: post(port, path, body), range(clients)))
+        elapsed = time.perf_counter() - start
+        peak_kb = rss_kb(proc.pid, "VmHWM")
+    finally:
+        proc.kill()
+        proc.wait()
+    ok = [r for r in results if r[0] == 200]
+    return {
+        'ok': len(ok),
+        'refused': len(results) - len(ok),
+        'wall_s': round(elapsed, 2),
+        'MB_per_s': round(len(ok) * len(body) / (1024 * 1024) / elapsed, 1),
+        'p95_s': round(summarize([r[1] * 1000.0 for r in results])['p95_ms'] / 1000.0, 2),
+        'peak_rss_MB': round((peak_kb - base_kb) / 1024.0, 1),
+        'sent_per_client_MB': round(sum(r[2] for r in results) / len(results) / (1024 * 1024), 2),
+    }
+
+
+def run(clients, size_mb, files_per_post, env):
+    size = int(size_mb * 1024 * 1024)
+    jpeg = b"\xff\xd8\xff\xe0" + os.urandom(size - 4)
+    other = b"%PDF-1.7\n" + os.urandom(size - 9)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, path, payload in (("old handler, JPEG", "/upload_legacy", jpeg),
+                                     ("streaming, JPEG", "/upload", jpeg),
+                                     ("old handler, non-image", "/upload_legacy", other),
+                                     ("streaming, non-image", "/upload", other)):
+            body = multipart([(f"photo_{i}.jpg", payload) for i in range(files_per_post)])
+            row = burst(path, body, clients, env, tmp)
+            row['scenario'] = label
+            rows.append(row)
+        row = burst("/upload", multipart([("photo.jpg", jpeg), ("scan.jpg", other)]), clients, env, tmp)
+        row['scenario'] = "streaming, JPEG + non-image"
+        rows.append(row)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--size-mb", type=float, default=10.0, help="size of each uploaded file")
+    parser.add_argument("--files-per-post", type=int, default=1)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--uploads", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.db, args.uploads)
+        raise SystemExit(0)
+
+    env = dict(os.environ, WARDROBE_METRICS="0")
+    rows = run(args.clients, args.size_mb, args.files_per_post, env)
+    print_table(f"📊 {args.clients} concurrent uploads of {args.files_per_post} x {args.size_mb:g} MB", rows,
+                ['scenario', 'ok', 'refused', 'wall_s', 'MB_per_s', 'p95_s', 'peak_rss_MB', 'sent_per_client_MB'])
+    write_json(args.json, {'benchmark': 'uploads', 'clients': args.clients, 'size_mb': args.size_mb,
+                           'files_per_post': args.files_per_post, 'scenarios': rows})
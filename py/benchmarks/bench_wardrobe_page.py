@@ -0,0 +1,122 @@
+"""
+Benchmark the /wardrobe page: one server-rendered page with every item vs the
+count-only shell plus keyset-paginated /api/wardrobe pages.
+
+    python -m benchmarks.bench_wardrobe_page --items 5000
+
+The legacy page is reproduced by rendering the old per-item card markup for
+every row of SELECT * (the repeated cards are what made the page heavy).
+"""
+import argparse
+import os
+import tempfile
+
+from flask import render_template_string
+
+from benchmarks.common import (make_database, fill_clothes, load_app, login, quiet,
+                               time_calls, summarize, print_table, write_json)
+
+LEGACY_CARDS = """
+{% for item in items %}
+<div class="wardrobe-item">
+  <img src="{{ item['url'] }}" alt="Top">
+  <div class="item-tags">
+    <span class="tag tag-season">{{ item.get('season', 'Unknown') }}</span>
+    <span class="tag tag-occasion">{{ item.get('occasion', 'Unknown') }}</span>
+  </div>
+  <div class="wear-count-badge {% if item.get('wear_count', 0) > 5 %}high{% elif item.get('wear_count', 0) == 0 %}low{% endif %}">
+    👕 Worn {{ item.get('wear_count', 0) }} times
+  </div>
+  <div class="item-actions">
+    <button class="btn-edit" onclick="openEditModal('{{ item['file_name'] }}', '{{ item.get('season', 'Summer') }}', '{{ item.get('occasion', 'Casual') }}')">
+      ✏️ Edit
+    </button>
+    <button class="btn-delete" onclick="deleteItem('{{ item['file_name'] }}')">
+      🗑️ Delete
+    </button>
+  </div>
+</div>
+{% endfor %}
+"""
+
+
+def legacy_wardrobe(module, user_id):
+    """The original /wardrobe handler: SELECT * and render every card"""
+    conn = module.get_db_connection()
+    clothes = conn.execute("SELECT * FROM clothes WHERE user_id=?", (user_id,)).fetchall()
+    conn.close()
+    items = [{
+        "id": c["id"],
+        "file_name": os.path.basename(c["file_path"]),
+        "url": f"/static/uploads/{user_id}/{os.path.basename(c['file_path'])}",
+        "subtype": c["subtype"],
+        "season": c["season"],
+        "occasion": c["occasion"],
+        "wear_count": c["wear_count"],
+    } for c in clothes]
+    shell = module.app.test_client()
+    login(shell, user_id)
+    page = shell.get("/wardrobe").data
+    return page + render_template_string(LEGACY_CARDS, items=items).encode()
+
+
+def run(n_items, iterations, page_size):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "wardrobe_page.db")
+        conn = make_database(db_path)
+        fill_clothes(conn, 1, n_items)
+        conn.close()
+
+        module = load_app(db_path)
+        client = module.app.test_client()
+        login(client, 1)
+
+        def first_view():
+            total = len(client.get("/wardrobe").data)
+            for subtype in ("top", "bottom", "foot"):
+                total += len(client.get(f"/api/wardrobe?subtype={subtype}&limit={page_size}").data)
+            return total
+
+        def full_scroll():
+            total = len(client.get("/wardrobe").data)
+            for subtype in ("top", "bottom", "foot"):
+                cursor = None
+                while True:
+                    url = f"/api/wardrobe?subtype={subtype}&limit={page_size}"
+                    if cursor:
+                        url += f"&cursor={cursor}"
+                    response = client.get(url)
+                    total += len(response.data)
+                    cursor = response.get_json()["next_cursor"]
+                    if not cursor:
+                        break
+            return total
+
+        with quiet(), module.app.test_request_context():
+            legacy_bytes = len(legacy_wardrobe(module, 1))
+            legacy = summarize(time_calls(lambda: legacy_wardrobe(module, 1), iterations))
+            first_bytes = first_view()
+            first = summarize(time_calls(first_view, iterations))
+            page = summarize(time_calls(
+                lambda: client.get(f"/api/wardrobe?subtype=top&limit={page_size}"), iterations))
+            scroll_bytes = full_scroll()
+
+    return [
+        {'view': f'legacy page ({n_items} cards)', 'bytes': legacy_bytes, 'p50_ms': legacy['p50_ms'], 'p95_ms': legacy['p95_ms']},
+        {'view': f'shell + first page x3', 'bytes': first_bytes, 'p50_ms': first['p50_ms'], 'p95_ms': first['p95_ms']},
+        {'view': f'one /api/wardrobe page', 'bytes': '', 'p50_ms': page['p50_ms'], 'p95_ms': page['p95_ms']},
+        {'view': 'shell + scroll to end', 'bytes': scroll_bytes, 'p50_ms': '', 'p95_ms': ''},
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=24)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.items, args.iterations, args.page_size)
+    print_table(f"📊 /wardrobe with {args.items} items", results, ['view', 'bytes', 'p50_ms', 'p95_ms'])
+    write_json(args.json, {'benchmark': 'wardrobe_page', 'items': args.items, 'results': results})
@@ -0,0 +1,99 @@
+"""
+Benchmark /wardrobe_stats: aggregate scan + sorts vs the maintained user_stats row.
+
+    python -m benchmarks.bench_wardrobe_stats --items 1000 5000 20000
+"""
+import argparse
+import os
+import tempfile
+
+from benchmarks.common import make_database, fill_clothes, time_calls, summarize, print_table, write_json
+from user_stats import get_user_stats, check_consistency, refresh_worn_lists
+
+
+def aggregate_stats(conn, user_id):
+    """The original /wardrobe_stats queries"""
+    stats = conn.execute("""
+        SELECT 
+            COUNT(*) as total_items,
+            SUM(wear_count) as total_wears,
+            AVG(wear_count) as avg_wears,
+            MIN(wear_count) as min_wears,
+            MAX(wear_count) as max_wears
+        FROM clothes
+        WHERE user_id = ?
+    """, (user_id,)).fetchone()
+    most_worn = conn.execute("""
+        SELECT id, file_path, subtype, wear_count 
+        FROM clothes 
+        WHERE user_id = ? 
+        ORDER BY wear_count DESC 
+        LIMIT 3
+    """, (user_id,)).fetchall()
+    least_worn = conn.execute("""
+        SELECT id, file_path, subtype, wear_count 
+        FROM clothes 
+        WHERE user_id = ? 
+        ORDER BY wear_count ASC 
+        LIMIT 3
+    """, (user_id,)).fetchall()
+    return stats, most_worn, least_worn
+
+
+def mark_worn(conn, user_id, item_ids):
+    """The /mark_outfit_worn write path, including the worn-list refresh"""
+    for item_id in item_ids:
+        conn.execute("UPDATE clothes SET wear_count = wear_count + 1 WHERE id = ? AND user_id = ?", (item_id, user_id))
+    conn.execute("INSERT INTO outfit_history (user_id, top_id, bottom_id, shoe_id) VALUES (?, ?, ?, ?)",
+                 (user_id, *item_ids))
+    refresh_worn_lists(conn, user_id)
+    conn.commit()
+
+
+def run(items_per_user, users, iterations):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_items in items_per_user:
+            conn = make_database(os.path.join(tmp, f"stats_{n_items}.db"))
+            for user_id in range(1, users + 1):
+                fill_clothes(conn, user_id, n_items)
+                refresh_worn_lists(conn, user_id)
+            conn.commit()
+            user_id = 1
+            ids = [r[0] for r in conn.execute("SELECT id FROM clothes WHERE user_id = ? LIMIT 3", (user_id,))]
+
+            # The old path had no index on (user_id, wear_count), so measure it without one too
+            conn.execute("DROP INDEX IF EXISTS idx_clothes_user_wear")
+            legacy = summarize(time_calls(lambda: aggregate_stats(conn, user_id), iterations))
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_clothes_user_wear ON clothes(user_id, wear_count)")
+            indexed = summarize(time_calls(lambda: aggregate_stats(conn, user_id), iterations))
+            maintained = summarize(time_calls(lambda: get_user_stats(conn, user_id), iterations))
+            write = summarize(time_calls(lambda: mark_worn(conn, user_id, ids), iterations))
+            problems = check_consistency(conn)
+
+            results.append({
+                'items': n_items,
+                'aggregate_p50_ms': legacy['p50_ms'],
+                'aggregate_indexed_p50_ms': indexed['p50_ms'],
+                'user_stats_p50_ms': maintained['p50_ms'],
+                'speedup': round(legacy['p50_ms'] / maintained['p50_ms'], 1) if maintained['p50_ms'] else None,
+                'mark_worn_p50_ms': write['p50_ms'],
+                'consistent': not problems,
+            })
+            conn.close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--users", type=int, default=20, help="users sharing the table")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.items, args.users, args.iterations)
+    print_table("📊 /wardrobe_stats read path", results,
+                ['items', 'aggregate_p50_ms', 'aggregate_indexed_p50_ms', 'user_stats_p50_ms',
+                 'speedup', 'mark_worn_p50_ms', 'consistent'])
+    write_json(args.json, {'benchmark': 'wardrobe_stats', 'results': results})
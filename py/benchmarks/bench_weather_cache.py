@@ -0,0 +1,177 @@
+"""
+Upstream weather calls for 10k users spread across cities, with the grid cache.
+
+    python -m benchmarks.bench_weather_cache
+    python -m benchmarks.bench_weather_cache --users 20000 --window 3600 --threads 64
+
+Users live around the cities of data/weather_fixture.json (bigger cities get
+more users, each user a few km to ~30 km from the center, coordinates with
+4 decimals like browser geolocation). The upstream is the fixture provider
+with a counter and --latency seconds of sleep.
+  spread    every user asks once at a random moment in a --window second window
+            (simulated clock, TTL 900 s), one after another: upstream calls
+            with no cache, a per-coordinate cache and grid cells of several
+            sizes / lookup radii; "error_km" is the mean distance from the
+            user to the point the weather was fetched for
+  burst     every user asks at once from --threads threads (real clock), and
+            --crowd users in one neighborhood do: upstream calls with and
+            without single-flight
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import print_table, write_json
+
+
+class CountingProvider:
+    """Fixture answers for the point asked for, counted, after latency seconds"""
+
+    def __init__(self, latency=0.0):
+        from weather_providers import FixtureProvider
+
+        self.fixture = FixtureProvider()
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def current(self, latitude, longitude):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        data = self.fixture.current(latitude, longitude)
+        data['latitude'], data['longitude'] = latitude, longitude
+        return data
+
+
+class NoFlight:
+    shared = 0
+
+    def do(self, key, fn, timeout=None):
+        return fn()
+
+
+def make_users(n_users, seed):
+    """[(lat, lon)] around the fixture cities, Zipf-like city sizes"""
+    from weather_providers import FixtureProvider
+
+    rng = random.Random(seed)
+    cities = FixtureProvider().locations
+    weights = [1.0 / (rank + 1) for rank in range(len(cities))]
+    users = []
+    for _ in range(n_users):
+        city = rng.choices(cities, weights)[0]
+        # Metro spread: most users within ~15 km, some up to ~30 km
+        lat = city['latitude'] + rng.gauss(0, 0.12)
+        lon = city['longitude'] + rng.gauss(0, 0.15)
+        users.append((round(lat, 4), round(lon, 4)))
+    return users
+
+
+def fresh_db(tmp, name):
+    from weather_cache import install_weather_cache_schema
+
+    path = os.path.join(tmp, f"{name}.db")
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    install_weather_cache_schema(conn)
+    conn.close()
+    return lambda: sqlite3.connect(path, timeout=30)
+
+
+def spread(users, window, tmp, seed):
+    from weather_cache import GridWeatherCache, distance_km
+
+    rng = random.Random(seed)
+    arrivals = sorted((rng.uniform(0, window), lat, lon) for lat, lon in users)
+    configs = [("no cache", None, None),
+               ("per coordinate", 0.0001, 0.0),
+               ("grid 0.1°, own cell", 0.1, 0.0),
+               ("grid 0.1°, 10 km radius", 0.1, 10.0),
+               ("grid 0.25°, 15 km radius", 0.25, 15.0)]
+    rows = []
+    for label, cell_deg, radius in configs:
+        upstream = CountingProvider()
+        now = [0.0]
+        if cell_deg is None:
+            get = upstream.current
+        else:
+            cache = GridWeatherCache(fresh_db(tmp, f"spread_{len(rows)}"), cell_deg=cell_deg, radius_km=radius,
+                                     ttl=900, clock=lambda: now[0])
+            get = lambda lat, lon: cache.get(lat, lon, upstream.current)
+        errors = []
+        start = time.perf_counter()
+        for t, lat, lon in arrivals:
+            now[0] = t
+            data = get(lat, lon)
+            errors.append(distance_km(lat, lon, data['latitude'], data['longitude']))
+        elapsed = time.perf_counter() - start
+        rows.append({'config': label, 'upstream_calls': upstream.calls,
+                     'reduction': f"{1 - upstream.calls / len(users):.1%}",
+                     'error_km': round(statistics.fmean(errors), 2), 'max_error_km': round(max(errors), 2),
+                     'us_per_lookup': round(elapsed * 1e6 / len(users), 1)})
+    return rows
+
+
+def burst(scenarios, threads, latency, tmp):
+    from weather_cache import GridWeatherCache
+
+    rows = []
+    for scenario, users in scenarios:
+        for label, single_flight in (("no", False), ("yes", True)):
+            upstream = CountingProvider(latency)
+            cache = GridWeatherCache(fresh_db(tmp, f"burst_{len(rows)}"))
+            if not single_flight:
+                cache.flight = NoFlight()
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                list(pool.map(lambda user: cache.get(user[0], user[1], upstream.current), users))
+            elapsed = time.perf_counter() - start
+            rows.append({'burst': scenario, 'single_flight': label,
+                         'cells': len({cache.cell_of(lat, lon)[0] for lat, lon in users}),
+                         'upstream_calls': upstream.calls, 'shared': cache.flight.shared,
+                         'seconds': round(elapsed, 2)})
+    return rows
+
+
+def run(n_users, window, threads, latency, crowd_size, seed=7):
+    import metrics
+
+    metrics.ENABLED = False
+    users = make_users(n_users, seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        spread_rows = spread(users, window, tmp, seed)
+        rng = random.Random(seed)
+        # A campus or stadium: one cell's worth of users opening the app together
+        lat0, lon0 = users[0]
+        crowd = [(round(lat0 + rng.uniform(-0.02, 0.02), 4), round(lon0 + rng.uniform(-0.02, 0.02), 4))
+                 for _ in range(crowd_size)]
+        burst_rows = burst([(f"{len(users)} users, all cities", users),
+                            (f"{crowd_size} users, one neighborhood", crowd)], threads, latency, tmp)
+    return spread_rows, burst_rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--window", type=float, default=3600, help="seconds over which users arrive")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.05, help="upstream seconds per call in the burst")
+    parser.add_argument("--crowd", type=int, default=500, help="users in the one-neighborhood burst")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    spread_rows, burst_rows = run(args.users, args.window, args.threads, args.latency, args.crowd)
+    print_table(f"📊 {args.users} users over {args.window:.0f}s", spread_rows,
+                ['config', 'upstream_calls', 'reduction', 'error_km', 'max_error_km', 'us_per_lookup'])
+    print_table(f"📊 Everyone at once, {args.threads} threads, {args.latency * 1000:.0f} ms upstream",
+                burst_rows, ['burst', 'single_flight', 'cells', 'upstream_calls', 'shared', 'seconds'])
+    write_json(args.json, {'benchmark': 'weather_cache', 'users': args.users, 'spread': spread_rows,
+                           'burst': burst_rows})
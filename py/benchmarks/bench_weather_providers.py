@@ -0,0 +1,94 @@
+"""
+Load test of /api/auto-recommend on the offline weather fixture.
+
+    python -m benchmarks.bench_weather_providers
+    python -m benchmarks.bench_weather_providers --requests 5000 --users 20
+
+The app runs the real WeatherService on WARDROBE_WEATHER_PROVIDER=fixture
+(data/weather_fixture.json); only the model is stubbed. requests.get is
+replaced by a function that counts and fails, so any network call shows up.
+Requests use coordinates scattered around the fixture's cities and, for a
+share of them, the city-name fallback. The response and weather caches are
+off, so every request takes the full weather -> season -> outfits path. Also
+times the provider calls on their own.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import load_app, login, quiet, summarize, print_table, write_json, time_calls
+from benchmarks.synthetic import generate
+
+
+def run(n_requests, users, items, city_share, seed=7):
+    import requests
+    import weather_cache
+
+    network_calls = []
+
+    def no_network(*args, **kwargs):
+        network_calls.append(args[0] if args else kwargs.get('url'))
+        raise requests.exceptions.ConnectionError("network disabled for this benchmark")
+
+    requests.get = no_network
+    os.environ["WARDROBE_CACHE"] = "off"
+    weather_cache.ENABLED = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "wardrobe.db")
+        conn, user_ids = generate(db_path, users, items, outfits_per_user=50, seed=seed)
+        conn.close()
+        with quiet():
+            m = load_app(db_path, weather="fixture")
+        provider = m.weather_service.provider
+        rng = random.Random(seed)
+
+        client = m.app.test_client()
+        samples, statuses = [], {}
+        start_all = time.perf_counter()
+        with quiet():
+            for i in range(n_requests):
+                login(client, rng.choice(user_ids))
+                place = rng.choice(provider.locations)
+                if rng.random() < city_share:
+                    url = f"/api/auto-recommend?city={place['name']}"
+                else:
+                    lat = place['latitude'] + rng.uniform(-1, 1)
+                    lon = place['longitude'] + rng.uniform(-1, 1)
+                    url = f"/api/auto-recommend?lat={lat:.4f}&lon={lon:.4f}"
+                start = time.perf_counter()
+                response = client.get(url)
+                samples.append((time.perf_counter() - start) * 1000.0)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        elapsed = time.perf_counter() - start_all
+
+        summary = summarize(samples)
+        endpoint = {'requests': n_requests, 'req_per_s': round(n_requests / elapsed, 1),
+                    'p50_ms': round(summary['p50_ms'], 3), 'p95_ms': round(summary['p95_ms'], 3),
+                    'statuses': statuses, 'network_calls': len(network_calls)}
+
+        provider_rows = []
+        for label, fn in (("current(lat, lon)", lambda: provider.current(40.7, -74.0)),
+                          ("geocode(city)", lambda: provider.geocode("New York")),
+                          ("hourly(lat, lon)", lambda: provider.hourly(40.7, -74.0))):
+            summary = summarize(time_calls(fn, 2000))
+            provider_rows.append({'call': label, 'p50_us': round(summary['p50_ms'] * 1000.0, 1)})
+    return endpoint, provider_rows, len(provider.locations)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--items", type=int, default=300, help="clothes per user")
+    parser.add_argument("--city-share", type=float, default=0.2, help="share of requests by city name")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    endpoint, provider_rows, n_locations = run(args.requests, args.users, args.items, args.city_share)
+    print_table(f"📊 /api/auto-recommend on the fixture provider ({n_locations} locations)", [endpoint],
+                ['requests', 'req_per_s', 'p50_ms', 'p95_ms', 'statuses', 'network_calls'])
+    print_table("📊 Fixture provider calls", provider_rows, ['call', 'p50_us'])
+    write_json(args.json, {'benchmark': 'weather_providers', 'endpoint': endpoint, 'provider': provider_rows})
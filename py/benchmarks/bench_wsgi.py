@@ -0,0 +1,200 @@
+"""
+Throughput of the production entry point (gunicorn -c gunicorn.conf.py wsgi:application)
+across worker counts and concurrent clients, over real HTTP against a synthetic wardrobe.
+
+    python -m benchmarks.bench_wsgi
+    python -m benchmarks.bench_wsgi --workers 1,2,4 --concurrency 1,4,16 --duration 10
+    WARDROBE_MODEL_BACKEND=keras python -m benchmarks.bench_wsgi --workers 2
+
+Each worker count reports boot time (master preload + worker warm-up), memory per
+worker (RSS vs PSS: PSS counts copy-on-write shared pages once across processes,
+so PSS well below RSS means the preloaded models really are shared) and, per
+concurrency level, requests/sec and latency percentiles over a request mix of
+wardrobe_stats, api_wardrobe and generate_outfit.
+Needs gunicorn (pip install gunicorn); uses the numpy-random model backend by default.
+"""
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+from benchmarks.common import PY_DIR, summarize, print_table, write_json
+from benchmarks.synthetic import generate
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers, port, env, boot_timeout=120):
+    """Start gunicorn and wait until every worker answers; returns (process, boot seconds)"""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-w", str(workers),
+         "-b", f"127.0.0.1:{port}", "--access-logfile", "/dev/null", "wsgi:application"],
+        cwd=PY_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = start + boot_timeout
+    while time.perf_counter() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {proc.returncode}")
+        if len(worker_pids(proc.pid)) == workers:
+            try:
+                requests.get(f"http://127.0.0.1:{port}/welcome", timeout=1)
+                return proc, time.perf_counter() - start
+            except requests.RequestException:
+                pass
+        time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("gunicorn did not come up in time")
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def worker_pids(master_pid):
+    try:
+        with open(f"/proc/{master_pid}/task/{master_pid}/children") as f:
+            return [int(pid) for pid in f.read().split()]
+    except OSError:
+        return []
+
+
+def memory_mb(pid):
+    """(rss, pss) in MB from /proc/<pid>/smaps_rollup (Linux only)"""
+    values = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if parts[0] in ("Rss:", "Pss:"):
+                    values[parts[0][:-1]] = int(parts[1]) / 1024.0
+    except OSError:
+        return None, None
+    return round(values.get("Rss", 0), 1), round(values.get("Pss", 0), 1)
+
+
+def make_session(base, username):
+    session = requests.Session()
+    response = session.post(f"{base}/login", data={'username': username, 'password': 'bench'},
+                            allow_redirects=False, timeout=30)
+    if response.status_code != 302:
+        raise RuntimeError(f"login failed for {username}: {response.status_code}")
+    return session
+
+
+def request_mix(base, combos, rng):
+    """One request drawn from the read-mostly mix"""
+    pick = rng.random()
+    if pick < 0.4:
+        return "GET", f"{base}/wardrobe_stats", None
+    if pick < 0.7:
+        return "GET", f"{base}/api/wardrobe?limit=24", None
+    season, occasion = rng.choice(combos)
+    return "POST", f"{base}/generate_outfit", {'season': season.capitalize(), 'occasion': occasion.capitalize()}
+
+
+def run_load(base, sessions, combos, concurrency, duration, seed=7):
+    """concurrency client threads issue requests back to back for duration seconds"""
+    samples = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    stop_at = time.perf_counter() + duration
+
+    def client(i):
+        rng = random.Random(seed + i)
+        session = sessions[i % len(sessions)]
+        while time.perf_counter() < stop_at:
+            method, url, data = request_mix(base, combos[i % len(combos)], rng)
+            start = time.perf_counter()
+            try:
+                response = session.request(method, url, data=data, timeout=60)
+                if response.status_code >= 400:
+                    errors[i] += 1
+            except requests.RequestException:
+                errors[i] += 1
+            samples[i].append((time.perf_counter() - start) * 1000.0)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    begin = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - begin
+    flat = [s for per_client in samples for s in per_client]
+    result = summarize(flat)
+    result['rps'] = round(len(flat) / elapsed, 1)
+    result['errors'] = sum(errors)
+    return result
+
+
+def run(worker_counts, concurrency_levels, duration, users, items, outfits, seed=7):
+    rows, memory_rows = [], []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "wardrobe.db")
+        conn, user_ids = generate(db_path, users, items, outfits, seed)
+        combos = [[tuple(r) for r in conn.execute("""
+            SELECT season, occasion FROM clothes WHERE user_id = ?
+            GROUP BY season, occasion HAVING COUNT(DISTINCT subtype) = 3
+        """, (user_id,))] for user_id in user_ids]
+        usernames = [row[0] for row in conn.execute("SELECT username FROM users ORDER BY id")]
+        conn.close()
+
+        env = dict(os.environ, WARDROBE_DB=db_path,
+                   WARDROBE_FEATURE_STORE=os.path.join(tmp, "feature_store"))
+        env.setdefault("WARDROBE_MODEL_BACKEND", "numpy-random")
+
+        for workers in worker_counts:
+            port = free_port()
+            proc, boot = start_server(workers, port, env)
+            base = f"http://127.0.0.1:{port}"
+            try:
+                sessions = [make_session(base, name) for name in usernames]
+                for pid in worker_pids(proc.pid):
+                    rss, pss = memory_mb(pid)
+                    memory_rows.append({'workers': workers, 'pid': pid, 'rss_mb': rss, 'pss_mb': pss})
+                for concurrency in concurrency_levels:
+                    run_load(base, sessions, combos, concurrency, min(2.0, duration))  # warm-up
+                    result = run_load(base, sessions, combos, concurrency, duration)
+                    rows.append({'workers': workers, 'concurrency': concurrency, 'boot_s': round(boot, 2),
+                                 'rps': result['rps'], 'p50_ms': result['p50_ms'],
+                                 'p95_ms': result['p95_ms'], 'p99_ms': result['p99_ms'],
+                                 'errors': result['errors']})
+            finally:
+                stop_server(proc)
+    return rows, memory_rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per concurrency level")
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--outfits", type=int, default=1000)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    rows, memory_rows = run([int(w) for w in args.workers.split(",")],
+                            [int(c) for c in args.concurrency.split(",")],
+                            args.duration, args.users, args.items, args.outfits)
+    print(f"CPU cores: {os.cpu_count()}")
+    print_table("📊 gunicorn throughput", rows,
+                ['workers', 'concurrency', 'boot_s', 'rps', 'p50_ms', 'p95_ms', 'p99_ms', 'errors'])
+    print_table("📊 Worker memory after warm-up", memory_rows, ['workers', 'pid', 'rss_mb', 'pss_mb'])
+    write_json(args.json, {'benchmark': 'wsgi', 'cpu_count': os.cpu_count(),
+                           'throughput': rows, 'memory': memory_rows})
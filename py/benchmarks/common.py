@@ -0,0 +1,166 @@
+"""
+Shared helpers for the benchmark scripts.
+Run benchmarks from the py/ folder as modules, e.g.
+    python -m benchmarks.bench_wardrobe_stats
+"""
+import contextlib
+import io
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import time
+
+# Make the app modules importable when run from anywhere
+PY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PY_DIR not in sys.path:
+    sys.path.insert(0, PY_DIR)
+
+import db_setup  # noqa: E402
+
+
+SUBTYPES = ["top", "bottom", "foot"]
+SEASONS = ["spring", "summer", "fall", "winter"]
+OCCASIONS = ["casual", "formal", "party", "sports", "ethnic", "smart casual", "travel"]
+COLORS = ["Black", "Blue", "White", "Grey", "Red", "Green", "Pink", "Multi"]
+
+
+# ==========================================
+# Database helpers
+# ==========================================
+
+def make_database(path):
+    """Create a fresh wardrobe database at path using db_setup's schema"""
+    if os.path.exists(path):
+        os.remove(path)
+    old_path = db_setup.DB_PATH
+    db_setup.DB_PATH = path
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            db_setup.create_database()
+    finally:
+        db_setup.DB_PATH = old_path
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def fill_clothes(conn, user_id, count, rng=None, max_wears=50):
+    """Insert count random clothes rows for user_id in one transaction"""
+    rng = rng or random.Random(user_id)
+    rows = [
+        (
+            user_id,
+            os.path.join("static", "uploads", str(user_id), f"item_{i}.jpg"),
+            rng.choice(SUBTYPES),
+            rng.choice(COLORS),
+            rng.choice(SEASONS),
+            rng.choice(OCCASIONS),
+            rng.randint(0, max_wears),
+        )
+        for i in range(count)
+    ]
+    conn.executemany("""
+        INSERT INTO clothes (user_id, file_path, subtype, color, season, occasion, wear_count)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+
+
+# ==========================================
+# Flask app with offline stubs
+# ==========================================
+
+def load_app(db_path, weather="stub"):
+    """
+    Import app.py against db_path with the model and weather service stubbed out.
+    weather="fixture" keeps the real WeatherService on the offline fixture provider.
+    Returns the app module (use module.app.test_client())
+    """
+    from benchmarks import stubs
+
+    os.environ["WARDROBE_DB"] = db_path
+    os.environ.setdefault("WARDROBE_FEATURE_STORE", os.path.join(os.path.dirname(db_path), "feature_store"))
+    stubs.install_recognition_stub()
+    if weather == "fixture":
+        import weather_providers
+        weather_providers.DEFAULT_PROVIDER = os.environ["WARDROBE_WEATHER_PROVIDER"] = "fixture"
+    else:
+        stubs.install_weather_stub()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if "app" in sys.modules:
+            module = sys.modules["app"]
+        else:
+            import app as module
+    module.DB_PATH = db_path
+    module.app.config["TESTING"] = True
+    return module
+
+
+def login(client, user_id, username="bench"):
+    """Put user_id into the test client's session"""
+    with client.session_transaction() as sess:
+        sess["user_id"] = user_id
+        sess["username"] = username
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the app's print() logging while timing requests"""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+# ==========================================
+# Timing helpers
+# ==========================================
+
+def time_calls(fn, iterations, warmup=3):
+    """Call fn repeatedly and return the per-call durations in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return samples
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Return mean/p50/p95/p99 (ms) for a list of samples"""
+    return {
+        'n': len(samples),
+        'mean_ms': round(statistics.fmean(samples), 4) if samples else 0.0,
+        'p50_ms': round(percentile(samples, 50), 4),
+        'p95_ms': round(percentile(samples, 95), 4),
+        'p99_ms': round(percentile(samples, 99), 4),
+    }
+
+
+def print_table(title, rows, columns):
+    """Print a list of dicts as a fixed-width table"""
+    print(f"\n{title}")
+    widths = [max(len(c), *(len(str(r.get(c, ''))) for r in rows)) for c in columns]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    print("  ".join("-" * w for w in widths))
+    for r in rows:
+        print("  ".join(str(r.get(c, '')).ljust(w) for c, w in zip(columns, widths)))
+
+
+def write_json(path, payload):
+    if not path:
+        return
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+    print(f"\n📝 Results written to {path}")
@@ -0,0 +1,84 @@
+"""
+Compare two benchmark suite results and flag regressions.
+
+    python -m benchmarks.compare baseline.json current.json
+    python -m benchmarks.compare baseline.json current.json --ratio 1.5
+
+A scenario regresses when a latency metric grows by more than its allowed
+ratio AND by more than MIN_DELTA_MS (so sub-millisecond noise never fails a run).
+Exits with status 1 if anything regressed.
+"""
+import argparse
+import json
+
+from benchmarks.common import print_table
+
+# Allowed current/baseline ratio per metric
+THRESHOLDS = {
+    'p50_ms': 1.3,
+    'p95_ms': 1.5,
+}
+
+# Per-scenario overrides, e.g. for endpoints that are noisy by nature
+SCENARIO_THRESHOLDS = {
+    'upload': {'p50_ms': 1.5, 'p95_ms': 2.0},
+}
+
+MIN_DELTA_MS = 1.0
+
+
+def compare(baseline, current, ratio=None):
+    """
+    Compare the 'scenarios' of two suite results.
+    Returns a list of rows with scenario, metric, baseline, current, ratio and status
+    """
+    rows = []
+    for name, now in current['scenarios'].items():
+        before = baseline['scenarios'].get(name)
+        if before is None:
+            rows.append({'scenario': name, 'metric': '-', 'status': 'new'})
+            continue
+        limits = dict(THRESHOLDS, **SCENARIO_THRESHOLDS.get(name, {}))
+        for metric, allowed in limits.items():
+            allowed = ratio or allowed
+            old, new = before[metric], now[metric]
+            change = new / old if old else float('inf')
+            if change > allowed and new - old > MIN_DELTA_MS:
+                status = 'REGRESSED'
+            elif change < 1 / allowed and old - new > MIN_DELTA_MS:
+                status = 'improved'
+            else:
+                status = 'ok'
+            rows.append({'scenario': name, 'metric': metric, 'baseline': old, 'current': new,
+                         'ratio': f"{change:.2f}x (max {allowed}x)", 'status': status})
+    for name in baseline['scenarios']:
+        if name not in current['scenarios']:
+            rows.append({'scenario': name, 'metric': '-', 'status': 'missing'})
+    return rows
+
+
+def report(rows, baseline, current):
+    """Print the comparison table and return True if anything regressed"""
+    print_table(f"📊 {baseline.get('commit', 'baseline')} -> {current.get('commit', 'current')}", rows,
+                ['scenario', 'metric', 'baseline', 'current', 'ratio', 'status'])
+    regressed = [r for r in rows if r['status'] == 'REGRESSED']
+    if regressed:
+        print(f"\n❌ {len(regressed)} regression(s)")
+    else:
+        print("\n✅ No regressions")
+    return bool(regressed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--ratio", type=float, default=None, help="override every threshold with this ratio")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    if report(compare(baseline, current, args.ratio), baseline, current):
+        raise SystemExit(1)
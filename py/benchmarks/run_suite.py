@@ -0,0 +1,163 @@
+"""
+End-to-end latency/throughput suite for the Flask app, run through the test
+client against a synthetic wardrobe (model and weather service stubbed out).
+
+    python -m benchmarks.run_suite --json results.json
+    python -m benchmarks.run_suite --users 20 --items 1000 --outfits 5000 --iterations 200
+    python -m benchmarks.run_suite --only wardrobe_stats,outfit_history
+    python -m benchmarks.run_suite --json new.json --baseline old.json   # exit 1 on regression
+
+Results carry the git commit so runs can be compared with benchmarks.compare.
+"""
+import argparse
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import PIL.Image as Image
+
+from benchmarks.common import load_app, login, quiet, summarize, print_table, write_json
+from benchmarks.compare import compare, report
+from benchmarks.synthetic import generate
+from user_stats import check_consistency
+
+
+def _jpeg_bytes():
+    buf = io.BytesIO()
+    Image.new("RGB", (60, 80), (120, 40, 200)).save(buf, "JPEG")
+    return buf.getvalue()
+
+
+def build_scenarios(conn, user_id, rng):
+    """
+    Each scenario is (name, request) where request(client) issues one request
+    and returns the response. Inputs are drawn from the synthetic data.
+    """
+    ids = {subtype: [r[0] for r in conn.execute(
+        "SELECT id FROM clothes WHERE user_id = ? AND subtype = ?", (user_id, subtype))]
+        for subtype in ("top", "bottom", "foot")}
+    # Season/occasion pairs this user can actually dress for (so /generate_outfit never 404s)
+    combos = [tuple(r) for r in conn.execute("""
+        SELECT season, occasion FROM clothes WHERE user_id = ?
+        GROUP BY season, occasion HAVING COUNT(DISTINCT subtype) = 3
+    """, (user_id,))]
+    photo = _jpeg_bytes()
+    uploads = iter(range(10 ** 9))
+
+    def generate_outfit(client):
+        season, occasion = rng.choice(combos)
+        return client.post("/generate_outfit", data={'season': season.capitalize(),
+                                                      'occasion': occasion.capitalize()})
+
+    def upload(client):
+        data = {'file': (io.BytesIO(photo), f"bench_{next(uploads)}.jpg")}
+        return client.post("/upload", data=data, content_type="multipart/form-data")
+
+    def mark_outfit_worn(client):
+        return client.post("/mark_outfit_worn", json={'top_id': rng.choice(ids["top"]),
+                                                      'bottom_id': rng.choice(ids["bottom"]),
+                                                      'shoe_id': rng.choice(ids["foot"])})
+
+    return [
+        ('generate_outfit', generate_outfit),
+        ('auto_recommend', lambda c: c.get("/api/auto-recommend?lat=40.71&lon=-74.01")),
+        ('wardrobe', lambda c: c.get("/wardrobe")),
+        ('api_wardrobe', lambda c: c.get("/api/wardrobe?limit=24")),
+        ('wardrobe_stats', lambda c: c.get("/wardrobe_stats")),
+        ('outfit_history', lambda c: c.get("/outfit_history")),
+        ('upload', upload),
+        ('mark_outfit_worn', mark_outfit_worn),
+    ]
+
+
+def run_scenario(client, request, iterations, warmup=5):
+    """Time iterations requests; returns latency summary, requests/sec and error count"""
+    errors = 0
+    for _ in range(warmup):
+        request(client)
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = request(client)
+        samples.append((time.perf_counter() - start) * 1000.0)
+        if response.status_code >= 400:
+            errors += 1
+    result = summarize(samples)
+    result['rps'] = round(iterations / (sum(samples) / 1000.0), 1)
+    result['errors'] = errors
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(users, items, outfits, iterations, only=None, seed=7):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "wardrobe.db")
+        conn, user_ids = generate(db_path, users, items, outfits, seed)
+        problems = check_consistency(conn)
+        assert problems == [], f"user_stats out of sync with the generated data: {problems[:3]}"
+        module = load_app(db_path)
+        module.app.config["UPLOAD_FOLDER"] = os.path.join(tmp, "uploads")
+        client = module.app.test_client()
+        user_id = user_ids[0]
+        login(client, user_id)
+
+        results = {}
+        for name, request in build_scenarios(conn, user_id, random.Random(seed)):
+            if only and name not in only:
+                continue
+            with quiet():
+                results[name] = run_scenario(client, request, iterations)
+        conn.close()
+
+        # Let queued thumbnail jobs from /upload finish before the temp dir goes away
+        import image_pipeline
+        image_pipeline._executor.shutdown(wait=True)
+
+    return {
+        'benchmark': 'app_suite',
+        'commit': git_commit(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'scale': {'users': users, 'items_per_user': items, 'outfits_per_user': outfits,
+                  'iterations': iterations},
+        'scenarios': results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--items", type=int, default=300, help="clothes per user")
+    parser.add_argument("--outfits", type=int, default=1000, help="outfit_history rows per user")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--only", help="comma-separated scenario names")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare against this earlier results file")
+    args = parser.parse_args()
+
+    only = set(args.only.split(",")) if args.only else None
+    results = run(args.users, args.items, args.outfits, args.iterations, only)
+    rows = [dict(scenario=name, **r) for name, r in results['scenarios'].items()]
+    print_table(f"📊 App suite @ {results['commit']} ({args.users} users x {args.items} items, "
+                f"{args.outfits} outfits)", rows,
+                ['scenario', 'p50_ms', 'p95_ms', 'p99_ms', 'rps', 'errors'])
+    write_json(args.json, results)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if report(compare(baseline, results), baseline, results):
+            raise SystemExit(1)
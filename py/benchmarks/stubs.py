@@ -0,0 +1,130 @@
+"""
+Offline stand-ins for the pieces of app.py that need models or the network.
+Installed by benchmarks.common.load_app() before app is imported.
+"""
+import os
+import sys
+import types
+import zlib
+
+from benchmarks.common import SEASONS, OCCASIONS, COLORS
+
+
+# ==========================================
+# recognition_module stand-in
+# ==========================================
+
+STUB_SUBTYPES = ["top", "bottom", "foot"]
+STUB_PROB_WIDTH = 54
+
+
+def stub_single_classification(single_path):
+    """Deterministic fake of recognition_module.single_classification"""
+    h = zlib.crc32(os.path.basename(single_path).encode())
+    subtype = STUB_SUBTYPES[h % 3]
+    res = [
+        "Tshirts" if subtype == "top" else ("Jeans" if subtype == "bottom" else "Casual Shoes"),
+        "Unisex",
+        COLORS[h % len(COLORS)],
+        SEASONS[(h >> 4) % len(SEASONS)].capitalize(),
+        OCCASIONS[(h >> 8) % len(OCCASIONS)].title(),
+        single_path,
+    ]
+    info = f"{res[0]}, {res[1]}, {res[2]}, {res[3]}, {res[4]}, {single_path}"
+    return (subtype, info, res)
+
+
+def stub_classify_with_features(single_path):
+    """Fake of recognition_module.classify_with_features (blank input, one-hot probs)"""
+    import numpy as np
+
+    subtype, info, res = stub_single_classification(single_path)
+    probs = np.zeros(STUB_PROB_WIDTH, dtype=np.float32)
+    probs[STUB_SUBTYPES.index(subtype)] = 1.0
+    features = {"input": np.zeros((80, 60, 3), dtype=np.uint8), "probs": probs, "color_rgb": (128, 128, 128)}
+    return (subtype, info, res, features)
+
+
+def stub_classify_paths(paths, batch_size=16, with_features=False):
+    """Fake of recognition_module.classify_paths"""
+    for path in paths:
+        outcome = stub_classify_with_features(path)
+        yield path, (outcome if with_features else outcome[:3])
+
+
+STANDIN_HEADS = [3, 20, 5, 15, 4, 7]  # sub model, then type/gender/color/season/occasion
+
+
+def standin_classify_input(seed=0):
+    """
+    NumPy function with the same signature and output layout as
+    recognition_module.classify_input (one dense layer + softmax per head).
+    Returns (classify_input, prob_width)
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    weights = [rng.standard_normal((80 * 60 * 3, width)).astype(np.float32) * 1e-3 for width in STANDIN_HEADS]
+    label_lists = [
+        [f"Type{i}" for i in range(STANDIN_HEADS[1])],
+        ["Boys", "Girls", "Men", "Unisex", "Women"],
+        [f"{c}{i}" for i, c in enumerate(COLORS * 2)][:STANDIN_HEADS[3]],
+        [s.capitalize() for s in SEASONS],
+        [o.title() for o in OCCASIONS],
+    ]
+
+    def classify_input(train_images):
+        flat = np.asarray(train_images, dtype=np.float32).reshape(len(train_images), -1) / 255.0
+        outputs = []
+        for w in weights:
+            logits = flat @ w
+            logits -= logits.max(axis=1, keepdims=True)
+            e = np.exp(logits)
+            outputs.append(e / e.sum(axis=1, keepdims=True))
+        probs = np.concatenate(outputs, axis=1)
+        subtypes = [STUB_SUBTYPES[i] for i in np.argmax(outputs[0], axis=1)]
+        results = [[labels[int(np.argmax(o[j]))] for o, labels in zip(outputs[1:], label_lists)]
+                   for j in range(len(probs))]
+        return subtypes, results, probs
+
+    return classify_input, sum(STANDIN_HEADS)
+
+
+def install_recognition_stub():
+    module = types.ModuleType("recognition_module")
+    module.single_classification = stub_single_classification
+    module.classify_with_features = stub_classify_with_features
+    module.classify_paths = stub_classify_paths
+    module.PROB_WIDTH = STUB_PROB_WIDTH
+    sys.modules["recognition_module"] = module
+    return module
+
+
+# ==========================================
+# WeatherService stand-in
+# ==========================================
+
+def install_weather_stub(temperature=22.0, weather_code=1):
+    """
+    Replace WeatherService with a subclass that keeps the real season logic
+    but never touches the network. Counts upstream fetches in .fetch_count
+    """
+    import weather_service
+
+    class StubWeatherService(weather_service.WeatherService):
+        fetch_count = 0
+
+        def __init__(self):
+            self.endpoints = {}
+            self.working_endpoint = None
+
+        def get_weather_by_coordinates(self, latitude, longitude):
+            StubWeatherService.fetch_count += 1
+            return {'current': {'temperature_2m': temperature, 'weather_code': weather_code,
+                                'humidity_2m': 60, 'wind_speed_10m': 0}}
+
+        def get_weather_by_city(self, city_name):
+            return self.get_weather_by_coordinates(40.71, -74.01)
+
+    weather_service.WeatherService = StubWeatherService
+    return StubWeatherService
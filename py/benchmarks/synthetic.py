@@ -0,0 +1,73 @@
+"""
+Synthetic wardrobe generator: fills users, clothes and outfit_history at a
+configurable scale using db_setup's schema (so triggers and indexes apply).
+
+    python -m benchmarks.synthetic --db /tmp/wardrobe.db --users 20 --items 500 --outfits 2000
+"""
+import argparse
+import os
+import random
+from datetime import datetime, timedelta
+
+from benchmarks.common import make_database, fill_clothes, SEASONS, OCCASIONS
+from user_stats import rebuild_user_stats
+
+
+def fill_users(conn, count):
+    """Insert count users (bench1..benchN) and return their ids"""
+    conn.executemany(
+        "INSERT INTO users (username, email, password) VALUES (?, ?, ?)",
+        [(f"bench{i}", f"bench{i}@example.com", "bench") for i in range(1, count + 1)],
+    )
+    conn.commit()
+    return [row[0] for row in conn.execute("SELECT id FROM users ORDER BY id")]
+
+
+def fill_history(conn, user_id, count, rng):
+    """Insert count outfit_history rows built from the user's clothes, oldest first"""
+    ids = {subtype: [r[0] for r in conn.execute(
+        "SELECT id FROM clothes WHERE user_id = ? AND subtype = ?", (user_id, subtype))]
+        for subtype in ("top", "bottom", "foot")}
+    if not all(ids.values()):
+        return
+    start = datetime(2020, 1, 1)
+    rows = []
+    for i in range(count):
+        # Several outfits share a timestamp, so ties on date_worn are common
+        worn = start + timedelta(minutes=i // 3)
+        rows.append((user_id, rng.choice(ids["top"]), rng.choice(ids["bottom"]), rng.choice(ids["foot"]),
+                     rng.choice(SEASONS), rng.choice(OCCASIONS), worn.strftime("%Y-%m-%d %H:%M:%S")))
+    conn.executemany("""
+        INSERT INTO outfit_history (user_id, top_id, bottom_id, shoe_id, season, occasion, date_worn)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+
+
+def generate(db_path, users=10, items_per_user=300, outfits_per_user=1000, seed=7):
+    """Create a fresh database at db_path and fill it. Returns (conn, user_ids)"""
+    rng = random.Random(seed)
+    conn = make_database(db_path)
+    user_ids = fill_users(conn, users)
+    for user_id in user_ids:
+        fill_clothes(conn, user_id, items_per_user, rng)
+        fill_history(conn, user_id, outfits_per_user, rng)
+    # The triggers keep the counters, but most/least worn are only written by refresh_worn_lists
+    rebuild_user_stats(conn)
+    conn.execute("ANALYZE")
+    conn.commit()
+    return conn, user_ids
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", required=True, help="database file to create (overwritten)")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--items", type=int, default=300, help="clothes per user")
+    parser.add_argument("--outfits", type=int, default=1000, help="outfit_history rows per user")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    conn, user_ids = generate(os.path.abspath(args.db), args.users, args.items, args.outfits, args.seed)
+    conn.close()
+    print(f"✅ {len(user_ids)} users, {args.items} clothes and {args.outfits} outfits each -> {args.db}")
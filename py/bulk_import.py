@@ -0,0 +1,199 @@
+import os
+import re
+import shutil
+import sqlite3
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+import numpy as np
+import PIL.Image as Image
+
+from image_pipeline import DERIVED_DIR, IMAGE_EXTENSIONS, generate_derivatives, load_model_input
+
+
+# ==========================================
+# BULK WARDROBE IMPORT
+# ==========================================
+# Imports a folder or .zip of photos into one user's wardrobe:
+#   worker processes  copy the file into static/uploads/<user_id>/, build the
+#                     thumbnails/model input and compute the dominant color
+#   main process      runs the models on batches of inputs and inserts the
+#                     clothes rows with executemany, one transaction per batch
+# Every committed batch is final, so re-running the same import skips what is
+# already in the wardrobe and carries on where it stopped.
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wardrobe.db")
+DEFAULT_BATCH_SIZE = 64
+# Same relative form app.py stores in clothes.file_path (run from the py/ folder)
+UPLOAD_FOLDER = os.path.join("static", "uploads")
+
+_zip_handles = {}
+
+
+def list_sources(source):
+    """Return the image entries of a folder or zip archive as relative names, sorted"""
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            names = [info.filename for info in archive.infolist()
+                     if not info.is_dir() and not info.filename.startswith("__MACOSX/")]
+    else:
+        names = []
+        for folder, dirs, files in os.walk(source):
+            dirs[:] = [d for d in dirs if d != DERIVED_DIR]
+            names.extend(os.path.relpath(os.path.join(folder, f), source) for f in files)
+    return sorted(n for n in names if os.path.splitext(n)[1].lower() in IMAGE_EXTENSIONS)
+
+
+def destination_name(relative_name):
+    """Flatten a relative path into one safe upload file name (stable across runs)"""
+    flat = relative_name.replace("\\", "/").strip("/").replace("/", "__")
+    return re.sub(r"[^A-Za-z0-9._-]", "_", flat)
+
+
+def _copy_source(source, relative_name, dest):
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    if zipfile.is_zipfile(source):
+        archive = _zip_handles.get(source)
+        if archive is None:
+            archive = _zip_handles[source] = zipfile.ZipFile(source)
+        with archive.open(relative_name) as src, open(tmp, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+    else:
+        shutil.copyfile(os.path.join(source, relative_name), tmp)
+    os.replace(tmp, dest)
+
+
+def prepare_one(args):
+    """
+    Worker: copy one photo into the uploads folder and compute everything that
+    does not need the models. Returns (dest, model_input, color_rgb, error)
+    """
+    from color_module import get_dominant_color
+
+    source, relative_name, dest, derivatives = args
+    try:
+        _copy_source(source, relative_name, dest)
+        if derivatives:
+            generate_derivatives(dest)
+        model_input = load_model_input(dest)
+        with Image.open(dest) as img:
+            color = get_dominant_color(img.convert("RGB")) or (255, 255, 255)
+        return dest, model_input, color, None
+    except Exception as e:
+        return dest, None, None, f"{type(e).__name__}: {e}"
+
+
+def _insert_batch(conn, user_id, batch, classify_input, store, model_version):
+    """Classify one batch of prepared photos and insert them in a single transaction"""
+    from user_stats import refresh_worn_lists
+
+    subtypes, results, probs = classify_input(np.stack([model_input for _, model_input, _ in batch]))
+    rows = [(user_id, dest, subtype, labels[2], labels[3].lower(), labels[4].lower(), model_version)
+            for (dest, _, _), subtype, labels in zip(batch, subtypes, results)]
+    with conn:
+        conn.executemany("""
+            INSERT INTO clothes (user_id, file_path, subtype, color, season, occasion, wear_count, model_version)
+            VALUES (?, ?, ?, ?, ?, ?, 0, ?)
+        """, rows)
+        refresh_worn_lists(conn, user_id)
+
+    if store is not None:
+        placeholders = ",".join("?" * len(batch))
+        ids = dict(conn.execute(
+            f"SELECT file_path, id FROM clothes WHERE user_id = ? AND file_path IN ({placeholders})",
+            [user_id] + [dest for dest, _, _ in batch]).fetchall())
+        for (dest, model_input, color), item_probs in zip(batch, probs):
+            store.append(ids[dest], model_input, item_probs, color)
+
+
+def import_wardrobe(source, user_id, conn, classify_input, workers=None,
+                    batch_size=DEFAULT_BATCH_SIZE, upload_root=UPLOAD_FOLDER,
+                    store=None, derivatives=True, progress=True, model_version=None):
+    """
+    Import every photo under source (folder or .zip) for user_id.
+    classify_input is recognition_module.classify_input (or a stand-in with
+    the same signature); model_version stamps the rows for reclassify.py.
+    Returns a summary dict with throughput numbers.
+    """
+    user_folder = os.path.join(upload_root, str(user_id))
+    os.makedirs(user_folder, exist_ok=True)
+
+    existing = {row[0] for row in conn.execute("SELECT file_path FROM clothes WHERE user_id = ?", (user_id,))}
+    names = list_sources(source)
+    tasks = []
+    for name in names:
+        dest = os.path.join(user_folder, destination_name(name))
+        if dest not in existing:
+            tasks.append((source, name, dest, derivatives))
+
+    start = time.perf_counter()
+    imported = failed = 0
+    batch = []
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(16, len(tasks) // (workers * 4)))
+
+    # spawn, not fork: the parent may already hold TensorFlow state
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        for dest, model_input, color, error in pool.map(prepare_one, tasks, chunksize=chunksize):
+            if error:
+                failed += 1
+                print(f"❌ {dest}: {error}")
+                continue
+            batch.append((dest, model_input, color))
+            if len(batch) >= batch_size:
+                _insert_batch(conn, user_id, batch, classify_input, store, model_version)
+                imported += len(batch)
+                batch = []
+                if progress:
+                    elapsed = time.perf_counter() - start
+                    print(f"   {imported + failed}/{len(tasks)} images ({imported / elapsed:.1f} images/sec)")
+        if batch:
+            _insert_batch(conn, user_id, batch, classify_input, store, model_version)
+            imported += len(batch)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "images": len(names),
+        "imported": imported,
+        "skipped": len(names) - len(tasks),
+        "failed": failed,
+        "seconds": round(elapsed, 2),
+        "images_per_sec": round(imported / elapsed, 1) if elapsed and imported else 0.0,
+    }
+
+
+# ==========================================
+# MAIN EXECUTION
+# ==========================================
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import a folder or .zip of clothing photos into a wardrobe")
+    parser.add_argument("source", help="folder or .zip archive of photos")
+    parser.add_argument("--user", type=int, required=True, help="user id to import into")
+    parser.add_argument("--db", default=DB_PATH, help="path to wardrobe.db")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="photos per model batch / transaction")
+    parser.add_argument("--no-derivatives", action="store_true", help="skip thumbnails (built later by image_pipeline backfill)")
+    args = parser.parse_args()
+
+    # classify_batch uses the shared inference server when WARDROBE_INFERENCE_SOCKET is set
+    from recognition_module import classify_batch, PROB_WIDTH
+    from feature_store import get_feature_store
+    from reclassify import install_reclassify_schema, model_fingerprint
+
+    conn = sqlite3.connect(args.db)
+    install_reclassify_schema(conn)
+    print(f"📦 Importing {args.source} for user {args.user}")
+    summary = import_wardrobe(args.source, args.user, conn, classify_batch,
+                              workers=args.workers, batch_size=args.batch_size,
+                              store=get_feature_store(PROB_WIDTH),
+                              derivatives=not args.no_derivatives,
+                              model_version=model_fingerprint())
+    conn.close()
+    print(f"✅ {summary['imported']} imported, {summary['skipped']} already in the wardrobe, "
+          f"{summary['failed']} failed in {summary['seconds']}s "
+          f"({summary['images_per_sec']} images/sec)")
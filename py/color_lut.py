@@ -0,0 +1,198 @@
+import argparse
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+
+# ==========================================
+# PRECOMPUTED COLOR-NAME LOOKUP TABLE
+# ==========================================
+# convert_rgb_to_names used to build a KDTree over the 138 CSS3 colors on every
+# call. This module answers the same question from a table built once
+# (`python color_lut.py build`) and shipped as data/css3_color_lut.bin:
+#   top     (64, 64, 64) uint16, indexed by the high 6 bits of r, g, b.
+#           A value below n_names is the name of every color in that 4x4x4
+#           cell; otherwise the cell straddles a boundary (or a tie) and
+#           value - n_names is its block
+#   blocks  (n_blocks, 4, 4, 4) uint8, the name of each color in mixed cells
+# Every one of the 16.7M colors is stored exactly as the KDTree names it, ties
+# included. The file is memory-mapped on first use: nothing is read up front,
+# and a lookup touches at most two pages.
+# File layout (little endian):
+#   header  MAGIC, bits, n_names, n_blocks, names_len, top_offset, blocks_offset
+#   names   n_names utf-8 names joined by "\n"
+#   top / blocks at 64-byte aligned offsets
+# WARDROBE_COLOR_LUT points at another file; without one, color_module falls
+# back to a cached KDTree.
+
+MAGIC = b"WRDCLUT1"
+HEADER = struct.Struct("<8sBxHIIQQ")
+BITS = 6
+ALIGN = 64
+
+DEFAULT_PATH = os.environ.get(
+    "WARDROBE_COLOR_LUT",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "css3_color_lut.bin"))
+
+
+def css3_palette():
+    """(names, (n, 3) uint8 rgb) of the CSS3 colors, in webcolors' order"""
+    from webcolors import CSS3_HEX_TO_NAMES, hex_to_rgb
+
+    names = list(CSS3_HEX_TO_NAMES.values())
+    rgb = np.array([tuple(hex_to_rgb(h)) for h in CSS3_HEX_TO_NAMES], dtype=np.uint8)
+    return names, rgb
+
+
+def exact_names(names_rgb, bits=BITS):
+    """Name index of every 24-bit color by KDTree query, shaped (cells, cells, cells, 64) by 6-bit cell"""
+    from scipy.spatial import KDTree
+
+    tree = KDTree(names_rgb)
+    side, step = 1 << bits, 1 << (8 - bits)
+    values = np.arange(256, dtype=np.uint8)
+    out = np.empty((side, side, side, step ** 3), dtype=np.uint8)
+    g, b = np.meshgrid(values, values, indexing="ij")
+    for r in range(256):
+        points = np.column_stack([np.full(g.size, r, dtype=np.uint8), g.ravel(), b.ravel()])
+        _, index = tree.query(points)
+        # (g, b) plane of this r, regrouped into (g cell, b cell, g offset, b offset)
+        plane = index.astype(np.uint8).reshape(side, step, side, step).transpose(0, 2, 1, 3)
+        out[r // step, :, :, (r % step) * step * step:(r % step + 1) * step * step] = \
+            plane.reshape(side, side, step * step)
+    return out
+
+
+def _pad(f):
+    f.write(b"\0" * (-f.tell() % ALIGN))
+    return f.tell()
+
+
+def build_lut(path=DEFAULT_PATH, bits=BITS):
+    """Compute the table with scipy + webcolors and write it to path; returns its size in bytes"""
+    names, rgb = css3_palette()
+    cells = exact_names(rgb, bits)
+    first = cells[..., :1]
+    uniform = (cells == first).all(axis=-1)
+
+    top = np.where(uniform, cells[..., 0], 0).astype(np.uint16)
+    mixed = np.flatnonzero(~uniform)
+    if len(names) + len(mixed) > np.iinfo(np.uint16).max:
+        raise ValueError(f"{len(mixed)} mixed cells do not fit a uint16 table")
+    top.ravel()[mixed] = len(names) + np.arange(len(mixed), dtype=np.uint16)
+    step = 1 << (8 - bits)
+    blocks = cells.reshape(-1, step ** 3)[mixed]
+
+    name_bytes = "\n".join(names).encode("utf-8")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+        f.write(name_bytes)
+        top_offset = _pad(f)
+        f.write(top.tobytes())
+        blocks_offset = _pad(f)
+        f.write(np.ascontiguousarray(blocks).tobytes())
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, bits, len(names), len(mixed), len(name_bytes), top_offset, blocks_offset))
+    os.replace(tmp, path)
+    return os.path.getsize(path)
+
+
+class ColorLUT:
+    """Read-only view of a table file; the arrays are np.memmap slices of it"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        with open(path, "rb") as f:
+            magic, bits, n_names, n_blocks, names_len, top_offset, blocks_offset = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a color lookup table")
+            self.names = f.read(names_len).decode("utf-8").split("\n")
+        side, step = 1 << bits, 1 << (8 - bits)
+        self.path = path
+        self.shift = 8 - bits
+        self.n_names = n_names
+        self.top = np.memmap(path, dtype=np.uint16, mode="r", offset=top_offset, shape=(side, side, side))
+        self.blocks = np.memmap(path, dtype=np.uint8, mode="r", offset=blocks_offset,
+                                shape=(n_blocks, step, step, step)) if n_blocks else None
+
+    def index(self, r, g, b):
+        """Name index of one color"""
+        s = self.shift
+        cell = int(self.top[r >> s, g >> s, b >> s])
+        if cell < self.n_names:
+            return cell
+        mask = (1 << s) - 1
+        return int(self.blocks[cell - self.n_names, r & mask, g & mask, b & mask])
+
+    def name(self, rgb):
+        r, g, b = (int(v) for v in rgb)
+        return self.names[self.index(r, g, b)]
+
+    def indices(self, rgb):
+        """Name indices for an (..., 3) array of 0-255 colors"""
+        rgb = np.asarray(rgb, dtype=np.uint8)
+        r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+        s, mask = self.shift, (1 << self.shift) - 1
+        cells = self.top[r >> s, g >> s, b >> s]
+        out = cells.astype(np.uint8)
+        mixed = cells >= self.n_names
+        if mixed.any():
+            out[mixed] = self.blocks[cells[mixed] - self.n_names, r[mixed] & mask, g[mixed] & mask, b[mixed] & mask]
+        return out
+
+
+_lut = None
+_lut_lock = threading.Lock()
+
+
+def get_lut():
+    """The shared ColorLUT, opened on first use; None if the file is missing or unreadable"""
+    global _lut
+    if _lut is None:
+        with _lut_lock:
+            if _lut is None:
+                try:
+                    _lut = ColorLUT(DEFAULT_PATH)
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ Color lookup table unavailable ({e}); naming colors with a KDTree")
+                    _lut = False
+    return _lut or None
+
+
+def check(path=DEFAULT_PATH):
+    """Compare every 24-bit color in the table against a fresh KDTree query; returns mismatches"""
+    lut = ColorLUT(path)
+    names, rgb = css3_palette()
+    if names != lut.names:
+        raise ValueError("table was built from a different palette; rebuild it")
+    from scipy.spatial import KDTree
+
+    tree = KDTree(rgb)
+    values = np.arange(256, dtype=np.uint8)
+    g, b = np.meshgrid(values, values, indexing="ij")
+    mismatches = 0
+    for r in range(256):
+        points = np.column_stack([np.full(g.size, r, dtype=np.uint8), g.ravel(), b.ravel()])
+        _, expected = tree.query(points)
+        mismatches += int((lut.indices(points) != expected).sum())
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or verify the CSS3 color-name lookup table")
+    parser.add_argument("command", choices=["build", "check"])
+    parser.add_argument("--path", default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "build":
+        size = build_lut(args.path)
+        print(f"✅ Wrote {args.path}: {size / 1024:.0f} KB in {time.perf_counter() - start:.1f}s")
+    else:
+        mismatches = check(args.path)
+        print(f"{'✅' if mismatches == 0 else '❌'} {mismatches} of 16777216 colors differ from the KDTree "
+              f"({time.perf_counter() - start:.1f}s)")
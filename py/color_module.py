@@ -0,0 +1,74 @@
+#for color classification
+import colorsys
+import PIL.Image as Image
+
+import color_lut
+
+# Color helpers live apart from recognition_module so that worker processes
+# (bulk import, backfills) can name colors without importing TensorFlow.
+# Names come from the precomputed table in color_lut (memory-mapped, exact);
+# the KDTree below is only built if that file is missing.
+
+_kdtree = None
+
+def _kdtree_name(rgb_tuple):
+    global _kdtree
+    if _kdtree is None:
+        from scipy.spatial import KDTree
+        names, rgb_values = color_lut.css3_palette()
+        _kdtree = (KDTree(rgb_values), names)
+    tree, names = _kdtree
+    distance, index = tree.query(rgb_tuple)
+    return names[index]
+
+def convert_rgb_to_names(rgb_tuple):
+    """
+    This function translates rgb to their respective names in css3
+    is a helper function for the two below.
+    Input is a rgb tuple
+    Output is their corresponding name in css3
+    """
+    lut = color_lut.get_lut()
+    if lut is None:
+        return _kdtree_name(rgb_tuple)
+    return lut.name(rgb_tuple)
+
+def get_dominant_color(image):
+    """
+    This function finds the dominant (most saturated, not near-white) color of an image
+    Input is an image
+    Output is a rgb tuple
+    """
+    max_score = 0.0001
+    dominant_color = None
+    for count,(r,g,b) in image.getcolors(image.size[0]*image.size[1]):
+       
+        saturation = colorsys.rgb_to_hsv(r/255.0, g/255.0, b/255.0)[1]
+        y = min(abs(r*2104+g*4130+b*802+4096+131072)>>13,235)
+        y = (y-16.0)/(235-16)
+        if y > 0.9:
+            continue
+        score = (saturation+0.1)*count
+        if score > max_score:
+            max_score = score
+            dominant_color = (r,g,b)
+            
+    return dominant_color
+
+def get_cloth_color(image):
+    """
+    This function is a helper function of the one below to recognize color of an image
+    Input is an image
+    Output is a color in English
+    """
+    return convert_rgb_to_names(get_dominant_color(image))
+ 
+def color_classification(single_path):
+    """
+    This function does color classification for a certain path of a photo (of a clothes)
+    Input is a path on your computer
+    Output is a color
+    """
+    image = Image.open(single_path)
+    image = image.convert('RGB')
+    return get_cloth_color(image)
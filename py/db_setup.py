@@ -1,6 +1,11 @@
 import sqlite3
 import os
 
+from user_stats import install_stats_schema
+from reclassify import install_reclassify_schema
+from desktop_store import install_desktop_schema
+from weather_cache import install_weather_cache_schema
+
 
 # ==========================================
 # DATABASE CONFIGURATION
@@ -13,6 +18,47 @@ DB_PATH = os.path.join(os.getcwd(), "wardrobe.db")
 os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
 
 
+# ==========================================
+# INDEXES (HOT QUERY PATHS)
+# ==========================================
+
+INDEXES = {
+    # Covers the outfit history page: keyset seek on (date_worn, id) per user,
+    # plus every outfit_history column the page reads
+    "idx_outfit_history_user_date": '''
+        CREATE INDEX IF NOT EXISTS idx_outfit_history_user_date
+        ON outfit_history(user_id, date_worn, id, top_id, bottom_id, shoe_id, season, occasion, rating)
+    ''',
+    # Wardrobe pages: keyset on id within a user, with or without a subtype filter
+    "idx_clothes_user_subtype_id": '''
+        CREATE INDEX IF NOT EXISTS idx_clothes_user_subtype_id
+        ON clothes(user_id, subtype, id)
+    ''',
+    "idx_clothes_user_id": '''
+        CREATE INDEX IF NOT EXISTS idx_clothes_user_id
+        ON clothes(user_id, id)
+    ''',
+}
+
+
+def create_indexes(conn):
+    """Create missing indexes (skips any whose table does not exist yet)"""
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    created = []
+    for name, ddl in INDEXES.items():
+        table = ddl.split(" ON ")[1].split("(")[0].strip()
+        if table not in tables:
+            continue
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (name,)
+        ).fetchone()
+        if not exists:
+            conn.execute(ddl)
+            created.append(name)
+    conn.commit()
+    return created
+
+
 # ==========================================
 # DATABASE CONNECTION
 # ==========================================
@@ -172,6 +218,10 @@ def create_database():
         user_id INTEGER NOT NULL UNIQUE,
         total_items INTEGER DEFAULT 0,
         total_outfits_worn INTEGER DEFAULT 0,
+        total_wears INTEGER DEFAULT 0,
+        most_worn TEXT,
+        least_worn TEXT,
+        wardrobe_version INTEGER DEFAULT 0,
         favorite_color TEXT,
         favorite_style TEXT,
         last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -181,6 +231,41 @@ def create_database():
     print("✅ User Stats table created")
     
     
+    # ==========================================
+    # USER STATS TRIGGERS (INCREMENTAL COUNTERS)
+    # ==========================================
+    install_stats_schema(conn)
+    print("✅ User Stats triggers created")
+    
+    
+    # ==========================================
+    # RECLASSIFICATION COLUMNS (MODEL UPGRADES)
+    # ==========================================
+    install_reclassify_schema(conn)
+    print("✅ Reclassification columns created")
+    
+    
+    # ==========================================
+    # DESKTOP APP COLUMNS (FILE HASH / MTIME)
+    # ==========================================
+    install_desktop_schema(conn)
+    print("✅ Desktop app columns created")
+    
+    
+    # ==========================================
+    # WEATHER CACHE (GRID CELLS)
+    # ==========================================
+    install_weather_cache_schema(conn)
+    print("✅ Weather cache table created")
+    
+    
+    # ==========================================
+    # INDEXES
+    # ==========================================
+    create_indexes(conn)
+    print("✅ Indexes created")
+    
+    
     # ==========================================
     # COMMIT CHANGES
     # ==========================================
@@ -331,6 +416,10 @@ def migrate_database():
             user_id INTEGER NOT NULL UNIQUE,
             total_items INTEGER DEFAULT 0,
             total_outfits_worn INTEGER DEFAULT 0,
+            total_wears INTEGER DEFAULT 0,
+            most_worn TEXT,
+            least_worn TEXT,
+            wardrobe_version INTEGER DEFAULT 0,
             favorite_color TEXT,
             favorite_style TEXT,
             last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -362,6 +451,39 @@ def migrate_database():
     except sqlite3.OperationalError:
         print("⏭️  notes column already exists")
     
+    # ===== RECLASSIFICATION COLUMNS =====
+    
+    if install_reclassify_schema(conn):
+        print("✅ Added model_version / edited-flag columns to clothes")
+    else:
+        print("⏭️  reclassification columns already exist")
+    
+    # ===== DESKTOP APP COLUMNS =====
+    
+    if install_desktop_schema(conn):
+        print("✅ Added label / file hash / mtime columns to clothes")
+    else:
+        print("⏭️  desktop app columns already exist")
+    
+    # ===== WEATHER CACHE =====
+    
+    if install_weather_cache_schema(conn):
+        print("✅ Created weather_cache table")
+    else:
+        print("⏭️  weather_cache table already exists")
+    
+    # ===== USER STATS TRIGGERS =====
+    
+    if install_stats_schema(conn):
+        print("✅ Installed user_stats triggers and rebuilt stats")
+    else:
+        print("⏭️  user_stats triggers already exist")
+    
+    # ===== ADD MISSING INDEXES =====
+    
+    for name in create_indexes(conn):
+        print(f"✅ Created index {name}")
+    
     conn.commit()
     conn.close()
     
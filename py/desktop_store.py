@@ -0,0 +1,178 @@
+import contextlib
+import hashlib
+import io
+import os
+import sqlite3
+
+from reclassify import install_reclassify_schema, model_fingerprint
+
+
+# ==========================================
+# DESKTOP WARDROBE PERSISTENCE
+# ==========================================
+# The PyQt app (ui_module) keeps its wardrobe in a SQLite database with the
+# db_setup.py schema, as the clothes of a local "desktop" user. Next to the
+# labels, each row remembers the photo's size, mtime and content hash, so a
+# launch reads every row in one query and only re-classifies photos that were
+# modified (mtime/size changed AND the hash differs) or labelled by an older
+# model version.
+
+DESKTOP_DB = os.environ.get("WARDROBE_DESKTOP_DB",
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), "wardrobe_desktop.db"))
+DESKTOP_USER = "desktop"
+
+DESKTOP_COLUMNS = [
+    ("item_type", "TEXT"),
+    ("gender", "TEXT"),
+    ("label", "TEXT"),           # the text shown in the list (user edits included)
+    ("file_size", "INTEGER"),
+    ("file_mtime", "REAL"),
+    ("file_hash", "TEXT"),
+]
+
+
+def install_desktop_schema(conn):
+    """Add the desktop columns to clothes if they are missing"""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'clothes'").fetchone() is None:
+        return False
+    existing_columns = {row[1] for row in conn.execute("PRAGMA table_info(clothes)")}
+    missing = [(column, ddl) for column, ddl in DESKTOP_COLUMNS if column not in existing_columns]
+    for column, ddl in missing:
+        conn.execute(f"ALTER TABLE clothes ADD COLUMN {column} {ddl}")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_clothes_user_path ON clothes(user_id, file_path)")
+    conn.commit()
+    return bool(missing)
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DesktopStore:
+    """
+    The desktop user's clothes rows. Item ids are clothes.id, so the
+    WardrobeIndex and the database share them.
+    """
+
+    def __init__(self, path=DESKTOP_DB, model_version=None):
+        self.path = path
+        self.model_version = model_version or model_fingerprint()
+        new = not os.path.exists(path)
+        if new:
+            self._create(path)
+        self.conn = sqlite3.connect(path)
+        install_reclassify_schema(self.conn)
+        install_desktop_schema(self.conn)
+        self.user_id = self._desktop_user()
+
+    @staticmethod
+    def _create(path):
+        """Create the file with db_setup's schema"""
+        import db_setup
+
+        old_path = db_setup.DB_PATH
+        db_setup.DB_PATH = path
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                db_setup.create_database()
+        finally:
+            db_setup.DB_PATH = old_path
+
+    def _desktop_user(self):
+        row = self.conn.execute("SELECT id FROM users WHERE username = ?", (DESKTOP_USER,)).fetchone()
+        if row:
+            return row[0]
+        cur = self.conn.execute("INSERT INTO users (username, email, password) VALUES (?, ?, '')",
+                                (DESKTOP_USER, f"{DESKTOP_USER}@localhost"))
+        self.conn.commit()
+        return cur.lastrowid
+
+    def close(self):
+        self.conn.close()
+
+    # ==========================================
+    # STARTUP
+    # ==========================================
+
+    def load(self):
+        """
+        Read every row and check it against the file on disk.
+        Returns (fresh, stale, missing):
+          fresh   - [(id, subtype, label, res)] ready to show
+          stale   - [(id, path)] whose photo changed or whose labels come from an older model
+          missing - [id] whose photo no longer exists (left in the database)
+        """
+        rows = self.conn.execute("""
+            SELECT id, subtype, label, item_type, gender, color, season, occasion, file_path,
+                   file_size, file_mtime, file_hash, model_version
+            FROM clothes WHERE user_id = ? ORDER BY id
+        """, (self.user_id,)).fetchall()
+
+        fresh, stale, missing, touched = [], [], [], []
+        for (item_id, subtype, label, item_type, gender, color, season, occasion, path,
+             size, mtime, digest, version) in rows:
+            try:
+                st = os.stat(path)
+            except OSError:
+                missing.append(item_id)
+                continue
+            if st.st_size != size or st.st_mtime != mtime:
+                # Only the content counts: a copy or `touch` keeps the labels
+                try:
+                    changed = file_hash(path) != digest
+                except OSError:
+                    missing.append(item_id)
+                    continue
+                if changed:
+                    stale.append((item_id, path))
+                    continue
+                touched.append((st.st_size, st.st_mtime, item_id))
+            if version != self.model_version:
+                stale.append((item_id, path))
+                continue
+            fresh.append((item_id, subtype, label, [item_type, gender, color, season, occasion, path]))
+
+        if touched:
+            with self.conn:
+                self.conn.executemany("UPDATE clothes SET file_size = ?, file_mtime = ? WHERE id = ?", touched)
+        return fresh, stale, missing
+
+    # ==========================================
+    # CHANGES FROM THE UI
+    # ==========================================
+
+    def save(self, subtype, info, res):
+        """Insert or update the row for res's photo; returns its id"""
+        item_type, gender, color, season, occasion, path = res[:5] + [res[-1]]
+        st = os.stat(path)
+        values = (subtype, item_type, gender, color, season, occasion, info,
+                  st.st_size, st.st_mtime, file_hash(path), self.model_version)
+        row = self.conn.execute("SELECT id FROM clothes WHERE user_id = ? AND file_path = ?",
+                                (self.user_id, path)).fetchone()
+        with self.conn:
+            if row:
+                self.conn.execute("""
+                    UPDATE clothes SET subtype = ?, item_type = ?, gender = ?, color = ?, season = ?, occasion = ?,
+                           label = ?, file_size = ?, file_mtime = ?, file_hash = ?, model_version = ?
+                    WHERE id = ?
+                """, values + (row[0],))
+                return row[0]
+            cur = self.conn.execute("""
+                INSERT INTO clothes (subtype, item_type, gender, color, season, occasion, label,
+                                     file_size, file_mtime, file_hash, model_version, user_id, file_path)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, values + (self.user_id, path))
+            return cur.lastrowid
+
+    def update_label(self, item_id, label):
+        with self.conn:
+            self.conn.execute("UPDATE clothes SET label = ? WHERE id = ? AND user_id = ?",
+                              (label, item_id, self.user_id))
+
+    def delete(self, item_id):
+        with self.conn:
+            self.conn.execute("DELETE FROM clothes WHERE id = ? AND user_id = ?", (item_id, self.user_id))
@@ -0,0 +1,136 @@
+import random
+
+
+# ==========================================
+# DESKTOP WARDROBE INDEX
+# ==========================================
+# In-memory wardrobe of the PyQt app (ui_module). Items are __slots__ records
+# kept in buckets per subtype, (subtype, season), (subtype, occasion) and
+# (subtype, season, occasion), so picking an outfit is a few dict lookups plus
+# random choices, and adding or deleting an item is O(1) - no list scans.
+
+SUBTYPES = ("top", "bottom", "foot")
+
+
+class WardrobeItem:
+    """
+    One classified photo. res is the single_classification result list:
+    [type, gender, color, season, occasion, path]
+    """
+    __slots__ = ("id", "subtype", "type", "gender", "color", "season", "occasion", "path", "info")
+
+    def __init__(self, item_id, subtype, info, res):
+        self.id = item_id
+        self.subtype = subtype
+        self.type, self.gender, self.color, self.season, self.occasion = res[:5]
+        self.path = res[-1]
+        self.info = info
+
+    def as_result(self):
+        """The single_classification-style list for this item"""
+        return [self.type, self.gender, self.color, self.season, self.occasion, self.path]
+
+
+class _Bucket:
+    """Set of item ids with O(1) add, discard and random choice (list + position map)"""
+    __slots__ = ("ids", "pos")
+
+    def __init__(self):
+        self.ids = []
+        self.pos = {}
+
+    def add(self, item_id):
+        if item_id not in self.pos:
+            self.pos[item_id] = len(self.ids)
+            self.ids.append(item_id)
+
+    def discard(self, item_id):
+        index = self.pos.pop(item_id, None)
+        if index is None:
+            return
+        last = self.ids.pop()
+        if last != item_id:
+            self.ids[index] = last
+            self.pos[last] = index
+
+    def choice(self, rng):
+        return self.ids[rng.randrange(len(self.ids))] if self.ids else None
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class WardrobeIndex:
+    """
+    Items by id and by path, plus the season/occasion buckets Generate needs.
+    """
+
+    def __init__(self, rng=None):
+        self.items = {}
+        self.by_path = {}
+        self._buckets = {}
+        self._next_id = 1
+        self.rng = rng or random.Random()
+
+    def __len__(self):
+        return len(self.items)
+
+    def _keys(self, item):
+        return ((item.subtype,), (item.subtype, "season", item.season), (item.subtype, "occasion", item.occasion),
+                (item.subtype, item.season, item.occasion))
+
+    def add(self, subtype, info, res, item_id=None):
+        """Add a classified photo; adding a path again replaces the old entry"""
+        if res[-1] in self.by_path:
+            self.remove(self.by_path[res[-1]])
+        if item_id is None:
+            item_id = self._next_id
+        self._next_id = max(self._next_id, item_id + 1)
+        item = WardrobeItem(item_id, subtype, info, res)
+        self.items[item_id] = item
+        self.by_path[item.path] = item_id
+        for key in self._keys(item):
+            self._buckets.setdefault(key, _Bucket()).add(item_id)
+        return item
+
+    def remove(self, item_id):
+        """Remove and return an item (None if it is not there)"""
+        item = self.items.pop(item_id, None)
+        if item is None:
+            return None
+        self.by_path.pop(item.path, None)
+        for key in self._keys(item):
+            self._buckets[key].discard(item_id)
+        return item
+
+    def get(self, item_id):
+        return self.items.get(item_id)
+
+    def count(self, subtype):
+        return len(self._buckets.get((subtype,), ()))
+
+    def _pick(self, *key):
+        bucket = self._buckets.get(key)
+        item_id = bucket.choice(self.rng) if bucket else None
+        return self.items[item_id] if item_id is not None else None
+
+    def _pick_matching(self, subtype, season, occasion):
+        """Same occasion (preferring the season) if possible, else anything of that subtype"""
+        if self._buckets.get((subtype, "occasion", occasion)):
+            return self._pick(subtype, season, occasion) or self._pick(subtype, "occasion", occasion)
+        return self._pick(subtype)
+
+    def generate(self, season):
+        """
+        A (top, bottom, shoes) outfit for season, with the same preferences as before:
+        a top of that season if any; bottom and shoes of the top's occasion if any,
+        preferring the season among those. None if a category is empty.
+        """
+        top = self._pick("top", "season", season) or self._pick("top")
+        if top is None:
+            return None
+        bottom = self._pick_matching("bottom", season, top.occasion)
+        shoes = self._pick_matching("foot", season, top.occasion)
+        if bottom is None or shoes is None:
+            return None
+        return top, bottom, shoes
@@ -0,0 +1,306 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl  # cross-process append lock (not available on Windows)
+except ImportError:
+    fcntl = None
+
+
+# ==========================================
+# MEMORY-MAPPED FEATURE STORE
+# ==========================================
+# One global store with a row per clothes item, keyed by clothes.id:
+#   ids.npy     int64   (capacity,)           clothes.id, -1 for deleted rows
+#   inputs.npy  uint8   (capacity, 80, 60, 3) model input (raw 0-255 pixels,
+#                                             exactly what the models are fed)
+#   probs.npy   float32 (capacity, PROB_WIDTH) flattened model outputs
+#   colors.npy  uint8   (capacity, 3)         dominant rgb color
+#   meta.json   row count / capacity / prob width
+# Files are preallocated and doubled when full, so appends are O(1) amortized.
+# Readers get numpy views straight onto the mapped pages (zero-copy).
+
+FEATURE_STORE_DIR = os.environ.get(
+    "WARDROBE_FEATURE_STORE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "feature_store"),
+)
+INPUT_SHAPE = (80, 60, 3)
+COLOR_DIM = 3
+INITIAL_CAPACITY = 1024
+DELETED = -1
+
+
+class FeatureStore:
+    """
+    Append-only, memory-mapped store of per-item model inputs and outputs.
+    Safe for one writer thread per process; appends from several processes
+    are serialized with a lock file where fcntl is available.
+    """
+
+    def __init__(self, path=FEATURE_STORE_DIR, prob_width=None, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        self._mode = "r" if readonly else "r+"
+
+        if self._read_meta() is None:
+            if readonly:
+                raise FileNotFoundError(f"No feature store at {path}")
+            if prob_width is None:
+                raise ValueError("prob_width is required to create a new feature store")
+            os.makedirs(path, exist_ok=True)
+            self._allocate(INITIAL_CAPACITY, prob_width, copy_rows=0)
+            self._write_meta(0, INITIAL_CAPACITY, prob_width)
+        self._open()
+
+    # ----- files -----
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _read_meta(self):
+        try:
+            with open(self._file("meta.json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_meta(self, count, capacity, prob_width):
+        tmp = self._file("meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"count": count, "capacity": capacity, "prob_width": prob_width}, f)
+        os.replace(tmp, self._file("meta.json"))
+
+    def _layout(self, capacity, prob_width):
+        return {
+            "ids.npy": (np.int64, (capacity,)),
+            "inputs.npy": (np.uint8, (capacity,) + INPUT_SHAPE),
+            "probs.npy": (np.float32, (capacity, prob_width)),
+            "colors.npy": (np.uint8, (capacity, COLOR_DIM)),
+        }
+
+    def _allocate(self, capacity, prob_width, copy_rows):
+        """Create (or grow into) files of the given capacity, copying the first copy_rows rows"""
+        for name, (dtype, shape) in self._layout(capacity, prob_width).items():
+            tmp = self._file(name + ".grow")
+            new = np.lib.format.open_memmap(tmp, mode="w+", dtype=dtype, shape=shape)
+            if name == "ids.npy":
+                new[:] = DELETED
+            if copy_rows:
+                new[:copy_rows] = getattr(self, name.split(".")[0])[:copy_rows]
+            new.flush()
+            del new
+            os.replace(tmp, self._file(name))
+
+    def _open(self):
+        meta = self._read_meta()
+        self.count = meta["count"]
+        self.capacity = meta["capacity"]
+        self.prob_width = meta["prob_width"]
+        self.ids = np.load(self._file("ids.npy"), mmap_mode=self._mode)
+        self.inputs = np.load(self._file("inputs.npy"), mmap_mode=self._mode)
+        self.probs = np.load(self._file("probs.npy"), mmap_mode=self._mode)
+        self.colors = np.load(self._file("colors.npy"), mmap_mode=self._mode)
+        self._row_of = {int(item_id): row for row, item_id in enumerate(self.ids[:self.count])
+                        if item_id != DELETED}
+
+    def refresh(self):
+        """Pick up rows appended by other processes"""
+        meta = self._read_meta()
+        if meta and (meta["count"] != self.count or meta["capacity"] != self.capacity):
+            self._open()
+
+    # ----- writes -----
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if fcntl is None:
+                self.refresh()
+                yield
+                return
+            with open(self._file("store.lock"), "w") as handle:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+                try:
+                    self.refresh()
+                    yield
+                finally:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def append(self, item_id, model_input, probs, color_rgb):
+        """Append the features of one item (overwrites the row if item_id is already stored)"""
+        if self.readonly:
+            raise PermissionError("Feature store is open read-only")
+        with self._locked():
+            row = self._row_of.get(int(item_id))
+            if row is None:
+                if self.count == self.capacity:
+                    self._allocate(self.capacity * 2, self.prob_width, copy_rows=self.count)
+                    self._write_meta(self.count, self.capacity * 2, self.prob_width)
+                    self._open()
+                row = self.count
+            self.inputs[row] = model_input
+            self.probs[row, :len(probs)] = probs
+            self.colors[row] = color_rgb
+            self.ids[row] = item_id
+            if row == self.count:
+                self.count += 1
+                self._write_meta(self.count, self.capacity, self.prob_width)
+            self._row_of[int(item_id)] = row
+
+    def update_probs(self, start, stop, probs):
+        """Overwrite the model outputs of rows start:stop (used when re-scoring after a model change)"""
+        self.probs[start:stop, :probs.shape[1]] = probs
+
+    def set_probs(self, item_id, probs):
+        """Overwrite the model outputs of one stored item (no-op if it is not stored)"""
+        row = self._row_of.get(int(item_id))
+        if row is not None:
+            self.probs[row, :len(probs)] = probs
+
+    def delete(self, item_id):
+        """Mark an item's row as deleted (space is reclaimed by compact())"""
+        with self._locked():
+            row = self._row_of.pop(int(item_id), None)
+            if row is not None:
+                self.ids[row] = DELETED
+
+    def compact(self):
+        """Rewrite the store without deleted rows"""
+        with self._locked():
+            live = np.flatnonzero(self.ids[:self.count] != DELETED)
+            for name in ("ids", "inputs", "probs", "colors"):
+                array = getattr(self, name)
+                array[:len(live)] = array[live]
+            self.ids[len(live):self.count] = DELETED
+            self.flush()
+            self._write_meta(len(live), self.capacity, self.prob_width)
+            self._open()
+
+    def flush(self):
+        for array in (self.ids, self.inputs, self.probs, self.colors):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+    # ----- reads -----
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def __contains__(self, item_id):
+        return int(item_id) in self._row_of
+
+    def get(self, item_id):
+        """Zero-copy views of one item's features, or None"""
+        row = self._row_of.get(int(item_id))
+        if row is None:
+            return None
+        return {"input": self.inputs[row], "probs": self.probs[row], "color_rgb": self.colors[row]}
+
+    def iter_batches(self, batch_size=256):
+        """
+        Yield (start, stop, ids, inputs, probs) for consecutive row ranges.
+        The arrays are views onto the mapped files; ids is DELETED for removed rows.
+        """
+        for start in range(0, self.count, batch_size):
+            stop = min(start + batch_size, self.count)
+            yield start, stop, self.ids[start:stop], self.inputs[start:stop], self.probs[start:stop]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_feature_store(prob_width):
+    """Process-wide store at FEATURE_STORE_DIR (created on first use)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = FeatureStore(FEATURE_STORE_DIR, prob_width=prob_width)
+        return _store
+
+
+# ==========================================
+# BATCH REPROCESSING
+# ==========================================
+
+def rescore(store, classify_input, batch_size=256):
+    """
+    Re-run the models over every stored input (e.g. after a model upgrade)
+    and write the new outputs back in place. No image is decoded.
+    Returns the list of (item_id, subtype, labels) for live rows.
+    """
+    results = []
+    for start, stop, ids, inputs, _ in store.iter_batches(batch_size):
+        subtypes, labels, probs = classify_input(inputs)
+        store.update_probs(start, stop, probs)
+        results.extend((int(i), s, l) for i, s, l in zip(ids, subtypes, labels) if i != DELETED)
+    store.flush()
+    return results
+
+
+def build_from_database(store, conn, batch_size=64):
+    """Add every clothes row that is missing from the store (decodes each image once)"""
+    from recognition_module import classify_input
+    from color_module import get_dominant_color
+    from image_pipeline import load_model_input
+    import PIL.Image as Image
+
+    rows = [(item_id, path) for item_id, path in conn.execute("SELECT id, file_path FROM clothes ORDER BY id")
+            if item_id not in store and os.path.exists(path)]
+    for start in range(0, len(rows), batch_size):
+        chunk = rows[start:start + batch_size]
+        inputs = np.stack([load_model_input(path) for _, path in chunk])
+        _, _, probs = classify_input(inputs)
+        for (item_id, path), model_input, item_probs in zip(chunk, inputs, probs):
+            with Image.open(path) as img:
+                color = get_dominant_color(img.convert("RGB")) or (255, 255, 255)
+            store.append(item_id, model_input, item_probs, color)
+        print(f"   {min(start + batch_size, len(rows))}/{len(rows)} items stored")
+    store.flush()
+    return len(rows)
+
+
+# ==========================================
+# MAIN EXECUTION
+# ==========================================
+
+if __name__ == "__main__":
+    import argparse
+    import sqlite3
+    import time
+
+    parser = argparse.ArgumentParser(description="Manage the memory-mapped feature store")
+    parser.add_argument("command", choices=["info", "build", "rescore", "compact"])
+    parser.add_argument("--store", default=FEATURE_STORE_DIR)
+    parser.add_argument("--db", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "wardrobe.db"))
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    if args.command == "info":
+        store = FeatureStore(args.store, readonly=True)
+        print(f"📦 {len(store)} items ({store.count} rows, capacity {store.capacity}, "
+              f"prob width {store.prob_width}) at {args.store}")
+    elif args.command == "compact":
+        store = FeatureStore(args.store)
+        store.compact()
+        print(f"✅ Compacted to {store.count} rows")
+    else:
+        from recognition_module import classify_input, PROB_WIDTH
+
+        store = FeatureStore(args.store, prob_width=PROB_WIDTH)
+        start = time.perf_counter()
+        if args.command == "build":
+            conn = sqlite3.connect(args.db)
+            added = build_from_database(store, conn)
+            conn.close()
+            print(f"✅ Added {added} items in {time.perf_counter() - start:.1f}s")
+        else:
+            results = rescore(store, classify_input, args.batch_size)
+            elapsed = time.perf_counter() - start
+            print(f"✅ Re-scored {len(results)} items in {elapsed:.1f}s "
+                  f"({len(results) / elapsed if elapsed else 0:.0f} items/sec)")
@@ -0,0 +1,49 @@
+# ==========================================
+# GUNICORN CONFIGURATION
+# ==========================================
+#   cd py && gunicorn -c gunicorn.conf.py wsgi:application
+#
+# preload_app imports wsgi.py (app + models) once in the master; workers are
+# forked from it and share the model weights copy-on-write. Every setting can
+# be overridden on the command line (e.g. -w 8 -b 0.0.0.0:80) or with the
+# environment variables below.
+import gc
+import multiprocessing
+import os
+
+bind = os.environ.get("WARDROBE_BIND", "127.0.0.1:8000")
+
+# Classification is CPU bound, so one process per core; the threads cover
+# requests that mostly wait on SQLite or the weather API
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "gthread"
+threads = int(os.environ.get("WARDROBE_THREADS", "4"))
+
+preload_app = True
+
+# Uploads run the models and the color scan, which take a few seconds on big photos
+timeout = int(os.environ.get("WARDROBE_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then so slow leaks can't grow without bound
+max_requests = int(os.environ.get("WARDROBE_MAX_REQUESTS", "2000"))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.environ.get("WARDROBE_ACCESS_LOG", "-")
+
+
+def when_ready(server):
+    # Everything the master has loaded so far (app, models) goes to the permanent
+    # GC generation, so collections in the workers don't touch - and copy - those pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    import wsgi
+
+    # Split the cores between the workers' TensorFlow thread pools
+    os.environ.setdefault("WARDROBE_TF_THREADS",
+                          str(max(1, multiprocessing.cpu_count() // max(1, server.cfg.workers))))
+
+    wsgi.warm_up_worker()
@@ -0,0 +1,236 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import PIL.Image as Image
+from PIL import ImageOps
+
+import metrics
+
+
+# ==========================================
+# DERIVATIVE IMAGE PIPELINE
+# ==========================================
+# For every upload static/uploads/<user_id>/<file> we keep, in a sibling
+# _derived/ folder:
+#   <file>.thumb.webp  - fixed-size card thumbnail (what the pages show)
+#   <file>.thumb.jpg   - same thumbnail for clients without WebP
+#   <file>.input.npy   - the 80x60x3 uint8 array the classifier consumes
+# Derivatives are produced off the request thread; until they exist the
+# pages simply fall back to the original upload.
+
+DERIVED_DIR = "_derived"
+THUMB_SIZE = (300, 400)          # width, height - 3:4 like the model input
+THUMB_WEBP_QUALITY = 80
+THUMB_JPEG_QUALITY = 82
+MODEL_INPUT_SHAPE = (80, 60, 3)  # height, width, channels
+
+BASE_UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "uploads")
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp", ".gif", ".tif", ".tiff"}
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="derivatives")
+
+
+def derived_paths(file_path):
+    """Paths of all derivatives for an uploaded file"""
+    folder, name = os.path.split(file_path)
+    derived = os.path.join(folder, DERIVED_DIR)
+    return {
+        "webp": os.path.join(derived, name + ".thumb.webp"),
+        "jpeg": os.path.join(derived, name + ".thumb.jpg"),
+        "input": os.path.join(derived, name + ".input.npy"),
+    }
+
+
+def _is_fresh(derived_path, source_path):
+    try:
+        return os.path.getmtime(derived_path) >= os.path.getmtime(source_path)
+    except OSError:
+        return False
+
+
+def _atomic_save(path, writer):
+    """Write through a temp file so readers never see a half-written derivative"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    writer(tmp)
+    os.replace(tmp, path)
+
+
+def _save_array(path, arr):
+    # np.save(path) would append .npy to the temp name, so write through a handle
+    with open(path, "wb") as f:
+        np.save(f, arr)
+
+
+# ==========================================
+# MODEL INPUT
+# ==========================================
+
+def decode_model_input(path):
+    """
+    Decode an image into the 80x60x3 uint8 array the classifier expects.
+    Mirrors the original single_classification preprocessing exactly:
+    images that are already 80x60 were read with cv2 (BGR channel order),
+    everything else went through keras load_img (RGB, nearest-neighbour resize).
+    """
+    with Image.open(path) as img:
+        rgb = img.convert("RGB")
+        if rgb.size == (MODEL_INPUT_SHAPE[1], MODEL_INPUT_SHAPE[0]):
+            return np.asarray(rgb, dtype=np.uint8)[:, :, ::-1].copy()
+        resized = rgb.resize((MODEL_INPUT_SHAPE[1], MODEL_INPUT_SHAPE[0]), Image.NEAREST)
+        return np.asarray(resized, dtype=np.uint8)
+
+
+def load_model_input(path):
+    """Return the model input for path, from the cached .input.npy when it is fresh"""
+    cached = derived_paths(path)["input"]
+    if _is_fresh(cached, path):
+        try:
+            arr = np.load(cached)
+            if arr.shape == MODEL_INPUT_SHAPE:
+                metrics.cache_result("model_input", True)
+                return arr
+        except (OSError, ValueError):
+            pass
+    metrics.cache_result("model_input", False)
+    return decode_model_input(path)
+
+
+# ==========================================
+# DERIVATIVE GENERATION
+# ==========================================
+
+def generate_derivatives(file_path, force=False):
+    """
+    Create the thumbnails and the cached model input for one upload.
+    Returns the number of bytes written (0 if everything was already fresh).
+    """
+    paths = derived_paths(file_path)
+    if not force and all(_is_fresh(p, file_path) for p in paths.values()):
+        return 0
+
+    os.makedirs(os.path.dirname(paths["webp"]), exist_ok=True)
+
+    with Image.open(file_path) as img:
+        img.draft("RGB", (THUMB_SIZE[0] * 2, THUMB_SIZE[1] * 2))  # fast JPEG downscale on decode
+        thumb = ImageOps.fit(ImageOps.exif_transpose(img).convert("RGB"), THUMB_SIZE, Image.LANCZOS)
+
+    _atomic_save(paths["webp"], lambda p: thumb.save(p, "WEBP", quality=THUMB_WEBP_QUALITY, method=4))
+    _atomic_save(paths["jpeg"], lambda p: thumb.save(p, "JPEG", quality=THUMB_JPEG_QUALITY,
+                                                     optimize=True, progressive=True))
+
+    # The model input must come from the full decode (draft mode changes the pixels)
+    model_input = decode_model_input(file_path)
+    _atomic_save(paths["input"], lambda p: _save_array(p, model_input))
+
+    return sum(os.path.getsize(p) for p in paths.values())
+
+
+def _generate_logged(file_path):
+    try:
+        return generate_derivatives(file_path)
+    except Exception as e:
+        print(f"⚠️ Derivatives failed for {file_path}: {type(e).__name__}: {e}")
+        return 0
+
+
+def schedule_derivatives(file_path):
+    """Queue derivative generation on the background pool (returns a Future)"""
+    return _executor.submit(_generate_logged, file_path)
+
+
+def remove_derivatives(file_path):
+    """Delete all derivatives of an upload (used when the item is deleted)"""
+    for path in derived_paths(file_path).values():
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def thumbnail_path(file_path):
+    """Best file to show as a card for file_path: WebP thumbnail, else the original"""
+    webp = derived_paths(file_path)["webp"]
+    return webp if os.path.exists(webp) else file_path
+
+
+# ==========================================
+# BACKFILL (EXISTING UPLOADS)
+# ==========================================
+
+def iter_uploads(root):
+    """Yield every original upload under root (skipping _derived folders)"""
+    for folder, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d != DERIVED_DIR]
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                yield os.path.join(folder, name)
+
+
+def _backfill_one(args):
+    path, force = args
+    try:
+        return path, os.path.getsize(path), generate_derivatives(path, force=force), None
+    except Exception as e:
+        return path, 0, 0, f"{type(e).__name__}: {e}"
+
+
+def backfill(root=BASE_UPLOAD_FOLDER, workers=None, force=False):
+    """
+    Generate missing derivatives for every existing upload using a process pool.
+    Returns a summary dict with throughput numbers.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    paths = list(iter_uploads(root))
+    start = time.perf_counter()
+    processed = failed = bytes_in = bytes_out = 0
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, min(16, len(paths) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for i, (path, size_in, size_out, error) in enumerate(
+                pool.map(_backfill_one, [(p, force) for p in paths], chunksize=chunksize), 1):
+            if error:
+                failed += 1
+                print(f"❌ {path}: {error}")
+            elif size_out:
+                processed += 1
+                bytes_in += size_in
+                bytes_out += size_out
+            if i % 100 == 0:
+                print(f"   {i}/{len(paths)} images checked")
+
+    elapsed = time.perf_counter() - start
+    return {
+        "images": len(paths),
+        "processed": processed,
+        "skipped": len(paths) - processed - failed,
+        "failed": failed,
+        "seconds": round(elapsed, 2),
+        "images_per_sec": round(processed / elapsed, 1) if elapsed and processed else 0.0,
+        "bytes_in": bytes_in,
+        "bytes_out": bytes_out,
+    }
+
+
+# ==========================================
+# MAIN EXECUTION
+# ==========================================
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate thumbnails and model inputs for uploads")
+    parser.add_argument("command", choices=["backfill"])
+    parser.add_argument("--root", default=BASE_UPLOAD_FOLDER, help="uploads folder to walk")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="regenerate even if derivatives are fresh")
+    args = parser.parse_args()
+
+    print(f"🖼️  Backfilling derivatives under {args.root}")
+    summary = backfill(args.root, args.workers, args.force)
+    print(f"✅ {summary['processed']} processed, {summary['skipped']} already fresh, "
+          f"{summary['failed']} failed in {summary['seconds']}s "
+          f"({summary['images_per_sec']} images/sec)")
@@ -0,0 +1,101 @@
+import mimetypes
+import os
+import re
+
+from flask import Response, abort, current_app, redirect, request, send_file, session, url_for
+from werkzeug.security import safe_join
+
+
+# ==========================================
+# USER IMAGE SERVING
+# ==========================================
+# Uploads and their thumbnails are served from /images/<user_id>/<name>, and
+# only to the session that owns that folder. The old /static/uploads/... URLs
+# redirect here, so no one can read another user's folder through them.
+# Caching:
+#   immutable        uploads named <name>-<sha1 prefix>.<ext> (upload_stream),
+#                    and any URL whose ?v= matches the file's current version
+#                    (thumbnail_url adds it)
+#   ETag + no-cache  everything else: the browser revalidates and gets a 304
+# With WARDROBE_IMAGE_OFFLOAD=nginx (or =sendfile) the app only checks access
+# and headers. The bytes are sent by the front proxy via X-Accel-Redirect
+# (nginx, an internal location aliased to the uploads folder at
+# WARDROBE_IMAGE_ACCEL_PREFIX) or X-Sendfile (Apache/lighttpd).
+
+OFFLOAD = os.environ.get("WARDROBE_IMAGE_OFFLOAD", "").lower()
+ACCEL_PREFIX = os.environ.get("WARDROBE_IMAGE_ACCEL_PREFIX", "/protected-uploads/")
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+HASHED_NAME = re.compile(r"-[0-9a-f]{12}\.[A-Za-z0-9]+$")
+PRIVATE_DIRS = {".incoming"}
+
+
+def image_url(user_id, relative_path, version=None):
+    """URL of a file under <UPLOAD_FOLDER>/<user_id>/ (relative_path may include _derived/)"""
+    url = f"/images/{user_id}/{relative_path}"
+    return f"{url}?v={version}" if version else url
+
+
+def image_version(path):
+    """Short token that changes whenever the file is rewritten"""
+    try:
+        return format(os.stat(path).st_mtime_ns, "x")
+    except OSError:
+        return None
+
+
+def is_immutable(name, path):
+    if request.args.get("v") and request.args["v"] == image_version(path):
+        return True
+    return "/" not in name and HASHED_NAME.search(name) is not None
+
+
+def serve_image(user_id, name):
+    """Send one of the current user's images, with cache headers and ETag/304"""
+    if user_id != str(session.get("user_id", "guest")) or name.split("/", 1)[0] in PRIVATE_DIRS:
+        abort(404)
+    path = safe_join(os.path.abspath(current_app.config["UPLOAD_FOLDER"]), user_id, name)
+    try:
+        st = os.stat(path) if path else None
+    except OSError:
+        st = None
+    if st is None or not os.path.isfile(path):
+        abort(404)
+
+    etag = f"{st.st_size:x}-{st.st_mtime_ns:x}"
+    if OFFLOAD in ("nginx", "sendfile"):
+        response = Response(mimetype=mimetypes.guess_type(name)[0] or "application/octet-stream")
+        response.set_etag(etag)
+        response.make_conditional(request)
+        if response.status_code == 200:
+            if OFFLOAD == "nginx":
+                response.headers["X-Accel-Redirect"] = f"{ACCEL_PREFIX.rstrip('/')}/{user_id}/{name}"
+            else:
+                response.headers["X-Sendfile"] = path
+    else:
+        response = send_file(path, etag=etag, conditional=True, last_modified=st.st_mtime)
+
+    response.cache_control.private = True
+    if is_immutable(name, path):
+        response.cache_control.no_cache = None
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    return response
+
+
+def redirect_static_uploads():
+    """Old /static/uploads/<user_id>/<name> links go through the ownership check"""
+    if request.endpoint == "static":
+        parts = (request.view_args or {}).get("filename", "").split("/", 2)
+        if len(parts) == 3 and parts[0] == "uploads":
+            return redirect(url_for("user_image", user_id=parts[1], name=parts[2]), code=301)
+    return None
+
+
+def init_app(app, upload_root):
+    """Register /images/<user_id>/<name> (served from app.config["UPLOAD_FOLDER"]) and close /static/uploads/"""
+    app.config.setdefault("UPLOAD_FOLDER", upload_root)
+    app.add_url_rule("/images/<user_id>/<path:name>", "user_image", serve_image)
+    app.before_request(redirect_static_uploads)
@@ -0,0 +1,301 @@
+import argparse
+import json
+import os
+import queue
+import signal
+import socket
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from model_backends import INPUT_SHAPE
+
+# ==========================================
+# SHARED INFERENCE SERVER
+# ==========================================
+# One process owns the models and serves every web worker over a Unix socket:
+#   python inference_server.py serve --socket /tmp/wardrobe-inference.sock
+#   WARDROBE_INFERENCE_SOCKET=/tmp/wardrobe-inference.sock gunicorn ...
+# Requests arriving within WINDOW_MS of each other are run as one batch, so N
+# concurrent uploads cost one forward pass per model instead of N, and only one
+# TensorFlow thread pool competes for the cores. The batcher stops waiting as
+# soon as every request currently in flight has joined the batch, so a lone
+# upload never sits out the window.
+# If the server can't be reached, recognition_module falls back to running the
+# models in-process (and retries the server after RETRY_SECONDS).
+#
+# Wire format (both directions): 8-byte header (json length, payload length),
+# a JSON header, then a raw array payload. No pickle: nothing received is executed.
+
+DEFAULT_SOCKET = os.environ.get("WARDROBE_INFERENCE_SOCKET") or "/tmp/wardrobe-inference.sock"
+DEFAULT_MAX_BATCH = 64
+DEFAULT_WINDOW_MS = 5.0
+RETRY_SECONDS = 30
+RESULT_TIMEOUT = 60  # a handler gives up on its batch after this long (the client's socket timeout)
+MAX_PAYLOAD = 256 * 1024 * 1024
+_FRAME = struct.Struct(">II")
+_DTYPES = {"uint8": np.uint8, "float32": np.float32}
+
+
+def _recv_exact(sock, size):
+    buf = bytearray(size)
+    view = memoryview(buf)
+    while size:
+        n = sock.recv_into(view, size)
+        if not n:
+            raise ConnectionError("connection closed")
+        view = view[n:]
+        size -= n
+    return buf
+
+
+def send_message(sock, header, payload=b""):
+    data = json.dumps(header).encode()
+    sock.sendall(_FRAME.pack(len(data), len(payload)) + data)
+    if payload:
+        sock.sendall(payload)
+
+
+def recv_message(sock):
+    header_len, payload_len = _FRAME.unpack(_recv_exact(sock, _FRAME.size))
+    if header_len > 1024 * 1024 or payload_len > MAX_PAYLOAD:
+        raise ValueError("message too large")
+    header = json.loads(_recv_exact(sock, header_len))
+    payload = _recv_exact(sock, payload_len) if payload_len else b""
+    return header, payload
+
+
+class InferenceServer:
+    """
+    Accepts classify requests from many connections and runs them through
+    recognition_module.classify_input in dynamic batches on one thread.
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, backend=None, max_batch=DEFAULT_MAX_BATCH,
+                 window_ms=DEFAULT_WINDOW_MS):
+        self.socket_path = socket_path
+        self.backend = backend
+        self.max_batch = max_batch
+        self.window = window_ms / 1000.0
+        self.stats = {'requests': 0, 'items': 0, 'batches': 0, 'errors': 0, 'busy_seconds': 0.0}
+        self._queue = queue.Queue()
+        self._listener = None
+        self._in_flight = 0  # requests received and not yet answered
+        self._in_flight_lock = threading.Lock()
+
+    def submit(self, inputs):
+        """Queue an (N,80,60,3) array; the returned Future resolves to (subtypes, results, probs)"""
+        future = Future()
+        self._queue.put((inputs, future))
+        return future
+
+    def _next_batch(self):
+        """Block for the first request, then gather more until the window closes or the batch is full"""
+        pending = [self._queue.get()]
+        size = len(pending[0][0])
+        deadline = time.monotonic() + self.window
+        while size < self.max_batch and len(pending) < self._in_flight:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(item)
+            size += len(item[0])
+        return pending
+
+    def _run_batches(self):
+        from recognition_module import classify_input
+
+        while True:
+            pending = self._next_batch()
+            start = time.perf_counter()
+            try:
+                batch = np.concatenate([inputs for inputs, _ in pending]) if len(pending) > 1 else pending[0][0]
+                subtypes, results, probs = classify_input(batch, self.backend)
+            except Exception as e:
+                self.stats['errors'] += 1
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            self.stats['busy_seconds'] += time.perf_counter() - start
+            self.stats['batches'] += 1
+            self.stats['items'] += len(batch)
+            offset = 0
+            for inputs, future in pending:
+                n = len(inputs)
+                future.set_result((subtypes[offset:offset + n], results[offset:offset + n],
+                                   probs[offset:offset + n]))
+                offset += n
+
+    def _classify(self, inputs):
+        with self._in_flight_lock:
+            self._in_flight += 1
+        try:
+            return self.submit(inputs).result(timeout=RESULT_TIMEOUT)
+        finally:
+            with self._in_flight_lock:
+                self._in_flight -= 1
+
+    def _handle(self, conn):
+        with conn:
+            while True:
+                try:
+                    header, payload = recv_message(conn)
+                except (ConnectionError, OSError, ValueError):
+                    return
+                if header.get("op") == "stats":
+                    send_message(conn, dict(self.stats, queued=self._queue.qsize(), max_batch=self.max_batch,
+                                            window_ms=self.window * 1000.0))
+                    continue
+                try:
+                    dtype = _DTYPES[header["dtype"]]
+                    inputs = np.frombuffer(payload, dtype=dtype).reshape(header["shape"])
+                    if inputs.shape[1:] != INPUT_SHAPE:
+                        raise ValueError(f"expected shape (N, {', '.join(map(str, INPUT_SHAPE))}), "
+                                         f"got {inputs.shape}")
+                    self.stats['requests'] += 1
+                    subtypes, results, probs = self._classify(inputs)
+                    probs = np.ascontiguousarray(probs, dtype=np.float32)
+                    reply = {'subtypes': subtypes, 'results': results, 'probs_shape': list(probs.shape)}
+                    send_message(conn, reply, probs.tobytes())
+                except (KeyError, ValueError) as e:
+                    send_message(conn, {'error': f"bad request: {e}"})
+                except Exception as e:
+                    send_message(conn, {'error': f"{type(e).__name__}: {e}"})
+
+    def serve_forever(self, warm_up=True):
+        from recognition_module import get_models
+
+        backend = get_models(self.backend)
+        if warm_up:
+            start = time.perf_counter()
+            backend.warm_up()
+            print(f"🔥 {backend.name} models warm in {time.perf_counter() - start:.1f}s")
+        self.backend = backend
+
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)  # only this user's web workers may connect
+        self._listener.listen(128)
+        threading.Thread(target=self._run_batches, name="inference-batcher", daemon=True).start()
+        print(f"✅ Inference server on {self.socket_path} "
+              f"(batches up to {self.max_batch}, window {self.window * 1000:g} ms)")
+        try:
+            while True:
+                conn, _ = self._listener.accept()
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        finally:
+            self._listener.close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+
+# ==========================================
+# CLIENT
+# ==========================================
+
+class InferenceClient:
+    """Talks to an InferenceServer; one connection per calling thread"""
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, timeout=60):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._down_until = 0.0
+
+    def _socket(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _drop(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def _request(self, header, payload=b""):
+        try:
+            sock = self._socket()
+            send_message(sock, header, payload)
+            return recv_message(sock)
+        except (OSError, ConnectionError, ValueError):
+            self._drop()
+            raise
+
+    def classify(self, train_images):
+        """
+        (subtypes, results, probs) for an (N,80,60,3) batch, like classify_input,
+        or None if the server can't be reached (the caller runs the models itself).
+        """
+        if time.monotonic() < self._down_until:
+            return None
+        batch = np.asarray(train_images)
+        if batch.dtype.name not in _DTYPES:
+            batch = batch.astype(np.float32)
+        batch = np.ascontiguousarray(batch)
+        try:
+            header, payload = self._request({'dtype': batch.dtype.name, 'shape': list(batch.shape)},
+                                            batch.tobytes())
+        except (OSError, ConnectionError, ValueError) as e:
+            print(f"⚠️ Warning: inference server {self.socket_path} unavailable ({e}); "
+                  f"classifying in-process for {RETRY_SECONDS}s")
+            self._down_until = time.monotonic() + RETRY_SECONDS
+            return None
+        if "error" in header:
+            raise RuntimeError(f"inference server: {header['error']}")
+        probs = np.frombuffer(payload, dtype=np.float32).reshape(header["probs_shape"])
+        return header["subtypes"], header["results"], probs
+
+    def server_stats(self):
+        header, _ = self._request({'op': 'stats'})
+        return header
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(socket_path=DEFAULT_SOCKET):
+    with _clients_lock:
+        if socket_path not in _clients:
+            _clients[socket_path] = InferenceClient(socket_path)
+        return _clients[socket_path]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared model server for the web workers")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve")
+    serve.add_argument("--socket", default=DEFAULT_SOCKET)
+    serve.add_argument("--backend", default=None, help="model backend (default: WARDROBE_MODEL_BACKEND or keras)")
+    serve.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH)
+    serve.add_argument("--window-ms", type=float, default=DEFAULT_WINDOW_MS,
+                       help="how long the first request of a batch waits for others")
+    stats = sub.add_parser("stats")
+    stats.add_argument("--socket", default=DEFAULT_SOCKET)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        # Exit through serve_forever's cleanup (removes the socket file) on SIGTERM too
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        InferenceServer(args.socket, args.backend, args.max_batch, args.window_ms).serve_forever()
+    else:
+        info = InferenceClient(args.socket).server_stats()
+        batches = info['batches'] or 1
+        print(f"requests {info['requests']}  items {info['items']}  batches {info['batches']}  "
+              f"mean batch {info['items'] / batches:.1f}  busy {info['busy_seconds']:.1f}s  "
+              f"queued {info['queued']}  errors {info['errors']}")
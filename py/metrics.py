@@ -0,0 +1,389 @@
+import bisect
+import os
+import sqlite3
+import threading
+import time
+
+import querylog
+
+
+# ==========================================
+# METRICS (PROMETHEUS TEXT FORMAT)
+# ==========================================
+# Minimal in-process counters and fixed-bucket histograms, so memory stays
+# bounded no matter how many requests are observed. Every label value comes
+# from a small fixed set (endpoint names, span names, statement kinds) and
+# each metric keeps at most MAX_SERIES label combinations.
+# Recording is one list.append (atomic under the GIL, no lock): samples are
+# folded into the buckets/totals under the metric's lock when /metrics is
+# rendered, or once FOLD_AT of them are pending.
+# Set WARDROBE_METRICS=0 to turn all recording into no-ops.
+
+ENABLED = os.environ.get("WARDROBE_METRICS", "1") != "0"
+
+# seconds; spans from sub-millisecond SQLite reads up to slow weather fetches
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAX_SERIES = 200
+OVERFLOW_LABEL = "other"
+FOLD_AT = 512
+
+_registry = []
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._series = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def series(self, *values):
+        """
+        The series for one label combination. Hot paths keep the result and
+        update it directly, which skips the label checks on every call.
+        """
+        series = self._series.get(values)
+        if series is not None:
+            return series
+        if len(values) != len(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {values}")
+        with self._lock:
+            series = self._series.get(values)
+            if series is None:
+                if len(self._series) >= MAX_SERIES:
+                    values = (OVERFLOW_LABEL,) * len(self.labels)
+                    series = self._series.get(values)
+                if series is None:
+                    series = self._series[values] = self._new_series()
+        return series
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = sorted(self._series.items(), key=lambda item: item[0])
+        for values, state in series:
+            lines.extend(self._render_series(values, state))
+        return lines
+
+
+class _Pending:
+    """Samples appended lock-free and folded under the metric's lock"""
+    __slots__ = ("pending", "_lock")
+
+    def _take(self):
+        # Only the samples present now are removed; appends racing with the fold stay pending
+        pending = self.pending
+        n = len(pending)
+        batch = pending[:n]
+        del pending[:n]
+        return batch
+
+
+class _CounterSeries(_Pending):
+    __slots__ = ("_value",)
+
+    def __init__(self, lock):
+        self.pending = []
+        self._value = 0
+        self._lock = lock
+
+    def inc(self, amount=1):
+        if not ENABLED:
+            return
+        pending = self.pending
+        pending.append(amount)
+        if len(pending) >= FOLD_AT:
+            self.fold()
+
+    def fold(self):
+        with self._lock:
+            self._value += sum(self._take())
+
+    @property
+    def value(self):
+        self.fold()
+        return self._value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_series(self):
+        return _CounterSeries(self._lock)
+
+    def inc(self, *values, amount=1):
+        if not ENABLED:
+            return
+        self.series(*values).inc(amount)
+
+    def value(self, *values):
+        series = self._series.get(values)
+        return series.value if series is not None else 0
+
+    def _render_series(self, values, state):
+        return [f"{self.name}{_format_labels(self.labels, values)} {state.value}"]
+
+
+class _HistogramSeries(_Pending):
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets, lock):
+        self.pending = []
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = lock
+
+    def observe(self, seconds):
+        if not ENABLED:
+            return
+        pending = self.pending
+        pending.append(seconds)
+        if len(pending) >= FOLD_AT:
+            self.fold()
+
+    def fold(self):
+        with self._lock:
+            samples = self._take()
+            for seconds in samples:
+                # index of the first bucket the value fits in (len(buckets) = +Inf)
+                self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.total += sum(samples)
+            self.count += len(samples)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def _new_series(self):
+        return _HistogramSeries(self.buckets, self._lock)
+
+    def observe(self, seconds, *values):
+        if not ENABLED:
+            return
+        self.series(*values).observe(seconds)
+
+    def time(self, *values):
+        """Context manager observing the duration of its block"""
+        return _Timer(self.series(*values))
+
+    def _render_series(self, values, state):
+        state.fold()
+        with self._lock:
+            counts, total, count = list(state.counts), state.total, state.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, values, ('le', le))} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {total}")
+        lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {count}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("series", "start")
+
+    def __init__(self, series):
+        self.series = series
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.series.observe(time.perf_counter() - self.start)
+        return False
+
+
+def render():
+    """All registered metrics in Prometheus text exposition format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ==========================================
+# APP METRICS
+# ==========================================
+
+REQUEST_SECONDS = Histogram("wardrobe_http_request_duration_seconds",
+                            "Time spent handling a request", ("endpoint", "method"))
+REQUESTS_TOTAL = Counter("wardrobe_http_requests_total",
+                         "Requests handled", ("endpoint", "method", "status"))
+SPAN_SECONDS = Histogram("wardrobe_span_duration_seconds",
+                         "Time spent in an instrumented section of a request", ("span",))
+DB_SECONDS = Histogram("wardrobe_db_statement_duration_seconds",
+                       "SQLite execute/commit time by statement kind", ("kind",))
+MODEL_CALLS = Counter("wardrobe_model_calls_total",
+                      "Forward passes run by each model", ("model",))
+MODEL_ITEMS = Counter("wardrobe_model_items_total",
+                      "Images classified by each model", ("model",))
+CACHE_TOTAL = Counter("wardrobe_cache_requests_total",
+                      "Cache lookups by cache and result (hit/miss)", ("cache", "result"))
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name):
+    """Time a section of work: `with metrics.span("weather.forecast"): ...`"""
+    if not ENABLED:
+        return _NOOP_SPAN
+    return _Timer(SPAN_SECONDS.series(name))
+
+
+def cache_result(cache, hit):
+    CACHE_TOTAL.inc(cache, "hit" if hit else "miss")
+
+
+# ==========================================
+# SQLITE CONNECTION TIMING
+# ==========================================
+
+_STATEMENT_KINDS = {"select", "insert", "update", "delete", "with", "replace", "create", "pragma"}
+_statement_series = {}
+
+
+def statement_kind(sql):
+    word = sql.split(None, 1)[0].lower() if sql.strip() else ""
+    return word if word in _STATEMENT_KINDS else "other"
+
+
+def _db_series(sql):
+    # the app reuses a few dozen SQL strings, so the kind's series is cached per string
+    series = _statement_series.get(sql)
+    if series is None:
+        series = DB_SECONDS.series(statement_kind(sql))
+        if len(_statement_series) < 1024:
+            _statement_series[sql] = series
+    return series
+
+
+class TimedConnection(sqlite3.Connection):
+    """
+    sqlite3 connection that records execute/executemany/commit durations
+    (and feeds querylog when WARDROBE_QUERY_LOG is set).
+    Use with sqlite3.connect(path, factory=TimedConnection).
+    Note: for SELECTs this covers preparing the statement and stepping to
+    the first row (where SQLite does any sort); fetching later rows is not timed.
+    """
+
+    def execute(self, sql, parameters=()):
+        if not ENABLED and not querylog.ENABLED:
+            return super().execute(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            elapsed = time.perf_counter() - start
+            (_statement_series.get(sql) or _db_series(sql)).observe(elapsed)
+            if querylog.ENABLED:
+                querylog.record(self, sql, parameters, elapsed)
+
+    def executemany(self, sql, seq_of_parameters):
+        if not ENABLED and not querylog.ENABLED:
+            return super().executemany(sql, seq_of_parameters)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            elapsed = time.perf_counter() - start
+            (_statement_series.get(sql) or _db_series(sql)).observe(elapsed)
+            if querylog.ENABLED:
+                querylog.record(self, sql, None, elapsed, many=True)
+
+    def commit(self):
+        if not ENABLED:
+            return super().commit()
+        start = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            _COMMIT_SERIES.observe(time.perf_counter() - start)
+
+
+_COMMIT_SERIES = DB_SECONDS.series("commit")
+
+
+# ==========================================
+# FLASK INTEGRATION
+# ==========================================
+
+_START_KEY = "wardrobe.metrics_start"
+_STATUS_KEY = "wardrobe.metrics_status"
+
+
+def init_app(app):
+    """Time every request (including ones whose view raised) and serve GET /metrics"""
+    from flask import Response, request
+
+    # Hot path: attribute access through the request proxy costs ~1 µs each, so each hook
+    # resolves it once; the series for (endpoint, method, status) are looked up once.
+    request_series = {}  # (endpoint, method, status) -> (duration series, counter series)
+
+    @app.before_request
+    def _start_request_timer():
+        if ENABLED:
+            request._get_current_object().environ[_START_KEY] = time.perf_counter()
+
+    @app.after_request
+    def _note_status(response):
+        if ENABLED:
+            request._get_current_object().environ[_STATUS_KEY] = response.status_code
+        return response
+
+    # teardown runs even when the view raised and after_request was skipped (counted as 500)
+    @app.teardown_request
+    def _record_request(exc):
+        req = request._get_current_object()
+        environ = req.environ
+        start = environ.pop(_START_KEY, None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        key = (req.endpoint or "unmatched", req.method, environ.pop(_STATUS_KEY, 500))
+        series = request_series.get(key)
+        if series is None:
+            endpoint, method, status = key
+            series = (REQUEST_SECONDS.series(endpoint, method), REQUESTS_TOTAL.series(endpoint, method, str(status)))
+            if len(request_series) < MAX_SERIES * 4:
+                request_series[key] = series
+        series[0].observe(elapsed)
+        series[1].inc()
+
+    def metrics_view():
+        return Response(render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
+    app.add_url_rule("/metrics", "metrics", metrics_view)
@@ -0,0 +1,208 @@
+import os
+import threading
+
+import numpy as np
+
+
+# ==========================================
+# MODEL BACKENDS
+# ==========================================
+# recognition_module only needs two calls from the models:
+#   predict_sub(batch)            -> (N, 3) sub-model probabilities
+#   predict_heads(subtype, batch) -> list of 5 (N, width) head outputs
+# Backends implement those calls; models are loaded on first use (or by
+# warm_up()), so importing recognition_module no longer loads TensorFlow.
+# New backends (ONNX, quantized TFLite, ...) plug in with register_backend().
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+MODEL_FILES = {"sub": "model_sub", "top": "model_top", "bottom": "model_bottom", "foot": "model_shoes"}
+INPUT_SHAPE = (80, 60, 3)
+
+# WARDROBE_MODEL_BACKEND=keras-random runs the app offline with untrained models
+DEFAULT_BACKEND = os.environ.get("WARDROBE_MODEL_BACKEND", "keras")
+
+
+class ModelBackend:
+    """
+    Base class for a set of sub + head models.
+    output_widths maps "sub"/"top"/"bottom"/"foot" to the width of each model output.
+    """
+    name = None
+    # True if loaded models can be used after os.fork() (gunicorn preload_app)
+    fork_safe = True
+
+    def __init__(self, output_widths):
+        self.output_widths = output_widths
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    def _load(self):
+        raise NotImplementedError
+
+    def ensure_loaded(self):
+        if not self._loaded:
+            with self._load_lock:
+                if not self._loaded:
+                    self._load()
+                    self._loaded = True
+
+    def preload(self):
+        """
+        Do the fork-safe part of loading, in a parent process before workers fork,
+        so the pages are shared copy-on-write. Returns True if the models were loaded.
+        """
+        if self.fork_safe:
+            self.ensure_loaded()
+        return self._loaded
+
+    def warm_up(self):
+        """Load the models and run one dummy batch through each (first calls are slow)"""
+        self.ensure_loaded()
+        batch = np.zeros((1,) + INPUT_SHAPE, dtype=np.float32)
+        self.predict_sub(batch)
+        for subtype in ("top", "bottom", "foot"):
+            self.predict_heads(subtype, batch)
+
+    def predict_sub(self, batch):
+        raise NotImplementedError
+
+    def predict_heads(self, subtype, batch):
+        raise NotImplementedError
+
+
+class KerasBackend(ModelBackend):
+    """
+    The bundled SavedModels under models/.
+    With random_init=True every model gets fresh random weights: the bundled
+    architecture is cloned when the files exist, otherwise a small CNN with
+    the same input and output shapes is built (for offline benchmarking).
+    """
+    name = "keras"
+    # TensorFlow's runtime thread pools don't survive fork(): preload() only imports
+    # the library unless WARDROBE_PRELOAD_MODELS=1 asks for the weights as well
+    fork_safe = os.environ.get("WARDROBE_PRELOAD_MODELS") == "1"
+
+    def __init__(self, output_widths, models_dir=MODELS_DIR, random_init=False):
+        super().__init__(output_widths)
+        self.models_dir = models_dir
+        self.random_init = random_init
+        if random_init:
+            self.name = "keras-random"
+        self.models = {}
+
+    def preload(self):
+        import tensorflow  # noqa: F401  (the shared library pages are the bulk of the memory)
+        return super().preload()
+
+    def _load(self):
+        import tensorflow as tf
+
+        # Intra-op threads per process (unset = TF default, one per core); gunicorn.conf.py
+        # sets it to cores / workers so several workers don't oversubscribe the CPU
+        threads = int(os.environ.get("WARDROBE_TF_THREADS", "0"))
+        if threads:
+            try:
+                tf.config.threading.set_intra_op_parallelism_threads(threads)
+                tf.config.threading.set_inter_op_parallelism_threads(1)
+            except RuntimeError:
+                pass  # TF already initialized in this process
+        for key, folder in MODEL_FILES.items():
+            path = os.path.join(self.models_dir, folder)
+            if os.path.exists(path):
+                model = tf.keras.models.load_model(path)
+                if self.random_init:
+                    model = tf.keras.models.clone_model(model)
+            elif self.random_init:
+                model = build_standin_model(self.output_widths[key])
+            else:
+                raise FileNotFoundError(f"Model not found: {path} (download the models or use keras-random)")
+            self.models[key] = model
+
+    def predict_sub(self, batch):
+        self.ensure_loaded()
+        return np.asarray(self.models["sub"].predict(batch, verbose=0))
+
+    def predict_heads(self, subtype, batch):
+        self.ensure_loaded()
+        outputs = self.models[subtype].predict(batch, verbose=0)
+        return [np.asarray(o) for o in outputs]
+
+
+def build_standin_model(output_widths):
+    """Small CNN with the classifier's input shape and one softmax output per width"""
+    import tensorflow as tf
+
+    inputs = tf.keras.Input(shape=INPUT_SHAPE)
+    x = tf.keras.layers.Rescaling(1.0 / 255)(inputs)
+    x = tf.keras.layers.Conv2D(32, 3, activation="relu")(x)
+    x = tf.keras.layers.MaxPooling2D()(x)
+    x = tf.keras.layers.Conv2D(64, 3, activation="relu")(x)
+    x = tf.keras.layers.MaxPooling2D()(x)
+    x = tf.keras.layers.Flatten()(x)
+    x = tf.keras.layers.Dense(128, activation="relu")(x)
+    outputs = [tf.keras.layers.Dense(width, activation="softmax")(x) for width in output_widths]
+    return tf.keras.Model(inputs, outputs if len(outputs) > 1 else outputs[0])
+
+
+class NumpyBackend(ModelBackend):
+    """
+    Dependency-free stand-in: one random dense layer + softmax per output.
+    Not a real classifier; lets the app and the benchmarks run without TensorFlow.
+    """
+    name = "numpy-random"
+
+    def __init__(self, output_widths, seed=0):
+        super().__init__(output_widths)
+        self.seed = seed
+        self.weights = {}
+
+    def _load(self):
+        rng = np.random.default_rng(self.seed)
+        features = int(np.prod(INPUT_SHAPE))
+        for key in MODEL_FILES:
+            self.weights[key] = [rng.standard_normal((features, width)).astype(np.float32) * 1e-3
+                                 for width in self.output_widths[key]]
+
+    def _forward(self, key, batch):
+        flat = np.asarray(batch, dtype=np.float32).reshape(len(batch), -1) / 255.0
+        outputs = []
+        for w in self.weights[key]:
+            logits = flat @ w
+            logits -= logits.max(axis=1, keepdims=True)
+            e = np.exp(logits)
+            outputs.append(e / e.sum(axis=1, keepdims=True))
+        return outputs
+
+    def predict_sub(self, batch):
+        self.ensure_loaded()
+        return self._forward("sub", batch)[0]
+
+    def predict_heads(self, subtype, batch):
+        self.ensure_loaded()
+        return self._forward(subtype, batch)
+
+
+BACKENDS = {
+    "keras": lambda widths: KerasBackend(widths),
+    "keras-random": lambda widths: KerasBackend(widths, random_init=True),
+    "numpy-random": lambda widths: NumpyBackend(widths),
+}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def register_backend(name, factory):
+    """Make a backend available by name; factory(output_widths) -> ModelBackend"""
+    BACKENDS[name] = factory
+
+
+def get_backend(output_widths, name=None):
+    """Shared backend instance for name (default: WARDROBE_MODEL_BACKEND or keras)"""
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown model backend {name!r} (available: {', '.join(sorted(BACKENDS))})")
+    with _instances_lock:
+        if name not in _instances:
+            _instances[name] = BACKENDS[name](output_widths)
+        return _instances[name]
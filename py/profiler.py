@@ -0,0 +1,280 @@
+import argparse
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+
+# ==========================================
+# OPT-IN SAMPLING PROFILER
+# ==========================================
+# WARDROBE_PROFILE=0.05 profiles 5% of requests: while a chosen request runs,
+# a background thread snapshots its Python stack every few milliseconds and
+# counts identical stacks per endpoint. Stacks are exported as collapsed
+# stacks (flamegraph.pl, speedscope, inferno) or speedscope JSON through
+# GET /admin/profile or `python profiler.py fetch`.
+# Unset (or 0) means no hooks, no thread and no route are installed at all.
+
+SAMPLE_RATE = float(os.environ.get("WARDROBE_PROFILE", "0") or 0)
+INTERVAL_MS = float(os.environ.get("WARDROBE_PROFILE_INTERVAL_MS", "5"))
+# /admin/profile requires header X-Profile-Token to match; without a token it answers nobody
+# (behind nginx -> gunicorn every request comes from 127.0.0.1, so the address proves nothing)
+ADMIN_TOKEN = os.environ.get("WARDROBE_PROFILE_TOKEN")
+
+MAX_DEPTH = 128
+MAX_STACKS_PER_ENDPOINT = 5000
+TRUNCATED_FRAME = ("[other stacks]", "", 0)
+
+
+class Sampler:
+    """
+    Samples the stacks of registered threads from a background thread.
+    Each sample is stored as a tuple of (function, file, first line) frames,
+    root first, counted per endpoint.
+    """
+
+    def __init__(self, interval_ms=INTERVAL_MS):
+        self.interval = interval_ms / 1000.0
+        self._active = {}    # thread ident -> endpoint being profiled
+        self._stacks = {}    # endpoint -> {stack tuple: sample count}
+        self._requests = {}  # endpoint -> profiled request count
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start_request(self, endpoint):
+        with self._lock:
+            self._active[threading.get_ident()] = endpoint
+            self._requests[endpoint] = self._requests.get(endpoint, 0) + 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="wardrobe-profiler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def end_request(self):
+        with self._lock:
+            self._active.pop(threading.get_ident(), None)
+
+    def _run(self):
+        own = threading.get_ident()
+        while True:
+            self._wake.wait()
+            with self._lock:
+                if not self._active:
+                    self._wake.clear()
+                    continue
+                active = dict(self._active)
+            frames = sys._current_frames()
+            for ident, endpoint in active.items():
+                frame = frames.get(ident)
+                if frame is not None and ident != own:
+                    self._record(endpoint, _stack(frame))
+            del frames
+            time.sleep(self.interval)
+
+    def _record(self, endpoint, stack):
+        with self._lock:
+            counts = self._stacks.setdefault(endpoint, {})
+            if stack not in counts and len(counts) >= MAX_STACKS_PER_ENDPOINT:
+                stack = (TRUNCATED_FRAME,)
+            counts[stack] = counts.get(stack, 0) + 1
+
+    def snapshot(self, endpoint=None):
+        """{endpoint: {stack: count}} copy, optionally for one endpoint only"""
+        with self._lock:
+            return {name: dict(counts) for name, counts in self._stacks.items()
+                    if endpoint is None or name == endpoint}
+
+    def summary(self):
+        with self._lock:
+            return {name: {'requests': self._requests.get(name, 0),
+                           'samples': sum(self._stacks.get(name, {}).values()),
+                           'stacks': len(self._stacks.get(name, {}))}
+                    for name in sorted(self._requests)}
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self._requests.clear()
+
+
+def _stack(frame):
+    frames = []
+    while frame is not None and len(frames) < MAX_DEPTH:
+        code = frame.f_code
+        frames.append((code.co_name, code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    frames.reverse()
+    return tuple(frames)
+
+
+# ==========================================
+# EXPORT FORMATS
+# ==========================================
+
+def _frame_label(frame):
+    name, filename, line = frame
+    if not filename:
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(";", ":")
+
+
+def to_collapsed(stacks):
+    """
+    Collapsed-stack text ("endpoint;frame;frame count" per line) for
+    flamegraph.pl, inferno or speedscope. The endpoint is the root frame.
+    """
+    lines = []
+    for endpoint, counts in sorted(stacks.items()):
+        for stack, count in sorted(counts.items(), key=lambda item: -item[1]):
+            lines.append(";".join([endpoint] + [_frame_label(f) for f in stack]) + f" {count}")
+    return "\n".join(lines) + "\n"
+
+
+def to_speedscope(stacks, interval_ms=INTERVAL_MS):
+    """speedscope JSON with one sampled profile per endpoint (weights in ms)"""
+    frames, index = [], {}
+    profiles = []
+    for endpoint, counts in sorted(stacks.items()):
+        samples, weights = [], []
+        for stack, count in counts.items():
+            ids = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    name, filename, line = frame
+                    frames.append({'name': name, 'file': filename, 'line': line})
+                ids.append(index[frame])
+            samples.append(ids)
+            weights.append(count * interval_ms)
+        profiles.append({'type': 'sampled', 'name': endpoint, 'unit': 'milliseconds',
+                         'startValue': 0, 'endValue': sum(weights),
+                         'samples': samples, 'weights': weights})
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'name': 'wardrobe profile',
+        'exporter': 'wardrobe profiler.py',
+        'shared': {'frames': frames},
+        'profiles': profiles,
+    }
+
+
+# ==========================================
+# FLASK INTEGRATION
+# ==========================================
+
+_sampler = None
+
+
+def get_sampler():
+    return _sampler
+
+
+def init_app(app, sample_rate=None):
+    """
+    Profile a random sample_rate fraction of requests (default WARDROBE_PROFILE)
+    and serve GET /admin/profile + POST /admin/profile/reset.
+    Does nothing when the rate is 0.
+    """
+    global _sampler
+    rate = SAMPLE_RATE if sample_rate is None else sample_rate
+    if rate <= 0:
+        return None
+
+    from flask import Response, abort, jsonify, request
+
+    _sampler = sampler = Sampler()
+
+    @app.before_request
+    def _maybe_profile():
+        if request.endpoint and not request.endpoint.startswith("admin_profile") and random.random() < rate:
+            request.environ["wardrobe.profiled"] = True
+            sampler.start_request(request.endpoint)
+
+    @app.teardown_request
+    def _stop_profile(exc):
+        if request.environ.pop("wardrobe.profiled", False):
+            sampler.end_request()
+
+    def _check_admin():
+        token = request.headers.get("X-Profile-Token", "")
+        if not ADMIN_TOKEN or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+            abort(404)
+
+    def admin_profile():
+        _check_admin()
+        fmt = request.args.get("format", "summary")
+        stacks = sampler.snapshot(request.args.get("endpoint"))
+        if fmt == "collapsed":
+            return Response(to_collapsed(stacks), mimetype="text/plain")
+        if fmt == "speedscope":
+            return jsonify(to_speedscope(stacks, sampler.interval * 1000.0))
+        return jsonify({'sample_rate': rate, 'interval_ms': sampler.interval * 1000.0,
+                        'endpoints': sampler.summary()})
+
+    def admin_profile_reset():
+        _check_admin()
+        sampler.reset()
+        return jsonify({'success': True})
+
+    app.add_url_rule("/admin/profile", "admin_profile", admin_profile)
+    app.add_url_rule("/admin/profile/reset", "admin_profile_reset", admin_profile_reset, methods=["POST"])
+    print(f"🔬 Profiling {rate:.1%} of requests every {INTERVAL_MS:g} ms (GET /admin/profile)")
+    if not ADMIN_TOKEN:
+        print("⚠️ Warning: WARDROBE_PROFILE_TOKEN is not set, /admin/profile will refuse every request")
+    return sampler
+
+
+# ==========================================
+# CLI
+# ==========================================
+
+def _admin_request(method, url, token, **params):
+    import requests
+
+    headers = {"X-Profile-Token": token} if token else {}
+    response = requests.request(method, url, params=params, headers=headers, timeout=30)
+    if response.status_code == 404:
+        raise SystemExit("❌ /admin/profile not found: are WARDROBE_PROFILE and WARDROBE_PROFILE_TOKEN set "
+                         "and the token right?")
+    response.raise_for_status()
+    return response
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch request profiles from a running app "
+                                                 "started with WARDROBE_PROFILE=<fraction>")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("summary", "fetch", "reset"):
+        p = sub.add_parser(name)
+        p.add_argument("--url", default="http://127.0.0.1:5000")
+        p.add_argument("--token", default=ADMIN_TOKEN)
+    sub.choices["fetch"].add_argument("--format", choices=["speedscope", "collapsed"], default="speedscope")
+    sub.choices["fetch"].add_argument("--endpoint", help="only this endpoint (default: one file per endpoint)")
+    sub.choices["fetch"].add_argument("--out", default="profiles")
+    args = parser.parse_args()
+
+    base = args.url.rstrip("/") + "/admin/profile"
+    if args.command == "reset":
+        _admin_request("POST", base + "/reset", args.token)
+        print("✅ Profiles cleared")
+    elif args.command == "summary":
+        info = _admin_request("GET", base, args.token).json()
+        print(f"Sampling {info['sample_rate']:.1%} of requests every {info['interval_ms']:g} ms")
+        for endpoint, row in info["endpoints"].items():
+            print(f"  {endpoint:<28} {row['requests']:>6} requests  {row['samples']:>7} samples  "
+                  f"{row['stacks']:>5} distinct stacks")
+    else:
+        os.makedirs(args.out, exist_ok=True)
+        endpoints = [args.endpoint] if args.endpoint else list(
+            _admin_request("GET", base, args.token).json()["endpoints"])
+        ext = "speedscope.json" if args.format == "speedscope" else "collapsed.txt"
+        for endpoint in endpoints:
+            response = _admin_request("GET", base, args.token, format=args.format, endpoint=endpoint)
+            path = os.path.join(args.out, f"{endpoint}.{ext}")
+            with open(path, "w") as f:
+                f.write(response.text)
+            print(f"✅ {path}")
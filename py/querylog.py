@@ -0,0 +1,278 @@
+import argparse
+import atexit
+import bisect
+import glob
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+
+# ==========================================
+# SLOW-QUERY LOG
+# ==========================================
+# With WARDROBE_QUERY_LOG=<dir>, every statement run through
+# metrics.TimedConnection (i.e. every get_db_connection() in app.py) is
+# aggregated per SQL text: count, total/max time and a latency histogram.
+# Statements slower than WARDROBE_SLOW_QUERY_MS also get their bound-parameter
+# shapes and EXPLAIN QUERY PLAN recorded. Each process writes its own
+# query_log.<pid>.json in <dir>; `python querylog.py report` merges them.
+
+LOG_DIR = os.environ.get("WARDROBE_QUERY_LOG")
+ENABLED = bool(LOG_DIR)
+SLOW_MS = float(os.environ.get("WARDROBE_SLOW_QUERY_MS", "20"))
+
+# milliseconds; the last bucket is everything above 5 s
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+MAX_STATEMENTS = 500
+MAX_SHAPES = 5
+FLUSH_SECONDS = 10
+PLAN_REFRESH_SECONDS = 600
+EXPLAINABLE = ("select", "insert", "update", "delete", "with", "replace")
+
+_whitespace = re.compile(r"\s+")
+
+
+def normalize(sql):
+    return _whitespace.sub(" ", sql).strip()
+
+
+def param_shape(parameters):
+    """Types of the bound parameters, e.g. "(int, str, NoneType)" - never the values"""
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in sorted(parameters.items())) + "}"
+    return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+
+
+def explain(conn, sql, parameters=()):
+    """EXPLAIN QUERY PLAN as indented lines, or None for statements that can't be explained"""
+    if not sql.lstrip().lower().startswith(EXPLAINABLE):
+        return None
+    try:
+        # sqlite3.Connection.execute directly, so TimedConnection doesn't time the EXPLAIN itself
+        rows = sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, parameters).fetchall()
+    except sqlite3.Error as e:
+        return [f"(plan unavailable: {e})"]
+    depth = {0: -1}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append("  " * depth[node] + detail)
+    return lines
+
+
+def is_full_scan(plan):
+    """True if any plan step scans a whole user table (SQLite: "SCAN t" without an index)"""
+    return any(line.strip().startswith("SCAN ") and "USING" not in line
+               and "CONSTANT ROW" not in line and "sqlite_" not in line for line in plan or [])
+
+
+class QueryLog:
+    """Per-statement aggregates for this process"""
+
+    def __init__(self, log_dir=LOG_DIR, slow_ms=SLOW_MS):
+        self.log_dir = log_dir
+        self.slow_ms = slow_ms
+        self.path = os.path.join(log_dir, f"query_log.{os.getpid()}.json") if log_dir else None
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def record(self, conn, sql, parameters, seconds, many=False):
+        ms = seconds * 1000.0
+        key = normalize(sql)
+        with self._lock:
+            entry = self.stats.get(key)
+            if entry is None:
+                if len(self.stats) >= MAX_STATEMENTS:
+                    return
+                entry = self.stats[key] = {
+                    'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'buckets': [0] * (len(BUCKETS_MS) + 1),
+                    'slow': 0, 'shapes': [], 'plan': None, 'plan_at': 0, 'executemany': many,
+                }
+            entry['count'] += 1
+            entry['total_ms'] += ms
+            entry['max_ms'] = max(entry['max_ms'], ms)
+            entry['buckets'][_bucket(ms)] += 1
+            slow = ms >= self.slow_ms
+            if slow:
+                entry['slow'] += 1
+                if not many:
+                    shape = param_shape(parameters)
+                    if shape not in entry['shapes'] and len(entry['shapes']) < MAX_SHAPES:
+                        entry['shapes'].append(shape)
+            need_plan = slow and not many and time.time() - entry['plan_at'] > PLAN_REFRESH_SECONDS
+
+        if slow:
+            print(f"🐢 Slow query {ms:.1f} ms: {key[:200]}")
+        if need_plan:
+            plan = explain(conn, sql, parameters)
+            with self._lock:
+                entry['plan'], entry['plan_at'] = plan, time.time()
+        if self.path and time.monotonic() - self._last_flush > FLUSH_SECONDS:
+            self.flush()
+
+    def flush(self):
+        if not self.path:
+            return
+        with self._lock:
+            self._last_flush = time.monotonic()
+            data = {'pid': os.getpid(), 'slow_ms': self.slow_ms, 'written': time.time(),
+                    'statements': {k: dict(v, shapes=list(v['shapes'])) for k, v in self.stats.items()}}
+        os.makedirs(self.log_dir, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+
+
+def _bucket(ms):
+    return bisect.bisect_left(BUCKETS_MS, ms)
+
+
+def _percentile(buckets, q):
+    """Upper bound (ms) of the bucket holding the q-th quantile"""
+    total = sum(buckets)
+    if not total:
+        return 0.0
+    seen = 0
+    for i, count in enumerate(buckets):
+        seen += count
+        if seen >= q * total:
+            return BUCKETS_MS[i] if i < len(BUCKETS_MS) else float("inf")
+    return float("inf")
+
+
+_log = QueryLog() if ENABLED else None
+if _log is not None:
+    atexit.register(_log.flush)
+
+
+def get_query_log():
+    return _log
+
+
+def record(conn, sql, parameters, seconds, many=False):
+    if _log is not None:
+        _log.record(conn, sql, parameters, seconds, many)
+
+
+# ==========================================
+# REPORTING
+# ==========================================
+
+def load_logs(log_dir):
+    """Merge every query_log.*.json in log_dir into {sql: aggregate}"""
+    merged = {}
+    for path in sorted(glob.glob(os.path.join(log_dir, "query_log.*.json"))):
+        with open(path) as f:
+            data = json.load(f)
+        for sql, entry in data["statements"].items():
+            into = merged.get(sql)
+            if into is None:
+                merged[sql] = dict(entry, shapes=list(entry['shapes']))
+                continue
+            into['count'] += entry['count']
+            into['total_ms'] += entry['total_ms']
+            into['max_ms'] = max(into['max_ms'], entry['max_ms'])
+            into['buckets'] = [a + b for a, b in zip(into['buckets'], entry['buckets'])]
+            into['slow'] += entry['slow']
+            into['shapes'] += [s for s in entry['shapes'] if s not in into['shapes']][:MAX_SHAPES]
+            if entry['plan'] and entry['plan_at'] > into['plan_at']:
+                into['plan'], into['plan_at'] = entry['plan'], entry['plan_at']
+    return merged
+
+
+def report_rows(stats, sort="total"):
+    rows = []
+    for sql, entry in stats.items():
+        rows.append({
+            'sql': sql, 'count': entry['count'], 'total_ms': round(entry['total_ms'], 1),
+            'mean_ms': round(entry['total_ms'] / entry['count'], 2) if entry['count'] else 0.0,
+            'p50_ms': _percentile(entry['buckets'], 0.50), 'p95_ms': _percentile(entry['buckets'], 0.95),
+            'max_ms': round(entry['max_ms'], 1), 'slow': entry['slow'], 'shapes': entry['shapes'],
+            'plan': entry['plan'], 'full_scan': is_full_scan(entry['plan']),
+        })
+    key = {'total': 'total_ms', 'count': 'count', 'max': 'max_ms', 'p95': 'p95_ms', 'slow': 'slow'}[sort]
+    rows.sort(key=lambda r: r[key], reverse=True)
+    return rows
+
+
+def _dummy_params(shape):
+    """Placeholder values matching a recorded "(int, str)" shape, for re-running EXPLAIN"""
+    defaults = {'int': 0, 'float': 0.0, 'str': '', 'bytes': b'', 'NoneType': None}
+    inner = shape[1:-1]
+    if shape.startswith("{"):
+        pairs = (item.split(":") for item in inner.split(",")) if inner else ()
+        return {name.strip(): defaults.get(t.strip()) for name, t in pairs}
+    return tuple(defaults.get(t.strip()) for t in inner.split(",")) if inner else ()
+
+
+def print_report(rows, limit, show_plans=True):
+    print(f"{'count':>8} {'total ms':>10} {'mean':>8} {'p95':>8} {'max':>8} {'slow':>6}  statement")
+    for row in rows[:limit]:
+        flag = "  ⚠️ FULL SCAN" if row['full_scan'] else ""
+        print(f"{row['count']:>8} {row['total_ms']:>10} {row['mean_ms']:>8} {row['p95_ms']:>8} "
+              f"{row['max_ms']:>8} {row['slow']:>6}  {row['sql'][:110]}{flag}")
+        if show_plans and row['plan']:
+            for line in row['plan']:
+                print(f"{'':>54}  │ {line}")
+        if show_plans and row['shapes']:
+            print(f"{'':>54}  │ params: {'; '.join(row['shapes'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Slow-query log report (app run with WARDROBE_QUERY_LOG=<dir>)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rep = sub.add_parser("report", help="merge the per-process logs and print the top statements")
+    rep.add_argument("--dir", default=LOG_DIR or "query_log")
+    rep.add_argument("--sort", choices=["total", "count", "max", "p95", "slow"], default="total")
+    rep.add_argument("--limit", type=int, default=20)
+    rep.add_argument("--no-plans", action="store_true")
+    rep.add_argument("--json", help="also write the merged rows to this file")
+    exp = sub.add_parser("explain", help="re-run EXPLAIN QUERY PLAN for every logged statement against a database")
+    exp.add_argument("--dir", default=LOG_DIR or "query_log")
+    exp.add_argument("--db", default=os.environ.get("WARDROBE_DB", os.path.join(os.path.dirname(__file__), "wardrobe.db")))
+    exp.add_argument("--full-scans", action="store_true", help="only show statements that scan a whole table")
+    sub.add_parser("clear", help="delete the logs").add_argument("--dir", default=LOG_DIR or "query_log")
+    args = parser.parse_args()
+
+    if args.command == "clear":
+        for path in glob.glob(os.path.join(args.dir, "query_log.*.json")):
+            os.remove(path)
+        print(f"✅ Cleared {args.dir}")
+        raise SystemExit(0)
+
+    stats = load_logs(args.dir)
+    if not stats:
+        raise SystemExit(f"❌ No query logs in {args.dir} (start the app with WARDROBE_QUERY_LOG={args.dir})")
+
+    if args.command == "report":
+        rows = report_rows(stats, args.sort)
+        print_report(rows, args.limit, not args.no_plans)
+        scans = sum(1 for r in rows if r['full_scan'])
+        print(f"\n{len(rows)} statements, {sum(r['count'] for r in rows)} executions, "
+              f"{sum(r['slow'] for r in rows)} slow, {scans} with full table scans")
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(rows, f, indent=2)
+    else:
+        conn = sqlite3.connect(args.db)
+        for sql, entry in sorted(stats.items(), key=lambda item: -item[1]['total_ms']):
+            params = _dummy_params(entry['shapes'][0]) if entry['shapes'] else None
+            if params is None:
+                # no slow execution was recorded; bind NULL to every placeholder
+                params = (None,) * sql.count("?")
+            plan = explain(conn, sql, params)
+            if plan is None or (args.full_scans and not is_full_scan(plan)):
+                continue
+            print(f"{'⚠️ ' if is_full_scan(plan) else ''}{sql[:140]}")
+            for line in plan:
+                print(f"    │ {line}")
+        conn.close()
@@ -0,0 +1,255 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+
+# ==========================================
+# BACKGROUND RECLASSIFICATION (MODEL UPGRADES)
+# ==========================================
+# When the models under models/ change, existing clothes rows keep the labels
+# of the old models. This job walks clothes in id order, re-runs the current
+# classifier in batches and writes the new labels back, one transaction per
+# chunk. Progress is committed with every chunk (reclassify_jobs row + the
+# clothes.model_version stamp), so an interrupted run resumes where it stopped.
+# Rows whose image could not be loaded are skipped and counted as failed; once
+# the walk reaches the end, each run gives the rows earlier runs skipped one
+# more try, and the job only counts as finished when no row is left behind.
+# Season/occasion values the user changed through /update_item are kept.
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wardrobe.db")
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+
+DEFAULT_CHUNK_SIZE = 256
+MAX_ROW_ID = 2 ** 63 - 1  # largest SQLite rowid
+
+RECLASSIFY_COLUMNS = [
+    ("model_version", "TEXT"),
+    ("season_edited", "INTEGER DEFAULT 0"),
+    ("occasion_edited", "INTEGER DEFAULT 0"),
+]
+
+RECLASSIFY_TABLES = [
+    '''
+    CREATE TABLE IF NOT EXISTS reclassify_jobs (
+        model_version TEXT PRIMARY KEY,
+        last_id INTEGER DEFAULT 0,
+        processed INTEGER DEFAULT 0,
+        changed INTEGER DEFAULT 0,
+        failed INTEGER DEFAULT 0,
+        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        finished_at TIMESTAMP
+    )
+    ''',
+]
+
+
+def install_reclassify_schema(conn):
+    """Add the clothes columns and the job table if they are missing"""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'clothes'").fetchone() is None:
+        return False
+    existing_columns = {row[1] for row in conn.execute("PRAGMA table_info(clothes)")}
+    missing = [(column, ddl) for column, ddl in RECLASSIFY_COLUMNS if column not in existing_columns]
+    for column, ddl in missing:
+        conn.execute(f"ALTER TABLE clothes ADD COLUMN {column} {ddl}")
+    for ddl in RECLASSIFY_TABLES:
+        conn.execute(ddl)
+    conn.commit()
+    return bool(missing)
+
+
+def model_fingerprint(models_dir=MODELS_DIR):
+    """Short hash of the model files (names, sizes, mtimes) identifying the model version"""
+    digest = hashlib.sha1()
+    for folder, dirs, files in sorted(os.walk(models_dir)):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(folder, name)
+            stat = os.stat(path)
+            digest.update(f"{os.path.relpath(path, models_dir)}:{stat.st_size}:{int(stat.st_mtime)}\n".encode())
+    return digest.hexdigest()[:12]
+
+
+# ==========================================
+# JOB
+# ==========================================
+
+def _load_inputs(rows, store):
+    """Model inputs for a chunk: from the feature store when present, else the (cached) image"""
+    from image_pipeline import load_model_input
+
+    inputs, kept, failed = [], [], []
+    for row in rows:
+        features = store.get(row[0]) if store is not None else None
+        try:
+            inputs.append(features["input"] if features is not None else load_model_input(row[2]))
+            kept.append(row)
+        except (OSError, ValueError) as e:
+            failed.append((row[0], f"{type(e).__name__}: {e}"))
+    return kept, inputs, failed
+
+
+def job_status(conn, version):
+    row = conn.execute("""
+        SELECT last_id, processed, changed, failed, started_at, finished_at
+        FROM reclassify_jobs WHERE model_version = ?
+    """, (version,)).fetchone()
+    remaining = conn.execute(
+        "SELECT COUNT(*) FROM clothes WHERE model_version IS NOT ?", (version,)
+    ).fetchone()[0]
+    if row is None:
+        return {'model_version': version, 'started': False, 'remaining': remaining}
+    keys = ['last_id', 'processed', 'changed', 'failed', 'started_at', 'finished_at']
+    return dict(zip(keys, row), model_version=version, started=True, remaining=remaining)
+
+
+def reclassify(conn, classify_input, version, chunk_size=DEFAULT_CHUNK_SIZE,
+               max_rows_per_sec=None, store=None, limit=None, progress=True):
+    """
+    Reclassify every clothes row not yet labelled by model `version`.
+    max_rows_per_sec throttles the job so it does not starve live traffic.
+    Returns a summary of this run (rows, changed, failed, seconds, rows_per_sec, finished).
+    """
+    from user_stats import refresh_worn_lists
+
+    conn.execute("INSERT OR IGNORE INTO reclassify_jobs (model_version) VALUES (?)", (version,))
+    conn.commit()
+    last_id = conn.execute(
+        "SELECT last_id FROM reclassify_jobs WHERE model_version = ?", (version,)
+    ).fetchone()[0]
+
+    # Unlabelled rows at or below resume_id are ones earlier runs failed on
+    resume_id = last_id
+    retry_id = None  # cursor of the retry pass, once the forward walk is done
+
+    start = time.perf_counter()
+    processed = changed = failed = 0
+    while limit is None or processed < limit:
+        retrying = retry_id is not None
+        after, upto = (retry_id, resume_id) if retrying else (last_id, MAX_ROW_ID)
+        rows = conn.execute("""
+            SELECT id, user_id, file_path, subtype, color, season, occasion, season_edited, occasion_edited
+            FROM clothes
+            WHERE id > ? AND id <= ? AND model_version IS NOT ?
+            ORDER BY id
+            LIMIT ?
+        """, (after, upto, version, chunk_size)).fetchall()
+        if not rows:
+            if retrying or resume_id == 0:
+                break
+            retry_id = 0
+            continue
+
+        kept, inputs, errors = _load_inputs(rows, store)
+        for item_id, error in errors:
+            print(f"❌ item {item_id}: {error}")
+        updates = []
+        chunk_changed = 0
+        if kept:
+            subtypes, results, probs = classify_input(np.stack(inputs))
+            for row, subtype, labels in zip(kept, subtypes, results):
+                season = row[5] if row[7] else labels[3].lower()
+                occasion = row[6] if row[8] else labels[4].lower()
+                if (subtype, labels[2], season, occasion) != tuple(row[3:7]):
+                    chunk_changed += 1
+                updates.append((subtype, labels[2], season, occasion, version, row[0]))
+
+        if retrying:
+            # Failures here were counted when they were first skipped; recovered rows leave the count
+            retry_id = rows[-1][0]
+            failed_delta = -len(kept)
+        else:
+            last_id = rows[-1][0]
+            failed_delta = len(errors)
+        with conn:
+            conn.executemany("""
+                UPDATE clothes
+                SET subtype = ?, color = ?, season = ?, occasion = ?, model_version = ?
+                WHERE id = ?
+            """, updates)
+            for user_id in {row[1] for row in kept}:
+                refresh_worn_lists(conn, user_id)
+            conn.execute("""
+                UPDATE reclassify_jobs
+                SET last_id = ?, processed = processed + ?, changed = changed + ?, failed = MAX(0, failed + ?)
+                WHERE model_version = ?
+            """, (last_id, len(updates), chunk_changed, failed_delta, version))
+        processed += len(updates)
+        changed += chunk_changed
+        failed += len(errors)
+
+        if store is not None and kept:
+            for row, item_probs in zip(kept, probs):
+                store.set_probs(row[0], item_probs)
+
+        elapsed = time.perf_counter() - start
+        if progress:
+            print(f"   id {last_id}: {processed} rows ({processed / elapsed:.0f} rows/sec), {changed} changed")
+        if max_rows_per_sec:
+            ahead = processed / max_rows_per_sec - elapsed
+            if ahead > 0:
+                time.sleep(ahead)
+
+    with conn:
+        remaining = conn.execute(
+            "SELECT 1 FROM clothes WHERE model_version IS NOT ? LIMIT 1", (version,)
+        ).fetchone()
+        if remaining is None:
+            conn.execute("UPDATE reclassify_jobs SET finished_at = CURRENT_TIMESTAMP WHERE model_version = ?",
+                         (version,))
+    if store is not None:
+        store.flush()
+
+    elapsed = time.perf_counter() - start
+    return {
+        'rows': processed,
+        'changed': changed,
+        'failed': failed,
+        'seconds': round(elapsed, 2),
+        'rows_per_sec': round(processed / elapsed, 1) if elapsed and processed else 0.0,
+        'finished': remaining is None,
+    }
+
+
+# ==========================================
+# MAIN EXECUTION
+# ==========================================
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Re-run the current models over every wardrobe item")
+    parser.add_argument("command", choices=["run", "status"])
+    parser.add_argument("--db", default=DB_PATH, help="path to wardrobe.db")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows per batch / transaction")
+    parser.add_argument("--rate", type=float, default=200, help="max rows/sec (0 = unthrottled)")
+    parser.add_argument("--nice", type=int, default=10, help="lower the process priority by this much")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db, timeout=30)
+    install_reclassify_schema(conn)
+    version = model_fingerprint()
+
+    if args.command == "status":
+        status = job_status(conn, version)
+        print(f"🔖 model version {version}: {status['remaining']} rows to reclassify")
+        if status['started']:
+            print(f"   {status['processed']} done, {status['changed']} changed, {status['failed']} failed "
+                  f"(started {status['started_at']}, finished {status['finished_at'] or '-'})")
+    else:
+        if args.nice and hasattr(os, "nice"):
+            os.nice(args.nice)
+        from recognition_module import classify_input
+        from feature_store import FeatureStore, FEATURE_STORE_DIR
+
+        try:
+            store = FeatureStore(FEATURE_STORE_DIR, readonly=False)
+        except (FileNotFoundError, ValueError):
+            store = None
+        print(f"🔄 Reclassifying with model version {version}")
+        summary = reclassify(conn, classify_input, version, args.chunk_size, args.rate or None, store)
+        print(f"✅ {summary['rows']} rows in {summary['seconds']}s ({summary['rows_per_sec']} rows/sec), "
+              f"{summary['failed']} failed" + ("" if summary['finished'] else " - run again to continue"))
+    conn.close()
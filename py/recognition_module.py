@@ -1,41 +1,28 @@
-#for modeling
-from tensorflow.keras.preprocessing import image
-from tensorflow.keras.preprocessing.image import ImageDataGenerator 
-from tensorflow.keras.preprocessing import image
 import random
 
-#for read and show images
-import matplotlib.pyplot as plt
-import cv2                                                          
-import matplotlib.image as mpimg
-
-#for save and load models
-import tensorflow as tf
-from tensorflow import keras                                        
-
 import numpy as np
 
 #for color classification
-import colorsys                                                     
 import PIL.Image as Image
-
-from scipy.spatial import KDTree
-from webcolors import (
-   CSS3_HEX_TO_NAMES,
-    hex_to_rgb
-)
+from color_module import convert_rgb_to_names, get_dominant_color, get_cloth_color, color_classification
 
 # Import os for dynamic path handling
 import os
 
+# decode + resize to the model input (uses the cached derivative when present)
+from image_pipeline import load_model_input
+
+# pre-trained models (loaded lazily by the selected backend, keras by default)
+from model_backends import get_backend
+
+# timings for /metrics
+import metrics
+
 # Get the base directory of the project (parent of 'py' folder)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-# load pre-trained models using relative paths
-sub_model = tf.keras.models.load_model(os.path.join(BASE_DIR, 'models', 'model_sub'))
-top_model = tf.keras.models.load_model(os.path.join(BASE_DIR, 'models', 'model_top'))
-bottom_model = tf.keras.models.load_model(os.path.join(BASE_DIR, 'models', 'model_bottom'))
-foot_model = tf.keras.models.load_model(os.path.join(BASE_DIR, 'models', 'model_shoes'))
+# Shared inference server (see inference_server.py); unset = run the models in this process
+INFERENCE_SOCKET = os.environ.get("WARDROBE_INFERENCE_SOCKET")
 
 # all output possibilities of the model for subsequent matching
 sub_list = ["bottom","foot","top"]
@@ -68,56 +55,28 @@ foot_list = [['Casual Shoes', 'Flats', 'Flip Flops', 'Formal Shoes', 'Heels',
             ['Fall', 'Spring', 'Summer', 'Winter'],
             ['Casual', 'Ethnic', 'Formal', 'Party', 'Smart Casual', 'Sports']]
 
-def convert_rgb_to_names(rgb_tuple):
-    """
-    This function translates rgb to their respective names in css3
-    is a helper function for the two below.
-    Input is a rgb tuple
-    Output is their corresponding name in css3
-    """
-    # a dictionary of all the hex and their respective names in css3
-    css3_db = CSS3_HEX_TO_NAMES
-    names = []
-    rgb_values = []
-    for color_hex, color_name in css3_db.items():
-        names.append(color_name)
-        rgb_values.append(hex_to_rgb(color_hex))
-    
-    kdt_db = KDTree(rgb_values)
-    distance, index = kdt_db.query(rgb_tuple)
-    return names[index]
+# label lists of the head model for each subtype predicted by sub_model
+head_labels = {"top": top_list,
+               "bottom": bottom_list,
+               "foot": foot_list}
 
-def get_cloth_color(image):
-    """
-    This function is a helper function of the one below to recognize color of an image
-    Input is an image
-    Output is a color in English
-    """
-    max_score = 0.0001
-    dominant_color = None
-    for count,(r,g,b) in image.getcolors(image.size[0]*image.size[1]):
-       
-        saturation = colorsys.rgb_to_hsv(r/255.0, g/255.0, b/255.0)[1]
-        y = min(abs(r*2104+g*4130+b*802+4096+131072)>>13,235)
-        y = (y-16.0)/(235-16)
-        if y > 0.9:
-            continue
-        score = (saturation+0.1)*count
-        if score > max_score:
-            max_score = score
-            dominant_color = (r,g,b)
-            
-    return convert_rgb_to_names(dominant_color)
- 
-def color_classification(single_path):
+# output widths of every model, used to build stand-in models of the same shape
+OUTPUT_WIDTHS = {"sub": [len(sub_list)],
+                 **{subtype: [len(labels) for labels in lelist] for subtype, lelist in head_labels.items()}}
+
+# layout of the flattened probability vector (used by the feature store):
+# sub_model outputs, then the five head outputs (type, gender, color, season, occasion),
+# each padded to the widest label list among the three head models
+HEAD_WIDTHS = [max(len(top_list[k]), len(bottom_list[k]), len(foot_list[k])) for k in range(5)]
+PROB_WIDTH = len(sub_list) + sum(HEAD_WIDTHS)
+
+def get_models(name=None):
     """
-    This function does color classification for a certain path of a photo (of a clothes)
-    Input is a path on your computer
-    Output is a color
+    This function returns the model backend (models load on first prediction or warm_up())
+    Input is a backend name, or None for the default (WARDROBE_MODEL_BACKEND, else keras)
+    Output is a model_backends.ModelBackend
     """
-    image = Image.open(single_path)
-    image = image.convert('RGB')
-    return get_cloth_color(image)
+    return get_backend(OUTPUT_WIDTHS, name)
     
 ####################################
 def single_helper(train_images, my_model, lelist):
@@ -142,43 +101,135 @@ def single_helper(train_images, my_model, lelist):
     result.append(lelist[4][type_predicted_label])
     return result
 
-def single_classification(single_path):
+def classify_input(train_images, backend=None):
     """
-    This function take a single path of a photo, then do reshape to fit the models, and do classification
+    This function runs the models on a batch of already decoded images
+    Input is an (N,80,60,3) array of model inputs (and optionally the backend to use)
+    Output is a tuple which contains subtypes(one per image),
+                                     results(a list of the 5 predicted labels per image),
+                                     probs(an (N, PROB_WIDTH) float32 array of every model output)
+    """
+    backend = backend or get_models()
+    batch = np.asarray(train_images, dtype=np.float32)
+    probs = np.zeros((len(batch), PROB_WIDTH), dtype=np.float32)
+    
+    with metrics.span("model.sub_forward"):
+        sub_probs = backend.predict_sub(batch)
+    metrics.MODEL_CALLS.inc("sub")
+    metrics.MODEL_ITEMS.inc("sub", amount=len(batch))
+    probs[:, :len(sub_list)] = sub_probs
+    sub_index = np.argmax(sub_probs, axis=1)
+    subtypes = [sub_list[i] for i in sub_index]
+    results = [None] * len(batch)
+    
+    # According to the results of the first model, branch each group to its head model
+    for k, subtype in enumerate(sub_list):
+        rows = np.flatnonzero(sub_index == k)
+        if len(rows) == 0:
+            continue
+        lelist = head_labels[subtype]
+        with metrics.span("model.head_forward"):
+            predictions = backend.predict_heads(subtype, batch[rows])
+        metrics.MODEL_CALLS.inc(subtype)
+        metrics.MODEL_ITEMS.inc(subtype, amount=len(rows))
+        labels = [[] for _ in rows]
+        offset = len(sub_list)
+        for h, prediction in enumerate(predictions):
+            probs[rows, offset:offset + prediction.shape[1]] = prediction
+            for j, label_index in enumerate(np.argmax(prediction, axis=1)):
+                labels[j].append(lelist[h][label_index])
+            offset += HEAD_WIDTHS[h]
+        for j, row in enumerate(rows):
+            results[row] = labels[j]
+    
+    return (subtypes, results, probs)
+
+def classify_batch(train_images):
+    """
+    This function runs classify_input through the inference server when
+    WARDROBE_INFERENCE_SOCKET is set, and in this process otherwise (or when the server is down)
+    Input and output are the same as classify_input
+    """
+    if INFERENCE_SOCKET:
+        from inference_server import get_client
+        remote = get_client(INFERENCE_SOCKET).classify(train_images)
+        if remote is not None:
+            return remote
+    return classify_input(train_images)
+
+def classify_with_features(single_path):
+    """
+    This function does the same as single_classification but also returns the features it computed
     Input is a path of a certain photo
-    Output is a tuple which contains subtype(for being send to a correct sub-model), 
-                                     info(a string having all info of a clothes), 
-                                     res(a list having all info of a clothes)
+    Output is a tuple (subtype, info, res, features) where features is a dict with
+                                     input(the 80x60x3 uint8 model input),
+                                     probs(the flattened model outputs),
+                                     color_rgb(the dominant rgb color)
     """
     
     # Our model only applies to dataframes. 
     # Therefore, in order to enable the model to predict a single picture, 
     # we turn this picture into a dataframe with only one row.
-    train_images = np.zeros((1,80,60,3))
-  
-    path = single_path#/content/images   
-    img = cv2.imread(path)
+    with metrics.span("classify.load_input"):
+        model_input = load_model_input(single_path)
+    subtypes, results, probs = classify_batch(model_input[np.newaxis])
     
-    #reshape img to apply the model
-    if img.shape != (80,60,3):
-        img = image.load_img(path, target_size=(80,60,3))
-
-    train_images[0] = img
-    
-    result2 = sub_list[np.argmax(sub_model.predict(train_images))]
-    
-    # According to the results of the first model, branch to three other models
-    if result2=="top":
-        res = single_helper(train_images,top_model,top_list)
-    elif result2=="bottom":
-        res = single_helper(train_images,bottom_model,bottom_list)
-    elif result2=="foot":
-        res = single_helper(train_images,foot_model,foot_list)
+    result2 = subtypes[0]
+    res = results[0]
     res.append(single_path)
-    res_str = f"{res[0]}, {res[1]}, {color_classification(single_path)}, {res[3]}, {res[4]}, {single_path}" 
     
+    with metrics.span("classify.color"):
+        dominant_color = get_dominant_color(Image.open(single_path).convert('RGB'))
+    res_str = f"{res[0]}, {res[1]}, {convert_rgb_to_names(dominant_color)}, {res[3]}, {res[4]}, {single_path}" 
+    
+    features = {"input": model_input, "probs": probs[0], "color_rgb": dominant_color}
+    return (result2,res_str,res,features)
+
+def single_classification(single_path):
+    """
+    This function take a single path of a photo, then do reshape to fit the models, and do classification
+    Input is a path of a certain photo
+    Output is a tuple which contains subtype(for being send to a correct sub-model), 
+                                     info(a string having all info of a clothes), 
+                                     res(a list having all info of a clothes)
+    """
+    result2,res_str,res,_ = classify_with_features(single_path)
     return (result2,res_str,res)
 
+def classify_paths(paths, batch_size=16, with_features=False):
+    """
+    This function does single_classification for many photos, running the models once per batch
+    Input is a list of photo paths, how many photos go through the models together
+    and whether to also return the features (as classify_with_features does)
+    Output is a generator of one (path, outcome) per photo, where outcome is the
+    single_classification tuple (subtype, info, res), (subtype, info, res, features) with_features,
+    or the exception if that photo failed
+    """
+    for start in range(0, len(paths), batch_size):
+        chunk = paths[start:start + batch_size]
+        loaded = []
+        for path in chunk:
+            try:
+                loaded.append((path, load_model_input(path)))
+            except Exception as e:
+                yield path, e
+        if not loaded:
+            continue
+        subtypes, results, probs = classify_batch(np.stack([model_input for _, model_input in loaded]))
+        for i, ((path, model_input), subtype, res) in enumerate(zip(loaded, subtypes, results)):
+            try:
+                dominant_color = get_dominant_color(Image.open(path).convert('RGB'))
+            except Exception as e:
+                yield path, e
+                continue
+            res = list(res) + [path]
+            res_str = f"{res[0]}, {res[1]}, {convert_rgb_to_names(dominant_color)}, {res[3]}, {res[4]}, {path}"
+            if with_features:
+                features = {"input": model_input, "probs": probs[i], "color_rgb": dominant_color}
+                yield path, (subtype, res_str, res, features)
+            else:
+                yield path, (subtype, res_str, res)
+
 def find_combo_by_top(top_color_group, combotype):
     """
     This function recommend color base on a seed color by a given angle in a colorwheel.
@@ -0,0 +1,154 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import metrics
+
+
+# ==========================================
+# RECOMMENDATION RESPONSE CACHE
+# ==========================================
+# /generate_outfit and /api/auto-recommend give the same answer until the
+# user's wardrobe changes. Answers are cached under
+#   (endpoint, user, wardrobe_version, season, occasion / weather bucket)
+# where wardrobe_version (user_stats) is bumped by triggers on every clothes
+# insert, delete and wear/label update. A change makes a new key, so nothing
+# is ever invalidated explicitly and stale entries just age out.
+# Backends:
+#   memory  bounded in-process LRU (WARDROBE_CACHE_SIZE entries), per worker
+#   redis   any Redis-protocol server shared by all workers
+#           (WARDROBE_CACHE_URL=redis://..., needs `pip install redis`);
+#           size is bounded by TTL and the server's maxmemory policy
+# WARDROBE_CACHE_TTL (seconds, default 300) caps how long an answer is reused,
+# e.g. until a freshly generated thumbnail replaces the original in the URLs.
+# WARDROBE_CACHE=off disables caching.
+
+BACKEND = os.environ.get("WARDROBE_CACHE", "memory").lower()
+MAX_ENTRIES = int(os.environ.get("WARDROBE_CACHE_SIZE", "4096"))
+TTL_SECONDS = float(os.environ.get("WARDROBE_CACHE_TTL", "300"))
+REDIS_URL = os.environ.get("WARDROBE_CACHE_URL", "redis://localhost:6379/0")
+KEY_PREFIX = "wardrobe:resp:"
+
+
+class LRUBackend:
+    """Thread-safe LRU of (expires_at, value), at most max_entries"""
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Values as JSON under KEY_PREFIX + key; client is a redis.Redis (or anything with get/set(ex=))"""
+
+    def __init__(self, client=None, url=REDIS_URL):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+
+    def get(self, key):
+        raw = self.client.get(KEY_PREFIX + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(KEY_PREFIX + key, json.dumps(value, separators=(",", ":")), ex=max(1, int(ttl)))
+
+    def clear(self):
+        for key in self.client.scan_iter(KEY_PREFIX + "*"):
+            self.client.delete(key)
+
+
+class ResponseCache:
+    """get_or_compute() over a backend, with hit/miss counts (also exported to /metrics)"""
+
+    def __init__(self, backend, ttl=TTL_SECONDS):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @staticmethod
+    def make_key(*parts):
+        return ":".join(str(p) for p in parts)
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value for key, or compute(), store it and return it.
+        The value must be JSON-serializable and is shared: don't mutate it.
+        A backend failure only costs a miss.
+        """
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ Response cache get failed: {type(e).__name__}: {e}")
+            value = None
+        if value is not None:
+            self.hits += 1
+            metrics.cache_result("response", True)
+            return value
+
+        self.misses += 1
+        metrics.cache_result("response", False)
+        value = compute()
+        try:
+            self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ Response cache set failed: {type(e).__name__}: {e}")
+        return value
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'errors': self.errors,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0}
+
+
+class _NoCache:
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def clear(self):
+        pass
+
+
+def make_cache(backend=BACKEND):
+    """The ResponseCache configured by WARDROBE_CACHE (memory | redis | off)"""
+    if backend == "redis":
+        return ResponseCache(RedisBackend())
+    if backend in ("off", "none", "0"):
+        return ResponseCache(_NoCache())
+    return ResponseCache(LRUBackend())
@@ -0,0 +1,71 @@
+import threading
+
+
+# ==========================================
+# SINGLE-FLIGHT
+# ==========================================
+# Collapses concurrent calls for the same key into one: the first caller
+# (the leader) runs the function, callers that arrive while it is running
+# wait and get the same result, or the same exception. Nothing is kept
+# after the call returns, so this is not a cache: put one in front of it.
+# Works across the threads of one process (gunicorn gthread workers, the
+# dev server); separate worker processes each have their own.
+
+
+class _Call:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """do(key, fn) runs fn once per key at a time; counts leaders and shared results"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key, fn, timeout=None):
+        """
+        Return fn(), or the result of the fn already running for key.
+        Waiters give up after timeout seconds (TimeoutError); the leader never does.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise TimeoutError(f"single-flight call for {key!r} still running after {timeout}s")
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        return {'executed': self.executed, 'shared': self.shared}
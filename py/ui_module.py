@@ -1,161 +1,293 @@
 #for GUI
+import sqlite3
+
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtCore import QFileInfo                                  
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
 from PyQt5.QtWidgets import QFileDialog,QLabel
 from PyQt5.QtGui import *
 #from PyQt5.QtGui import QLabel
 
+# (importing this no longer loads the models; they load on first use or in WarmUpWorker)
 from recognition_module import*
+from desktop_wardrobe import WardrobeIndex
+from desktop_store import DesktopStore
+
+
+class WorkerSignals(QObject):
+    """
+    Signals a worker emits from its pool thread; Qt delivers them on the GUI thread.
+    """
+    result = pyqtSignal(str, str, list)     # subtype, info, res
+    error = pyqtSignal(str, str)            # path, message
+    progress = pyqtSignal(int, int)         # done, total
+    finished = pyqtSignal()
+
+
+class ClassifyWorker(QRunnable):
+    """
+    Classify photos off the GUI thread, batch_size photos per model call.
+    """
+    def __init__(self, paths, batch_size=16):
+        super().__init__()
+        self.paths = list(paths)
+        self.batch_size = batch_size
+        self.signals = WorkerSignals()
+
+    def run(self):
+        done = 0
+        try:
+            for path, outcome in classify_paths(self.paths, self.batch_size):
+                if isinstance(outcome, Exception):
+                    self.signals.error.emit(path, str(outcome))
+                else:
+                    sub, info, res = outcome
+                    self.signals.result.emit(sub, info, res)
+                done += 1
+                self.signals.progress.emit(done, len(self.paths))
+        except Exception as e:
+            # e.g. the models failed to load: report it for every photo not yet done
+            for path in self.paths[done:]:
+                self.signals.error.emit(path, str(e))
+        finally:
+            self.signals.finished.emit()
+
+
+class WarmUpWorker(QRunnable):
+    """
+    Load the models and run one dummy batch, after the window is already on screen.
+    """
+    def __init__(self):
+        super().__init__()
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            get_models().warm_up()
+        except Exception as e:
+            self.signals.error.emit("", str(e))
+        finally:
+            self.signals.finished.emit()
 
 
 class Ui_MainWindow(object):
     """
     This class to to generate a GUI (graphical user interface)
     """
-    def __init__(self):
+    PREVIEW_SIZE = (281, 300)
+    
+    def __init__(self, store=None):
+        """
+        initil the wardrobe index in order to add clothes later.
+        store is a DesktopStore to persist the wardrobe in (None keeps it in memory only).
+        """
+        self.wardrobe = WardrobeIndex()
+        self.rows = {}      # wardrobe item id -> its QListWidgetItem
+        self.store = store
+        self.pool = QThreadPool.globalInstance()
+        self.workers = []   # keep running workers (and their signals) alive
+        
+    def load_wardrobe(self):
+        """
+        Show the saved wardrobe (one bulk read) and re-classify only the photos that changed.
+        Returns the number of photos queued for classification.
         """
-        initil them three in order to add clothes later.
+        if self.store is None:
+            return 0
+        fresh, stale, missing = self.store.load()
+        lists = (self.TOP_LIST, self.BOTTOM_LIST, self.SHOE_LIST)
+        for list_widget in lists:
+            list_widget.setUpdatesEnabled(False)
+        for item_id, sub, label, res in fresh:
+            self._add_row(self.wardrobe.add(sub, label, res, item_id=item_id))
+        for list_widget in lists:
+            list_widget.setUpdatesEnabled(True)
+        if missing:
+            print(f"⚠️ {len(missing)} saved photo(s) not found on disk")
+        if stale:
+            self.classify([path for _, path in stale])
+        else:
+            self.statusbar.showMessage(f"Loaded {len(fresh)} item(s)", 3000)
+        return len(stale)
+        
+    def start_warm_up(self):
         """
-        self.top = []
-        self.bottom = []
-        self.shoes = []
+        Called once the window is shown: load the models in the background so the first ADD is fast.
+        """
+        worker = WarmUpWorker()
+        worker.signals.error.connect(lambda _, message: self.statusbar.showMessage(f"Model loading failed: {message}"))
+        worker.signals.finished.connect(lambda: self._worker_done(worker, "Models ready"))
+        self.statusbar.showMessage("Loading models...")
+        self._start(worker)
+        
+    def _start(self, worker):
+        self.workers.append(worker)
+        self.pool.start(worker)
         
+    def _worker_done(self, worker, message=None):
+        if worker in self.workers:
+            self.workers.remove(worker)
+        if message and not any(isinstance(w, ClassifyWorker) for w in self.workers):
+            self.statusbar.showMessage(message, 3000)
         
     def ALL_PREDICT(self):
         """
-        User click ADD botton to call this function, after getting a path of a photo, this function do prediction by the models and show the result in the GUI.
+        User click ADD botton to call this function, after picking one or more photos, a ClassifyWorker does prediction by the models in the background and show_result adds each result to the GUI.
         """
-        _translate = QtCore.QCoreApplication.translate
-        directory1 = QFileDialog.getOpenFileName(None, "Select file", "H:/")
-
-        sub, info, res_place_holder = single_classification(directory1[0])
+        paths, _ = QFileDialog.getOpenFileNames(None, "Select files", "H:/", "Images (*.png *.jpg *.jpeg *.bmp *.webp);;All files (*)")
+        if not paths:
+            return
+        self.classify(paths)
+        
+    def classify(self, paths):
+        """
+        Start classifying paths in the background; the window stays responsive meanwhile.
+        """
+        worker = ClassifyWorker(paths)
+        worker.signals.result.connect(self.show_result)
+        worker.signals.error.connect(self.show_error)
+        worker.signals.progress.connect(self.show_progress)
+        worker.signals.finished.connect(lambda: self._worker_done(worker, f"Added {len(paths)} photo(s)"))
+        self.progress.setRange(0, len(paths))
+        self.progress.setValue(0)
+        self.progress.show()
+        self._start(worker)
+        return worker
+        
+    def show_progress(self, done, total):
+        self.progress.setValue(done)
+        self.statusbar.showMessage(f"Classifying {done}/{total}...")
+        if done >= total:
+            self.progress.hide()
+        
+    def show_error(self, path, message):
+        print(f"⚠️ Could not classify {path}: {message}")
+        
+    def show_result(self, sub, info, res_place_holder):
+        """
+        Add one classified photo to the wardrobe and to the matching list (runs on the GUI thread).
+        """
+        list_widget = self._list_for(sub)
+        if list_widget is None:
+            return
+        old_id = self.wardrobe.by_path.get(res_place_holder[-1])
+        if old_id is not None:
+            # the same photo added again: replace its old row
+            self._take_rows(old_id)
+        item_id = None
+        if self.store is not None:
+            try:
+                item_id = self.store.save(sub, info, res_place_holder)
+            except (OSError, sqlite3.Error) as e:
+                print(f"⚠️ Could not save {res_place_holder[-1]}: {e}")
+        self._add_row(self.wardrobe.add(sub, info, res_place_holder, item_id=item_id))
+        
+    def _add_row(self, record):
+        item = QtWidgets.QListWidgetItem(record.info)
+        item.setData(QtCore.Qt.UserRole, record.id)
+        self._list_for(record.subtype).addItem(item)
+        self.rows[record.id] = item
+        
+    def _list_for(self, sub):
+        return {"top": self.TOP_LIST, "bottom": self.BOTTOM_LIST, "foot": self.SHOE_LIST}.get(sub)
+        
+    def _take_rows(self, item_id):
+        item = self.rows.pop(item_id, None)
+        if item is not None and item.listWidget() is not None:
+            item.listWidget().takeItem(item.listWidget().row(item))
+        
+    def _edit_selected(self, list_widget, button, prompt):
+        """
+        Let the user edit the text of the selected row; the wardrobe record keeps its id.
+        """
+        selected_items = list_widget.selectedItems()
+        if not selected_items:
+            return
+        text, okPressed = QtWidgets.QInputDialog.getText(button, "EDIT", prompt, QtWidgets.QLineEdit.Normal, selected_items[0].text())
+        if okPressed and text != '':
+            selected_items[0].setText(text)
+            record = self.wardrobe.get(selected_items[0].data(QtCore.Qt.UserRole))
+            if record is not None:
+                record.info = text
+                if self.store is not None:
+                    self.store.update_label(record.id, text)
+        
+    def _delete_selected(self, list_widget):
+        """
+        Delete the selected rows and their wardrobe records (O(1) each, by id).
+        """
+        for item in list_widget.selectedItems():
+            item_id = item.data(QtCore.Qt.UserRole)
+            list_widget.takeItem(list_widget.row(item))
+            self.rows.pop(item_id, None)
+            record = self.wardrobe.remove(item_id)
+            if record is not None:
+                QtGui.QPixmapCache.remove(self._pixmap_key(record.path))
+                if self.store is not None:
+                    self.store.delete(record.id)
         
-        # if the result is top, then add an item to the "top" list on GUI.
-        if sub == "top":
-            item = QtWidgets.QListWidgetItem(info)
-            self.TOP_LIST.addItem(item)
-            self.top.append(res_place_holder)
-        # if the result is bottom, then add an item to the "bottom" list on GUI.
-        elif sub == "bottom":
-            item = QtWidgets.QListWidgetItem(info)
-            self.BOTTOM_LIST.addItem(item)
-            self.bottom.append(res_place_holder)
-        # if the result is shoes, then add an item to the "shoes" list on GUI.
-        elif sub == "foot":
-            item = QtWidgets.QListWidgetItem(info)
-            self.SHOE_LIST.addItem(item)
-            self.shoes.append(res_place_holder)
     def TOP_LIST_EDIT(self):
             """
             User click EDIT botton to call this function to edit a prediction result.
             """
-            
-            selected_items = self.TOP_LIST.selectedItems()
-            text, okPressed = QtWidgets.QInputDialog.getText(self.AddTopButton, "EDIT","Please Edit This Top:", QtWidgets.QLineEdit.Normal, selected_items[0].text())
-            for i in selected_items:
-                self.TOP_LIST.takeItem(self.TOP_LIST.row(i))
-            if okPressed and text != '':
-                item = QtWidgets.QListWidgetItem(text)
-                self.TOP_LIST.addItem(item)   
+            self._edit_selected(self.TOP_LIST, self.AddTopButton, "Please Edit This Top:")
     def TOP_LIST_DEL(self):
             """
             User click DELETE botton to call this function to delete a photo with prediction result.
             """
-            selected_items = self.TOP_LIST.selectedItems()
-            for i in selected_items:
-                self.TOP_LIST.takeItem(self.TOP_LIST.row(i))
-            text = selected_items[0].text()
-            
-            path = text.split(", ")[-1]
-            for i in self.top:
-                if(i[-1] == path):
-                    self.top.remove(i)
+            self._delete_selected(self.TOP_LIST)
             
     ####          
     def BOTTOM_LIST_EDIT(self):
             """
             User click EDIT botton to call this function to edit a prediction result.
             """
-            selected_items = self.BOTTOM_LIST.selectedItems()
-            text, okPressed = QtWidgets.QInputDialog.getText(self.AddBottomButton, "EDIT","Please Edit This Bottom:", QtWidgets.QLineEdit.Normal, selected_items[0].text())
-            for i in selected_items:
-                self.BOTTOM_LIST.takeItem(self.BOTTOM_LIST.row(i))
-            if okPressed and text != '':
-                item = QtWidgets.QListWidgetItem(text)
-                self.BOTTOM_LIST.addItem(item)   
+            self._edit_selected(self.BOTTOM_LIST, self.AddBottomButton, "Please Edit This Bottom:")
     def BOTTOM_LIST_DEL(self):
             """
             User click DELETE botton to call this function to delete a photo with prediction result.
             """
-            selected_items = self.BOTTOM_LIST.selectedItems()
-            for i in selected_items:
-                self.BOTTOM_LIST.takeItem(self.BOTTOM_LIST.row(i))
-            text = selected_items[0].text()
-            
-            path = text.split(", ")[-1]
-            for i in self.bottom:
-                if(i[-1] == path):
-                    self.bottom.remove(i)
+            self._delete_selected(self.BOTTOM_LIST)
             
            
     def SHOE_LIST_EDIT(self):
             """
             User click EDIT botton to call this function to edit a prediction result.
             """
-            selected_items = self.SHOE_LIST.selectedItems()
-            text, okPressed = QtWidgets.QInputDialog.getText(self.AddShoeButton, "EDIT","Please Edit This Shoes:", QtWidgets.QLineEdit.Normal, selected_items[0].text())
-            for i in selected_items:
-                self.SHOE_LIST.takeItem(self.SHOE_LIST.row(i))
-            if okPressed and text != '':
-                item = QtWidgets.QListWidgetItem(text)
-                self.SHOE_LIST.addItem(item)   
+            self._edit_selected(self.SHOE_LIST, self.AddShoeButton, "Please Edit This Shoes:")
     def SHOE_LIST_DEL(self):
             """
             User click DELETE botton to call this function to delete a photo with prediction result.
             """
-            selected_items = self.SHOE_LIST.selectedItems()
-            for i in selected_items:
-                self.SHOE_LIST.takeItem(self.SHOE_LIST.row(i))
-            text = selected_items[0].text()
-            
-            path = text.split(", ")[-1]
-            for i in self.shoes:
-                if(i[-1] == path):
-                    self.shoes.remove(i)
+            self._delete_selected(self.SHOE_LIST)
     #################
+    def _pixmap_key(self, path):
+        return f"{path}@{self.PREVIEW_SIZE[0]}x{self.PREVIEW_SIZE[1]}"
+        
+    def _pixmap(self, path):
+        """
+        The scaled preview of a photo, decoded once and then served from QPixmapCache.
+        """
+        key = self._pixmap_key(path)
+        pixmap = QtGui.QPixmapCache.find(key)
+        if pixmap is None or pixmap.isNull():
+            pixmap = QtGui.QPixmap(path).scaled(*self.PREVIEW_SIZE)
+            QtGui.QPixmapCache.insert(key, pixmap)
+        return pixmap
+        
     def Generate(self):
         """
         User click Generate today's Outfit Recommendation botton to call this function to get a recommendation.
         """
-        top_right_season = [i for i in self.top if i[3] == toseason ]
-        if top_right_season != []:
-            ad_top = top_right_season[np.random.randint(len(top_right_season))]
-        else:
-            ad_top = self.top[np.random.randint(len(self.top))]   
-        helper_bot = [i for i in self.bottom if i[4] == ad_top[4] ]
-        helper_sho = [i for i in self.shoes if i[4] == ad_top[4] ]
-        if helper_bot==[]:
-            ad_bot = self.bottom[np.random.randint(len(self.bottom))]
-        else:
-            bot_right_season = [i for i in helper_bot if i[3] == toseason]
-            
-            if bot_right_season != []:
-                ad_bot = bot_right_season[np.random.randint(len(bot_right_season))]
-            else:
-                ad_bot = helper_bot[np.random.randint(len(helper_bot))]   
-        if helper_sho==[]:
-            ad_sho = self.shoes[np.random.randint(len(self.shoes))]
-        else:
-            sho_right_season = [i for i in helper_sho if i[3] == toseason]
-            
-            if sho_right_season != []:
-                ad_sho = sho_right_season[np.random.randint(len(sho_right_season))]
-            else:
-                ad_sho = helper_sho[np.random.randint(len(helper_sho))]
+        outfit = self.wardrobe.generate(toseason)
+        if outfit is None:
+            self.statusbar.showMessage("Add at least one top, one bottom and one pair of shoes first", 3000)
+            return
+        ad_top, ad_bot, ad_sho = outfit
         
-        self.listWidget_1.setPixmap(QtGui.QPixmap(ad_top[-1]).scaled(281,300))
-        self.listWidget_2.setPixmap(QtGui.QPixmap(ad_bot[-1]).scaled(281,300))
-        self.listWidget_3.setPixmap(QtGui.QPixmap(ad_sho[-1]).scaled(281,300))
+        self.listWidget_1.setPixmap(self._pixmap(ad_top.path))
+        self.listWidget_2.setPixmap(self._pixmap(ad_bot.path))
+        self.listWidget_3.setPixmap(self._pixmap(ad_sho.path))
 
     # The above is what functions the GUI should have
     
@@ -240,6 +372,10 @@ class Ui_MainWindow(object):
         self.statusbar = QtWidgets.QStatusBar(MainWindow)
         self.statusbar.setObjectName("statusbar")
         MainWindow.setStatusBar(self.statusbar)
+        self.progress = QtWidgets.QProgressBar(self.statusbar)
+        self.progress.setMaximumWidth(200)
+        self.progress.hide()
+        self.statusbar.addPermanentWidget(self.progress)
 
         self.retranslateUi(MainWindow)
         QtCore.QMetaObject.connectSlotsByName(MainWindow)
@@ -290,7 +426,10 @@ def run_ui():
                              "selection-background-color: peru;"
                              "selection-color: white;"
                              "background-color: saddlebrown;")
-    ui = Ui_MainWindow()
+    ui = Ui_MainWindow(DesktopStore())
     ui.setupUi(MainWindow)
     MainWindow.show()
+    # Load the saved wardrobe and the models only once the event loop has painted the window
+    QtCore.QTimer.singleShot(0, ui.load_wardrobe)
+    QtCore.QTimer.singleShot(0, ui.start_warm_up)
     sys.exit(app.exec_())
@@ -0,0 +1,205 @@
+import hashlib
+import os
+import uuid
+
+from flask import Request, current_app, jsonify, request
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge, UnsupportedMediaType
+from werkzeug.utils import secure_filename
+
+
+# ==========================================
+# STREAMING UPLOADS
+# ==========================================
+# Werkzeug normally spools every uploaded file into a temporary file (kept in
+# memory up to 500 KB) and /upload then copied it into the uploads folder.
+# For the upload endpoint, UploadRequest gives the form parser an UploadSink
+# instead. The parser reads the body in 64 KB chunks. Each chunk goes straight
+# into <UPLOAD_FOLDER>/.incoming/ and is hashed as it goes. The first bytes are
+# sniffed. A part that is not an image, or that grows past the per-file
+# limit, is rejected: its .part file is dropped and the rest of that part is
+# read and thrown away, so the other files of the post still go through
+# (/upload reports it under "errors"; a single-file post gets the 415/413).
+# A request whose Content-Length is over the total limit is refused before
+# any read.
+#
+# Accepted files are renamed to <name>-<sha1 prefix>.<ext> in the user's
+# folder. The name changes whenever the content does, which lets the image
+# route serve them as immutable.
+
+MAX_FILE_BYTES = int(float(os.environ.get("WARDROBE_MAX_UPLOAD_MB", "20")) * 1024 * 1024)
+MAX_REQUEST_BYTES = int(float(os.environ.get("WARDROBE_MAX_REQUEST_MB", "200")) * 1024 * 1024)
+MAX_FILES = int(os.environ.get("WARDROBE_MAX_UPLOAD_FILES", "50"))
+UPLOAD_ENDPOINTS = {"upload"}
+INCOMING_DIR = ".incoming"
+HASH_PREFIX = 12
+
+# Leading bytes -> extension; WebP is RIFF....WEBP
+SIGNATURES = [
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+    (b"BM", ".bmp"),
+    (b"II*\x00", ".tif"),
+    (b"MM\x00*", ".tif"),
+]
+SNIFF_BYTES = 12
+
+
+def _mb(size):
+    return f"{size / (1024 * 1024):g} MB"
+
+
+def sniff_image(head):
+    """Extension for the image format the first bytes belong to, or None"""
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    for signature, extension in SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    return None
+
+
+class UploadSink:
+    """
+    Writable file for one form part: hashes and sniffs while writing to a
+    .part file. Non-images and parts over max_bytes are rejected mid-stream:
+    rejected holds the HTTP error and later writes are discarded.
+    """
+
+    def __init__(self, folder, filename, max_bytes=None):
+        os.makedirs(folder, exist_ok=True)
+        self.filename = filename
+        self.max_bytes = max_bytes or MAX_FILE_BYTES
+        self.path = os.path.join(folder, f"{uuid.uuid4().hex}.part")
+        self.size = 0
+        self.extension = None
+        self.digest = hashlib.sha1()
+        self._head = b""
+        self.rejected = None
+        self._file = open(self.path, "wb")
+
+    def write(self, data):
+        self.size += len(data)
+        if self.rejected is not None:
+            return len(data)
+        if self.size > self.max_bytes:
+            self.reject(RequestEntityTooLarge(f"{self.filename} is larger than {_mb(self.max_bytes)}"))
+            return len(data)
+        if self.extension is None:
+            self._head += data[:SNIFF_BYTES]
+            if len(self._head) >= SNIFF_BYTES and not self._check_head():
+                return len(data)
+        self.digest.update(data)
+        self._file.write(data)
+        return len(data)
+
+    def _check_head(self):
+        self.extension = sniff_image(self._head)
+        if self.extension is None:
+            self.reject(UnsupportedMediaType(f"{self.filename} is not a supported image"))
+            return False
+        return True
+
+    def reject(self, error):
+        """Drop what was written; the rest of the part is read and ignored"""
+        self.rejected = error
+        self.discard()
+
+    def seek(self, offset, whence=0):
+        # The parser rewinds every finished part; that is the moment to flush it
+        if not self._file.closed:
+            self._file.flush()
+        return 0
+
+    def finish(self):
+        """Close the .part file; short files are sniffed here (tiny images)"""
+        if not self._file.closed:
+            self._file.close()
+        if self.extension is None and self.rejected is None:
+            self._check_head()
+
+    def save_to(self, folder):
+        """Move the finished part to folder as <name>-<hash>.<ext> and return its path"""
+        self.finish()
+        stem = os.path.splitext(secure_filename(self.filename or ""))[0] or "upload"
+        os.makedirs(folder, exist_ok=True)
+        dest = os.path.join(folder, f"{stem}-{self.digest.hexdigest()[:HASH_PREFIX]}{self.extension}")
+        os.replace(self.path, dest)
+        self.path = None
+        return dest
+
+    def discard(self):
+        if not self._file.closed:
+            self._file.close()
+        if self.path:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+
+    def close(self):
+        # Called by werkzeug at the end of the request: drop whatever was not saved
+        self.discard()
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+
+class UploadRequest(Request):
+    """
+    Request class that streams upload-endpoint files into UploadSinks, spooled
+    under app.config["UPLOAD_FOLDER"] so save_to stays on one filesystem
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.endpoint not in UPLOAD_ENDPOINTS:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        sinks = self.__dict__.setdefault("upload_sinks", [])
+        if len(sinks) >= MAX_FILES:
+            raise BadRequest(f"At most {MAX_FILES} files per upload")
+        sink = UploadSink(os.path.join(current_app.config["UPLOAD_FOLDER"], INCOMING_DIR), filename)
+        if content_length and content_length > MAX_FILE_BYTES:
+            sink.reject(RequestEntityTooLarge(f"{filename} is larger than {_mb(MAX_FILE_BYTES)}"))
+        sinks.append(sink)
+        return sink
+
+    def close(self):
+        # Parsing may have stopped half way, before werkzeug knows about the sinks
+        super().close()
+        for sink in self.__dict__.get("upload_sinks", ()):
+            sink.discard()
+
+
+def _sinks(field):
+    sinks = [f.stream for f in request.files.getlist(field) if f.filename]
+    for sink in sinks:
+        sink.finish()
+    return sinks
+
+
+def uploaded_files(field="file"):
+    """The accepted UploadSinks of a form field, in order (empty parts skipped)"""
+    return [sink for sink in _sinks(field) if sink.rejected is None]
+
+
+def rejected_files(field="file"):
+    """The rejected UploadSinks of a form field; sink.rejected is the HTTP error"""
+    return [sink for sink in _sinks(field) if sink.rejected is not None]
+
+
+def init_app(app, upload_root):
+    """Stream upload-endpoint files to disk and answer upload errors with JSON"""
+    app.request_class = UploadRequest
+    app.config.setdefault("UPLOAD_FOLDER", upload_root)
+    app.config["MAX_CONTENT_LENGTH"] = MAX_REQUEST_BYTES
+
+    def upload_error(e):
+        if request.endpoint in UPLOAD_ENDPOINTS:
+            return jsonify({"error": e.description}), e.code
+        return e
+
+    for error in (BadRequest, RequestEntityTooLarge, UnsupportedMediaType):
+        app.register_error_handler(error, upload_error)
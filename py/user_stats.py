@@ -0,0 +1,341 @@
+import json
+import os
+import sqlite3
+
+
+# ==========================================
+# USER STATS (INCREMENTALLY MAINTAINED)
+# ==========================================
+# total_items / total_wears / total_outfits_worn are kept in sync by SQLite
+# triggers, so every writer (web app, scripts, desktop app) updates them.
+# most_worn / least_worn are small JSON snapshots that the app refreshes after
+# writes that can change them; the refresh is two LIMIT 3 seeks on
+# idx_clothes_user_wear, never a sort over the whole wardrobe.
+# wardrobe_version is bumped (also by triggers) on every change to a user's
+# clothes that can change a recommendation; response_cache keys on it.
+
+DB_PATH = os.path.join(os.path.dirname(__file__), "wardrobe.db")
+
+TOP_N = 3
+
+STATS_COLUMNS = [
+    ("total_wears", "INTEGER DEFAULT 0"),
+    ("most_worn", "TEXT"),
+    ("least_worn", "TEXT"),
+    ("wardrobe_version", "INTEGER DEFAULT 0"),
+]
+
+STATS_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_clothes_user_wear ON clothes(user_id, wear_count)",
+]
+
+STATS_TRIGGERS = {
+    "trg_clothes_stats_insert": '''
+    CREATE TRIGGER IF NOT EXISTS trg_clothes_stats_insert
+    AFTER INSERT ON clothes
+    BEGIN
+        INSERT OR IGNORE INTO user_stats (user_id) VALUES (NEW.user_id);
+        UPDATE user_stats
+        SET total_items = total_items + 1,
+            total_wears = total_wears + COALESCE(NEW.wear_count, 0),
+            last_updated = CURRENT_TIMESTAMP
+        WHERE user_id = NEW.user_id;
+    END
+    ''',
+    "trg_clothes_stats_delete": '''
+    CREATE TRIGGER IF NOT EXISTS trg_clothes_stats_delete
+    AFTER DELETE ON clothes
+    BEGIN
+        UPDATE user_stats
+        SET total_items = total_items - 1,
+            total_wears = total_wears - COALESCE(OLD.wear_count, 0),
+            last_updated = CURRENT_TIMESTAMP
+        WHERE user_id = OLD.user_id;
+    END
+    ''',
+    "trg_clothes_stats_wear": '''
+    CREATE TRIGGER IF NOT EXISTS trg_clothes_stats_wear
+    AFTER UPDATE OF wear_count ON clothes
+    WHEN COALESCE(NEW.wear_count, 0) != COALESCE(OLD.wear_count, 0)
+    BEGIN
+        UPDATE user_stats
+        SET total_wears = total_wears + COALESCE(NEW.wear_count, 0) - COALESCE(OLD.wear_count, 0),
+            last_updated = CURRENT_TIMESTAMP
+        WHERE user_id = NEW.user_id;
+    END
+    ''',
+    "trg_outfit_history_stats_insert": '''
+    CREATE TRIGGER IF NOT EXISTS trg_outfit_history_stats_insert
+    AFTER INSERT ON outfit_history
+    BEGIN
+        INSERT OR IGNORE INTO user_stats (user_id) VALUES (NEW.user_id);
+        UPDATE user_stats
+        SET total_outfits_worn = total_outfits_worn + 1,
+            last_updated = CURRENT_TIMESTAMP
+        WHERE user_id = NEW.user_id;
+    END
+    ''',
+    "trg_outfit_history_stats_delete": '''
+    CREATE TRIGGER IF NOT EXISTS trg_outfit_history_stats_delete
+    AFTER DELETE ON outfit_history
+    BEGIN
+        UPDATE user_stats
+        SET total_outfits_worn = total_outfits_worn - 1,
+            last_updated = CURRENT_TIMESTAMP
+        WHERE user_id = OLD.user_id;
+    END
+    ''',
+}
+
+# Separate from STATS_TRIGGERS: installing these needs no rebuild of the totals
+VERSION_TRIGGERS = {
+    "trg_clothes_version_insert": '''
+    CREATE TRIGGER IF NOT EXISTS trg_clothes_version_insert
+    AFTER INSERT ON clothes
+    BEGIN
+        INSERT OR IGNORE INTO user_stats (user_id) VALUES (NEW.user_id);
+        UPDATE user_stats SET wardrobe_version = COALESCE(wardrobe_version, 0) + 1 WHERE user_id = NEW.user_id;
+    END
+    ''',
+    "trg_clothes_version_delete": '''
+    CREATE TRIGGER IF NOT EXISTS trg_clothes_version_delete
+    AFTER DELETE ON clothes
+    BEGIN
+        UPDATE user_stats SET wardrobe_version = COALESCE(wardrobe_version, 0) + 1 WHERE user_id = OLD.user_id;
+    END
+    ''',
+    "trg_clothes_version_update": '''
+    CREATE TRIGGER IF NOT EXISTS trg_clothes_version_update
+    AFTER UPDATE OF wear_count, season, occasion, subtype, color, file_path ON clothes
+    BEGIN
+        UPDATE user_stats SET wardrobe_version = COALESCE(wardrobe_version, 0) + 1 WHERE user_id = NEW.user_id;
+    END
+    ''',
+}
+
+
+def _table_exists(conn, name):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+def install_stats_schema(conn):
+    """
+    Add the user_stats columns, index and triggers if they are missing.
+    When the triggers are installed for the first time the table is rebuilt
+    from the clothes/outfit_history aggregates so existing users start correct.
+    Returns True if anything had to be installed.
+    """
+    for table in ("clothes", "outfit_history", "user_stats"):
+        if not _table_exists(conn, table):
+            return False
+
+    existing_columns = {row[1] for row in conn.execute("PRAGMA table_info(user_stats)")}
+    for column, ddl in STATS_COLUMNS:
+        if column not in existing_columns:
+            conn.execute(f"ALTER TABLE user_stats ADD COLUMN {column} {ddl}")
+
+    for ddl in STATS_INDEXES:
+        conn.execute(ddl)
+
+    existing_triggers = {
+        row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+    }
+    missing = [name for name in STATS_TRIGGERS if name not in existing_triggers]
+    for name in missing:
+        conn.execute(STATS_TRIGGERS[name])
+    for name, ddl in VERSION_TRIGGERS.items():
+        if name not in existing_triggers:
+            conn.execute(ddl)
+
+    if missing:
+        rebuild_user_stats(conn)
+    conn.commit()
+    return bool(missing)
+
+
+# ==========================================
+# MOST / LEAST WORN SNAPSHOTS
+# ==========================================
+
+def _worn_list(conn, user_id, direction):
+    rows = conn.execute(f"""
+        SELECT id, file_path, subtype, wear_count
+        FROM clothes
+        WHERE user_id = ?
+        ORDER BY wear_count {direction}
+        LIMIT {TOP_N}
+    """, (user_id,)).fetchall()
+    return [{'id': r[0], 'path': r[1], 'type': r[2], 'count': r[3]} for r in rows]
+
+
+def refresh_worn_lists(conn, user_id):
+    """
+    Refresh the most/least worn snapshots for one user.
+    Call after any insert, delete or wear of that user's clothes
+    (inside the same transaction, before commit).
+    """
+    most_worn = _worn_list(conn, user_id, "DESC")
+    least_worn = _worn_list(conn, user_id, "ASC")
+    conn.execute("INSERT OR IGNORE INTO user_stats (user_id) VALUES (?)", (user_id,))
+    conn.execute("""
+        UPDATE user_stats
+        SET most_worn = ?, least_worn = ?, last_updated = CURRENT_TIMESTAMP
+        WHERE user_id = ?
+    """, (json.dumps(most_worn), json.dumps(least_worn), user_id))
+
+
+def rebuild_user_stats(conn, user_id=None):
+    """Recompute user_stats from scratch (all users, or a single user)"""
+    if user_id is None:
+        user_ids = [row[0] for row in conn.execute("""
+            SELECT user_id FROM clothes
+            UNION SELECT user_id FROM outfit_history
+            UNION SELECT user_id FROM user_stats
+        """)]
+    else:
+        user_ids = [user_id]
+
+    for uid in user_ids:
+        total_items, total_wears = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(wear_count), 0) FROM clothes WHERE user_id = ?", (uid,)
+        ).fetchone()
+        total_outfits = conn.execute(
+            "SELECT COUNT(*) FROM outfit_history WHERE user_id = ?", (uid,)
+        ).fetchone()[0]
+        conn.execute("INSERT OR IGNORE INTO user_stats (user_id) VALUES (?)", (uid,))
+        conn.execute("""
+            UPDATE user_stats
+            SET total_items = ?, total_wears = ?, total_outfits_worn = ?,
+                last_updated = CURRENT_TIMESTAMP
+            WHERE user_id = ?
+        """, (total_items, total_wears, total_outfits, uid))
+        refresh_worn_lists(conn, uid)
+
+
+# ==========================================
+# READ PATH
+# ==========================================
+
+def get_user_stats(conn, user_id):
+    """Return the /wardrobe_stats payload for a user with a single-row read"""
+    row = conn.execute("""
+        SELECT total_items, total_wears, most_worn, least_worn
+        FROM user_stats
+        WHERE user_id = ?
+    """, (user_id,)).fetchone()
+
+    if row is None:
+        return {'total_items': 0, 'total_wears': 0, 'avg_wears': 0, 'most_worn': [], 'least_worn': []}
+
+    total_items, total_wears, most_worn, least_worn = row
+    total_items = total_items or 0
+    total_wears = total_wears or 0
+    return {
+        'total_items': total_items,
+        'total_wears': total_wears,
+        'avg_wears': round(total_wears / total_items, 2) if total_items and total_wears else 0,
+        'most_worn': json.loads(most_worn) if most_worn else [],
+        'least_worn': json.loads(least_worn) if least_worn else [],
+    }
+
+
+def get_wardrobe_version(conn, user_id):
+    """Counter that changes whenever the user's clothes change (0 before the first change)"""
+    row = conn.execute("SELECT wardrobe_version FROM user_stats WHERE user_id = ?", (user_id,)).fetchone()
+    return (row[0] or 0) if row else 0
+
+
+def bump_wardrobe_version(conn, user_id):
+    """For changes the triggers can't see; call inside the writer's transaction"""
+    conn.execute("INSERT OR IGNORE INTO user_stats (user_id) VALUES (?)", (user_id,))
+    conn.execute("UPDATE user_stats SET wardrobe_version = COALESCE(wardrobe_version, 0) + 1 WHERE user_id = ?",
+                 (user_id,))
+
+
+# ==========================================
+# CONSISTENCY CHECKER
+# ==========================================
+
+def check_consistency(conn, user_id=None):
+    """
+    Compare the maintained user_stats rows against the aggregate queries.
+    Returns a list of mismatches (empty list means everything is consistent).
+    Most/least worn lists are compared by wear counts, since items with equal
+    counts may legitimately come back in a different order.
+    """
+    if user_id is None:
+        user_ids = [row[0] for row in conn.execute("""
+            SELECT user_id FROM clothes
+            UNION SELECT user_id FROM outfit_history
+            UNION SELECT user_id FROM user_stats
+        """)]
+    else:
+        user_ids = [user_id]
+
+    problems = []
+    for uid in user_ids:
+        maintained = get_user_stats(conn, uid)
+        total_items, total_wears = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(wear_count), 0) FROM clothes WHERE user_id = ?", (uid,)
+        ).fetchone()
+        total_outfits = conn.execute(
+            "SELECT COUNT(*) FROM outfit_history WHERE user_id = ?", (uid,)
+        ).fetchone()[0]
+        row = conn.execute(
+            "SELECT total_outfits_worn FROM user_stats WHERE user_id = ?", (uid,)
+        ).fetchone()
+        maintained_outfits = row[0] if row else 0
+
+        expected = {
+            'total_items': total_items,
+            'total_wears': total_wears,
+            'total_outfits_worn': total_outfits,
+            'most_worn': [m['count'] for m in _worn_list(conn, uid, "DESC")],
+            'least_worn': [l['count'] for l in _worn_list(conn, uid, "ASC")],
+        }
+        actual = {
+            'total_items': maintained['total_items'],
+            'total_wears': maintained['total_wears'],
+            'total_outfits_worn': maintained_outfits or 0,
+            'most_worn': [m['count'] for m in maintained['most_worn']],
+            'least_worn': [l['count'] for l in maintained['least_worn']],
+        }
+        for field, value in expected.items():
+            if actual[field] != value:
+                problems.append({'user_id': uid, 'field': field, 'expected': value, 'actual': actual[field]})
+
+    return problems
+
+
+# ==========================================
+# MAIN EXECUTION
+# ==========================================
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Check or rebuild the user_stats table")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    parser.add_argument("--db", default=DB_PATH, help="path to wardrobe.db")
+    parser.add_argument("--user", type=int, default=None, help="only this user id")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    install_stats_schema(conn)
+
+    if args.command == "rebuild":
+        rebuild_user_stats(conn, args.user)
+        conn.commit()
+        print("✅ user_stats rebuilt")
+    else:
+        problems = check_consistency(conn, args.user)
+        if problems:
+            for p in problems:
+                print(f"❌ user {p['user_id']}: {p['field']} expected {p['expected']}, got {p['actual']}")
+            conn.close()
+            raise SystemExit(1)
+        else:
+            print("✅ user_stats is consistent")
+    conn.close()
@@ -0,0 +1,170 @@
+import base64
+import json
+import os
+
+from image_pipeline import thumbnail_path
+from image_serving import image_url, image_version
+
+
+# ==========================================
+# PAGINATED WARDROBE QUERIES
+# ==========================================
+# Read-side SQL for the paginated views. Pages use keyset (seek) pagination:
+# the cursor holds the sort key of the last row served, and the next page
+# starts strictly after it, so page N costs the same as page 1.
+
+
+def encode_cursor(*values):
+    """Encode the sort key of the last row on a page as an opaque URL-safe cursor"""
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Decode a cursor from encode_cursor(); raises ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def upload_url(user_id, file_path):
+    """Public URL of an uploaded file (None if the item was deleted)"""
+    if not file_path:
+        return None
+    return image_url(user_id, os.path.basename(file_path))
+
+
+def thumbnail_url(user_id, file_path):
+    """URL of the card thumbnail for an upload, or the original until it has been generated"""
+    if not file_path:
+        return None
+    path = thumbnail_path(file_path)
+    if path == file_path:
+        return upload_url(user_id, file_path)
+    # Versioned so the browser may cache it for good; a rebuilt thumbnail gets a new URL
+    derived_folder = os.path.basename(os.path.dirname(path))
+    return image_url(user_id, f"{derived_folder}/{os.path.basename(path)}", image_version(path))
+
+
+def get_outfit_history_page(conn, user_id, cursor=None, limit=20):
+    """
+    Fetch one page of outfit history, newest first
+    Keyset pagination on (date_worn, id): the next page starts strictly after
+    the last row of this one, so every page is an index seek on
+    idx_outfit_history_user_date instead of a sort over the whole history
+    conn must use sqlite3.Row as its row_factory
+    Returns (rows, next_cursor) - next_cursor is None on the last page
+    """
+    params = [user_id]
+    seek = ""
+    if cursor:
+        date_worn, last_id = decode_cursor(cursor)
+        if not isinstance(date_worn, str) or not isinstance(last_id, int):
+            raise ValueError("Invalid cursor")
+        # date_worn <= ? gives SQLite a range to seek to; the OR breaks ties on id
+        seek = "AND oh.date_worn <= ? AND (oh.date_worn < ? OR oh.id < ?)"
+        params += [date_worn, date_worn, last_id]
+
+    rows = conn.execute(f"""
+        SELECT oh.id, oh.date_worn, oh.top_id, oh.bottom_id, oh.shoe_id,
+               oh.season, oh.occasion, oh.rating,
+               c1.file_path as top_path,
+               c2.file_path as bottom_path,
+               c3.file_path as shoe_path
+        FROM outfit_history oh
+        LEFT JOIN clothes c1 ON oh.top_id = c1.id
+        LEFT JOIN clothes c2 ON oh.bottom_id = c2.id
+        LEFT JOIN clothes c3 ON oh.shoe_id = c3.id
+        WHERE oh.user_id = ?
+        {seek}
+        ORDER BY oh.date_worn DESC, oh.id DESC
+        LIMIT ?
+    """, params + [limit + 1]).fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["date_worn"], rows[-1]["id"])
+
+    history = [{
+        "id": r["id"],
+        "date_worn": r["date_worn"],
+        "season": r["season"],
+        "occasion": r["occasion"],
+        "rating": r["rating"],
+        "top_id": r["top_id"],
+        "bottom_id": r["bottom_id"],
+        "shoe_id": r["shoe_id"],
+        "top_image": thumbnail_url(user_id, r["top_path"]),
+        "bottom_image": thumbnail_url(user_id, r["bottom_path"]),
+        "shoe_image": thumbnail_url(user_id, r["shoe_path"]),
+    } for r in rows]
+    return history, next_cursor
+
+
+def get_wardrobe_page(conn, user_id, subtype=None, season=None, occasion=None, cursor=None, limit=24):
+    """
+    Fetch one page of a user's wardrobe in upload order (keyset on id)
+    Optional filters: subtype (top/bottom/foot), season, occasion (case-insensitive)
+    Only the columns the wardrobe cards need are selected
+    conn must use sqlite3.Row as its row_factory
+    Returns (items, next_cursor) - next_cursor is None on the last page
+    """
+    where = ["user_id = ?"]
+    params = [user_id]
+    if subtype:
+        where.append("subtype = ?")
+        params.append(subtype)
+    if season:
+        where.append("LOWER(season) = ?")
+        params.append(season.lower())
+    if occasion:
+        where.append("LOWER(occasion) = ?")
+        params.append(occasion.lower())
+    if cursor:
+        (last_id,) = decode_cursor(cursor)
+        if not isinstance(last_id, int):
+            raise ValueError("Invalid cursor")
+        where.append("id > ?")
+        params.append(last_id)
+
+    rows = conn.execute(f"""
+        SELECT id, file_path, subtype, season, occasion, wear_count
+        FROM clothes
+        WHERE {" AND ".join(where)}
+        ORDER BY id
+        LIMIT ?
+    """, params + [limit + 1]).fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["id"])
+
+    items = [{
+        "id": r["id"],
+        "file_name": os.path.basename(r["file_path"]),
+        "url": upload_url(user_id, r["file_path"]),
+        "thumb_url": thumbnail_url(user_id, r["file_path"]),
+        "subtype": r["subtype"],
+        "season": r["season"],
+        "occasion": r["occasion"],
+        "wear_count": r["wear_count"],
+    } for r in rows]
+    return items, next_cursor
+
+
+def get_wardrobe_counts(conn, user_id):
+    """Item count per subtype (top/bottom/foot) - an index-only scan"""
+    counts = {"top": 0, "bottom": 0, "foot": 0}
+    for row in conn.execute(
+        "SELECT subtype, COUNT(*) FROM clothes WHERE user_id = ? GROUP BY subtype", (user_id,)
+    ):
+        if row[0] in counts:
+            counts[row[0]] = row[1]
+    return counts
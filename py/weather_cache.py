@@ -0,0 +1,191 @@
+import json
+import math
+import os
+import time
+
+import metrics
+from singleflight import SingleFlight
+from weather_providers import WeatherProvider
+
+
+# ==========================================
+# GEOSPATIAL WEATHER CACHE
+# ==========================================
+# Users a few streets apart used to make separate Open-Meteo calls for what
+# is the same weather. Current weather is now cached in SQLite per grid cell
+# of WARDROBE_WEATHER_CELL_DEG degrees (default 0.1, about 11 km):
+#   lookup  the nearest unexpired cell center within WARDROBE_WEATHER_RADIUS_KM
+#           of the user (default 10), the user's own cell always counts
+#   miss    one upstream call for the user's cell, at the cell center, stored
+#           for WARDROBE_WEATHER_TTL seconds (default 900; Open-Meteo updates
+#           current weather every 15 minutes)
+# Concurrent misses for the same cell are collapsed into one upstream call
+# (singleflight); the table is shared by every worker process.
+# WARDROBE_WEATHER_CACHE=off turns it off. Only current() is cached.
+
+ENABLED = os.environ.get("WARDROBE_WEATHER_CACHE", "on").lower() not in ("off", "0", "none")
+CELL_DEG = float(os.environ.get("WARDROBE_WEATHER_CELL_DEG", "0.1"))
+RADIUS_KM = float(os.environ.get("WARDROBE_WEATHER_RADIUS_KM", "10"))
+TTL_SECONDS = float(os.environ.get("WARDROBE_WEATHER_TTL", "900"))
+EARTH_RADIUS_KM = 6371.0
+PURGE_EVERY = 100
+
+WEATHER_CACHE_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS weather_cache (
+        cell TEXT PRIMARY KEY,
+        lat REAL NOT NULL,
+        lon REAL NOT NULL,
+        fetched_at REAL NOT NULL,
+        expires_at REAL NOT NULL,
+        payload TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_weather_cache_lat_lon ON weather_cache(lat, lon)",
+    "CREATE INDEX IF NOT EXISTS idx_weather_cache_expires ON weather_cache(expires_at)",
+]
+
+
+def install_weather_cache_schema(conn):
+    """Create the weather_cache table if it is missing; returns True if it was created"""
+    missing = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'weather_cache'").fetchone() is None
+    for ddl in WEATHER_CACHE_TABLES:
+        conn.execute(ddl)
+    conn.commit()
+    return missing
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance (haversine)"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class GridWeatherCache:
+    """
+    Current-weather responses per grid cell in the weather_cache table.
+    connect() returns a new sqlite3 connection; clock() the time in seconds.
+    """
+
+    def __init__(self, connect, cell_deg=CELL_DEG, radius_km=RADIUS_KM, ttl=TTL_SECONDS, clock=time.time):
+        self.connect = connect
+        self.cell_deg = cell_deg
+        self.radius_km = radius_km
+        self.ttl = ttl
+        self.clock = clock
+        self.flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.upstream_calls = 0
+        self._stores = 0
+
+    def cell_of(self, latitude, longitude):
+        """(cell key, center latitude, center longitude)"""
+        i = math.floor(latitude / self.cell_deg)
+        j = math.floor(((longitude + 180.0) % 360.0 - 180.0) / self.cell_deg)
+        center = (round((i + 0.5) * self.cell_deg, 6), round((j + 0.5) * self.cell_deg, 6))
+        return f"{self.cell_deg:g}:{i}:{j}", center[0], center[1]
+
+    def lookup(self, latitude, longitude, cell=None, radius_km=None):
+        """Payload (JSON text) of the nearest unexpired cell within radius_km, or None"""
+        cell = cell or self.cell_of(latitude, longitude)[0]
+        radius_km = self.radius_km if radius_km is None else radius_km
+        dlat = radius_km / 111.0
+        dlon = radius_km / (111.32 * max(0.01, math.cos(math.radians(latitude))))
+        conn = self.connect()
+        try:
+            rows = conn.execute("""
+                SELECT cell, lat, lon, payload FROM weather_cache
+                WHERE expires_at > ?
+                  AND (cell = ? OR (lat BETWEEN ? AND ? AND lon BETWEEN ? AND ?))
+            """, (self.clock(), cell, latitude - dlat, latitude + dlat, longitude - dlon, longitude + dlon)).fetchall()
+        finally:
+            conn.close()
+        best, best_km = None, None
+        for row_cell, lat, lon, payload in rows:
+            km = distance_km(latitude, longitude, lat, lon)
+            if row_cell != cell and km > radius_km:
+                continue
+            if best_km is None or km < best_km:
+                best, best_km = payload, km
+        return best
+
+    def store(self, cell, latitude, longitude, payload):
+        now = self.clock()
+        conn = self.connect()
+        try:
+            conn.execute("""
+                INSERT OR REPLACE INTO weather_cache (cell, lat, lon, fetched_at, expires_at, payload)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (cell, latitude, longitude, now, now + self.ttl, payload))
+            self._stores += 1
+            if self._stores % PURGE_EVERY == 0:
+                conn.execute("DELETE FROM weather_cache WHERE expires_at <= ?", (now,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def get(self, latitude, longitude, fetch):
+        """
+        Current weather near (latitude, longitude): cached, or fetch(lat, lon) at the
+        cell center (once per cell however many callers miss together). None if the
+        upstream has no answer. Every caller gets its own copy.
+        """
+        cell, center_lat, center_lon = self.cell_of(latitude, longitude)
+        payload = self.lookup(latitude, longitude, cell)
+        if payload is not None:
+            self.hits += 1
+            metrics.cache_result("weather", True)
+            return json.loads(payload)
+
+        self.misses += 1
+        metrics.cache_result("weather", False)
+
+        def fetch_cell():
+            # Another worker process may have filled the cell meanwhile
+            cached = self.lookup(center_lat, center_lon, cell, radius_km=0)
+            if cached is not None:
+                return cached
+            self.upstream_calls += 1
+            data = fetch(center_lat, center_lon)
+            if data is None:
+                return None
+            fresh = json.dumps(data, separators=(",", ":"))
+            self.store(cell, center_lat, center_lon, fresh)
+            return fresh
+
+        payload = self.flight.do(cell, fetch_cell)
+        return json.loads(payload) if payload is not None else None
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'upstream_calls': self.upstream_calls,
+                'shared_fetches': self.flight.shared,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0}
+
+
+class CachedProvider(WeatherProvider):
+    """A provider whose current() goes through a GridWeatherCache"""
+
+    def __init__(self, provider, cache):
+        self.provider = provider
+        self.cache = cache
+        self.name = f"{provider.name} (grid cache)"
+
+    def current(self, latitude, longitude):
+        return self.cache.get(latitude, longitude, self.provider.current)
+
+    def hourly(self, latitude, longitude, days=7):
+        return self.provider.hourly(latitude, longitude, days)
+
+    def geocode(self, city_name):
+        return self.provider.geocode(city_name)
+
+
+def cached_provider(provider, connect):
+    """provider wrapped in the grid cache, or provider itself with WARDROBE_WEATHER_CACHE=off"""
+    if not ENABLED:
+        return provider
+    return CachedProvider(provider, GridWeatherCache(connect))
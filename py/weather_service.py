@@ -1,51 +1,127 @@
+import logging
+import numbers
 import requests
 from datetime import datetime
 
+import numpy as np
 
-class WeatherService:
-    def __init__(self):
-        """Initialize Weather Service and test endpoints"""
-        self.endpoints = {
-            "forecast": "https://api.open-meteo.com/v1/forecast",
-            "current": "https://api.open-meteo.com/v1/current",
-        }
-        
-        self.geocoding_url = "https://geocoding-api.open-meteo.com/v1/search"
-        self.working_endpoint = self.endpoints["forecast"]
-        
-        print("🔧 Testing Open-Meteo endpoints...")
-        self.test_endpoints()
-    
-    def test_endpoints(self):
-        """Test which endpoint works"""
-        test_lat, test_lon = 40.7128, -74.0060  # Use NYC instead (more stable data)
-        
-        for name, url in self.endpoints.items():
+import metrics
+from weather_providers import get_provider
+
+logger = logging.getLogger(__name__)
+
+# ==========================================
+# VECTORIZED SEASON CLASSIFICATION
+# ==========================================
+# get_season_category() handles one (temperature, code) pair. For hourly
+# forecast arrays, season_categories() does the same decision with two table
+# lookups per element:
+#   CODE_GROUP  WMO code (0-99) -> snow / rain / clear / cloudy / other
+#   THRESHOLDS  group -> (upper, lower); band 0 if t > upper, 1 if t > lower, else 2
+#   GROUP_BANDS group x band -> category index into CATEGORIES
+# It agrees with the scalar method on every input, quirks included:
+#   codes that are not an integer 0-99 (or missing) use the "other" rule,
+#   NaN temperatures compare False (-> winter), a missing (None or any other
+#   non-number) temperature is "casual" unless the code alone decides
+#   (snow, rain), and
+#   strings are parsed like the scalar method does (float() for temperatures,
+#   int() for codes), anything that does not parse is "casual".
+# Numeric arrays stay vectorized; object/string arrays are parsed per element.
+# dominant_categories() summarizes the result per window (24 = per day).
+
+CATEGORIES = ("summer", "spring", "autumn", "winter", "rainy", "casual")
+SUMMER, SPRING, AUTUMN, WINTER, RAINY, CASUAL = range(len(CATEGORIES))
+
+OTHER, SNOW, RAIN, CLEAR, CLOUDY = range(5)
+CODE_GROUP = np.full(100, OTHER, dtype=np.int8)
+CODE_GROUP[[71, 73, 75, 77, 85, 86]] = SNOW
+CODE_GROUP[[51, 53, 55, 61, 63, 65, 80, 81, 82]] = RAIN
+CODE_GROUP[[0, 1]] = CLEAR
+CODE_GROUP[[2, 3, 45, 48]] = CLOUDY
+
+THRESHOLDS = np.array([(25, 15), (np.inf, np.inf), (np.inf, np.inf), (25, 15), (20, 10)], dtype=np.float64)
+GROUP_BANDS = np.array([
+    (SUMMER, SPRING, WINTER),   # other
+    (WINTER, WINTER, WINTER),   # snow
+    (RAINY, RAINY, RAINY),      # rain
+    (SUMMER, SPRING, WINTER),   # clear
+    (SPRING, AUTUMN, WINTER),   # cloudy
+], dtype=np.int8)
+NEEDS_TEMPERATURE = np.array([True, False, False, True, True])
+
+
+def _as_float_array(values, parse=float):
+    """
+    float64 array, a mask of the missing entries (None, non-numbers) and a mask
+    of the strings parse() rejects; both become NaN
+    """
+    array = np.asarray(values)
+    if array.dtype.kind not in "OUS":
+        return array.astype(np.float64), np.zeros(array.shape, dtype=bool), np.zeros(array.shape, dtype=bool)
+    floats = np.full(array.shape, np.nan)
+    missing = np.zeros(array.shape, dtype=bool)
+    invalid = np.zeros(array.shape, dtype=bool)
+    for index, value in np.ndenumerate(array):
+        if isinstance(value, str):
             try:
-                # MINIMAL parameters to test
-                params = {
-                    "latitude": test_lat,
-                    "longitude": test_lon,
-                    "current": "temperature_2m,weather_code",
-                    "temperature_unit": "celsius"
-                }
-                
-                print(f"  📍 Testing {name}: {url}")
-                response = requests.get(url, params=params, timeout=5)
-                print(f"     Status: {response.status_code}")
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if 'current' in data and isinstance(data['current'], dict):
-                        if 'temperature_2m' in data['current']:
-                            print(f"     ✅ {name} works!")
-                            self.working_endpoint = url
-                            return
-            
-            except Exception as e:
-                print(f"     ❌ {name} error: {type(e).__name__}")
-        
-        print(f"✅ Using: {self.working_endpoint}")
+                floats[index] = parse(value)
+            except ValueError:
+                invalid[index] = True
+        elif isinstance(value, numbers.Real):
+            floats[index] = value
+        else:
+            missing[index] = True
+    return floats, missing, invalid
+
+
+def season_categories(temperatures, weather_codes):
+    """
+    Category indices (into CATEGORIES) for arrays of temperatures (°C) and WMO codes,
+    e.g. the hourly temperature_2m / weather_code of a forecast
+    """
+    temperatures, missing, bad_temperature = _as_float_array(temperatures)
+    codes, _, bad_code = _as_float_array(weather_codes, parse=int)
+    temperatures, codes, missing, invalid = np.broadcast_arrays(temperatures, codes, missing,
+                                                                bad_temperature | bad_code)
+
+    known = (codes >= 0) & (codes < len(CODE_GROUP)) & (codes == np.floor(codes))
+    groups = np.where(known, CODE_GROUP[np.where(known, codes, 0).astype(np.intp)], OTHER)
+    upper, lower = THRESHOLDS[groups, 0], THRESHOLDS[groups, 1]
+    bands = np.where(temperatures > upper, 0, np.where(temperatures > lower, 1, 2))
+    categories = GROUP_BANDS[groups, bands]
+    return np.where(invalid | (missing & NEEDS_TEMPERATURE[groups]), CASUAL, categories).astype(np.int8)
+
+
+def category_names(categories):
+    """Category indices back to names"""
+    return [CATEGORIES[i] for i in np.asarray(categories).ravel()]
+
+
+def dominant_categories(categories, window=24):
+    """
+    Most common category in each run of `window` values along the last axis (the last
+    run may be shorter); ties go to the category listed first in CATEGORIES.
+    Returns (indices, counts), shaped (..., windows) and (..., windows, len(CATEGORIES))
+    """
+    categories = np.asarray(categories, dtype=np.intp)
+    n = categories.shape[-1]
+    if n == 0:
+        shape = categories.shape[:-1] + (0,)
+        return np.zeros(shape, dtype=np.intp), np.zeros(shape + (len(CATEGORIES),), dtype=np.intp)
+    n_windows = -(-n // window)
+    series = categories.reshape(-1, n)
+    slots = np.arange(len(series))[:, None] * n_windows + np.arange(n) // window
+    counts = np.bincount((slots * len(CATEGORIES) + series).ravel(),
+                         minlength=len(series) * n_windows * len(CATEGORIES))
+    counts = counts.reshape(categories.shape[:-1] + (n_windows, len(CATEGORIES)))
+    return counts.argmax(axis=-1), counts
+
+
+class WeatherService:
+    def __init__(self, provider=None):
+        """Initialize Weather Service on a provider (default: WARDROBE_WEATHER_PROVIDER)"""
+        self.provider = provider or get_provider()
+        print(f"🌦️ Weather provider: {self.provider.name}")
     
     def get_weather_by_coordinates(self, latitude, longitude):
         """
@@ -56,36 +132,12 @@ class WeatherService:
         try:
             print(f"\n🌐 Fetching weather: lat={latitude}, lon={longitude}")
             
-            # FIXED: Use ONLY these parameters to avoid corruption
-            # Remove humidity_2m and wind_speed_10m which cause issues in some regions
-            params = {
-                "latitude": latitude,
-                "longitude": longitude,
-                "current": "temperature_2m,weather_code",  # MINIMAL set
-                "temperature_unit": "celsius"
-            }
-            
-            print(f"📡 Endpoint: {self.working_endpoint}")
-            print(f"📡 Parameters: {params}")
-            
-            response = requests.get(
-                self.working_endpoint,
-                params=params,
-                timeout=10
-            )
-            
-            print(f"📥 Response status: {response.status_code}")
-            
-            if response.status_code != 200:
-                try:
-                    error_data = response.json()
-                    error_msg = error_data.get('reason') or error_data.get('error') or 'Unknown error'
-                    print(f"❌ API Error ({response.status_code}): {str(error_msg)[:80]}")
-                except:
-                    print(f"❌ API Error ({response.status_code}): {response.text[:80]}")
+            with metrics.span("weather.forecast"):
+                data = self.provider.current(latitude, longitude)
+            
+            if data is None:
                 return None
             
-            data = response.json()
             print(f"📊 Response keys: {list(data.keys())}")
             
             if 'current' not in data:
@@ -129,34 +181,13 @@ class WeatherService:
         try:
             print(f"\n🔍 Looking up city: '{city_name}'")
             
-            geocoding_params = {
-                "name": city_name,
-                "count": 1,
-                "language": "en",
-                "format": "json"
-            }
-            
-            print(f"📡 Geocoding API: {self.geocoding_url}")
-            
-            geo_response = requests.get(
-                self.geocoding_url,
-                params=geocoding_params,
-                timeout=10
-            )
-            
-            print(f"📥 Geocoding status: {geo_response.status_code}")
-            
-            if geo_response.status_code != 200:
-                print(f"❌ Geocoding failed")
-                return None
-            
-            geo_data = geo_response.json()
+            with metrics.span("weather.geocode"):
+                result = self.provider.geocode(city_name)
             
-            if not geo_data.get('results'):
+            if not result:
                 print(f"❌ City '{city_name}' not found")
                 return None
             
-            result = geo_data['results'][0]
             latitude = result.get('latitude')
             longitude = result.get('longitude')
             city_display = result.get('name', city_name)
@@ -180,7 +211,38 @@ class WeatherService:
             import traceback
             traceback.print_exc()
             return None
-    
+
+    def get_hourly_forecast(self, latitude, longitude, days=7):
+        """Hourly temperature_2m / weather_code arrays for the next `days` days (the forecast's 'hourly' dict)"""
+        try:
+            with metrics.span("weather.hourly"):
+                data = self.provider.hourly(latitude, longitude, days)
+            hourly = (data or {}).get('hourly')
+            if not isinstance(hourly, dict) or 'temperature_2m' not in hourly or 'weather_code' not in hourly:
+                print(f"❌ Missing hourly temperature or weather code")
+                return None
+            return hourly
+        except Exception as e:
+            print(f"❌ Hourly forecast error: {type(e).__name__}: {str(e)}")
+            return None
+
+    def get_daily_seasons(self, hourly):
+        """
+        Dominant season category per calendar day of an hourly forecast
+        Input is the 'hourly' dict (time, temperature_2m, weather_code)
+        Output is a list of {date, season, hours: {category: count}}
+        """
+        categories = season_categories(hourly['temperature_2m'], hourly['weather_code'])
+        # Hours come in time order; a day may be partial (first/last day, DST)
+        days, starts = np.unique([t[:10] for t in hourly['time']], return_index=True)
+        ends = list(starts[1:]) + [len(categories)]
+        daily = []
+        for day, start, end in zip(days, starts, ends):
+            index, counts = dominant_categories(categories[start:end], window=end - start)
+            daily.append({'date': str(day), 'season': CATEGORIES[int(index[0])],
+                          'hours': {CATEGORIES[i]: int(n) for i, n in enumerate(counts[0]) if n}})
+        return daily
+
     def get_season_category(self, temperature, weather_code):
         """
         Convert weather to season: summer, winter, spring, autumn, rainy, casual
@@ -202,45 +264,45 @@ class WeatherService:
             if isinstance(weather_code, str):
                 weather_code = int(weather_code)
             
-            print(f"🌡️ Categorizing: temp={temperature}°C, code={weather_code}")
+            logger.debug("Categorizing: temp=%s°C, code=%s", temperature, weather_code)
             
             # Priority 1: Snow/Winter
             if weather_code in [71, 73, 75, 77, 85, 86]:
-                print(f"❄️ WINTER (snow)")
+                logger.debug("winter (snow)")
                 return "winter"
             
             # Priority 2: Rainy
             elif weather_code in [51, 53, 55, 61, 63, 65, 80, 81, 82]:
-                print(f"🌧️ RAINY")
+                logger.debug("rainy")
                 return "rainy"
             
             # Priority 3: Clear/Sunny (temp based)
             elif weather_code in [0, 1]:
                 if temperature > 25:
-                    print(f"☀️ SUMMER (clear, hot)")
+                    logger.debug("summer (clear, hot)")
                     return "summer"
                 elif temperature > 15:
-                    print(f"🌸 SPRING (clear, mild)")
+                    logger.debug("spring (clear, mild)")
                     return "spring"
                 else:
-                    print(f"❄️ WINTER (clear, cold)")
+                    logger.debug("winter (clear, cold)")
                     return "winter"
             
             # Priority 4: Cloudy (temp based)
             elif weather_code in [2, 3, 45, 48]:
                 if temperature > 20:
-                    print(f"🌸 SPRING (cloudy, warm)")
+                    logger.debug("spring (cloudy, warm)")
                     return "spring"
                 elif temperature > 10:
-                    print(f"🍂 AUTUMN (cloudy, cool)")
+                    logger.debug("autumn (cloudy, cool)")
                     return "autumn"
                 else:
-                    print(f"❄️ WINTER (cloudy, cold)")
+                    logger.debug("winter (cloudy, cold)")
                     return "winter"
             
             # Default
             else:
-                print(f"❓ Unknown code {weather_code}, using temperature")
+                logger.debug("Unknown code %s, using temperature", weather_code)
                 if temperature > 25:
                     return "summer"
                 elif temperature > 15:
@@ -249,5 +311,6 @@ class WeatherService:
                     return "winter"
         
         except Exception as e:
-            print(f"❌ Error in get_season_category: {type(e).__name__}: {str(e)}")
+            logger.warning("get_season_category(%r, %r) failed: %s: %s", temperature, weather_code,
+                           type(e).__name__, e)
             return "casual"
@@ -0,0 +1,46 @@
+"""
+Production entry point for the web app:
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+Importing this module loads the app (schema checks, weather service) and,
+when the model backend allows it, the models themselves. With gunicorn's
+preload_app that happens once in the master, so every forked worker shares
+those pages copy-on-write instead of loading its own copy. Each worker then
+warms its models up (post_fork) before taking requests.
+The development server (`python app.py`) is unchanged.
+"""
+import time
+
+import recognition_module
+from app import app
+
+application = app
+
+
+def preload_models():
+    """Load (or at least import) the models in the master before workers fork"""
+    start = time.perf_counter()
+    backend = recognition_module.get_models()
+    try:
+        loaded = backend.preload()
+    except Exception as e:
+        # The app still starts; workers load the models on first use
+        print(f"⚠️ Warning: model preload failed: {e}")
+        return
+    what = "models loaded" if loaded else "libraries imported, models load per worker"
+    print(f"✅ Preloaded {backend.name} backend in {time.perf_counter() - start:.1f}s ({what})")
+
+
+def warm_up_worker():
+    """Run one dummy batch through every model so the first upload isn't slow"""
+    start = time.perf_counter()
+    try:
+        recognition_module.get_models().warm_up()
+    except Exception as e:
+        print(f"⚠️ Warning: model warm-up failed: {e}")
+        return
+    print(f"🔥 Models warm in {time.perf_counter() - start:.1f}s")
+
+
+preload_models()